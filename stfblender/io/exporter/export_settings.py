@@ -3,4 +3,9 @@ import bpy
 
 class STF_ExportSettings(bpy.types.PropertyGroup):
 	stf_animation_bake_constraints: bpy.props.BoolProperty(name="Animations Bake Constraints", default=True, description="Bake animations that change values indirectly with constraints")
+	stf_animation_cache_baked: bpy.props.BoolProperty(name="Cache Baked Animations", default=False, description="Keep baked animations as hidden actions in the blend file, and reuse them on the next export if nothing they depend on has changed. Values drivers read from other data-blocks, like custom properties, are not checked")
 	stf_animation_preserve_baked: bpy.props.BoolProperty(name="Preserve Baked Animations", default=False, description="Don't remove baked animations after export")
+	stf_animation_binary_keyframes: bpy.props.BoolProperty(name="Binary Keyframes", default=False, description="Store animation keyframes in binary buffers instead of the JSON definition. Much smaller for long animations, but other STF implementations might not support this yet")
+	stf_compress_buffers: bpy.props.BoolProperty(name="Compress Buffers", default=False, description="Compress mesh, animation and other binary data that compresses well. Other STF implementations might not support this yet")
+	stf_compact_json: bpy.props.BoolProperty(name="Compact JSON", default=True, description="Write the JSON definition without any whitespace")
+	stf_profile_report: bpy.props.EnumProperty(items=[("none", "None", "", 0),("json", "JSON", "", 1),("csv", "CSV", "", 2)], name="Profile Report", default="none", description="Write the time spent and buffer data produced per handler and resource next to the exported file")
@@ -1,14 +1,19 @@
 import bpy
 from bpy_extras.io_utils import ExportHelper
 from io import BufferedWriter
+import logging
+import threading
 import traceback
-from collections.abc import Sequence
+from collections.abc import Callable, Sequence
 
 from ....stfblender_common import STFReport, STFReportSeverity
 from ....stfblender_common.resource.stf_registry import get_export_handlers
 from ....stfblender_common.helpers.misc import draw_slot_link_warning, get_stf_version
 from ...package_key import package_key
 from ...ui.operators.stf_meta import draw_meta_editor
+from ..stf_file import STF_File
+from ..stf_json import encode_json
+from ..stf_profiler import STF_Profiler
 from .export_settings import STF_ExportSettings
 from .stf_export_state import STF_ExportState
 from .stf_export_context import STF_ExportContext
@@ -16,18 +21,37 @@ from .stf_export_context import STF_ExportContext
 
 __all__ = ["STF_Export_Result", "export_stf_file", "ExportSTF"]
 
+_logger = logging.getLogger(__name__)
+
 class STF_Export_Result:
-	def __init__(self, success: bool, error_message: str | None = None, warnings: Sequence[STFReport] = (), export_time: float = -1):
+	def __init__(self, success: bool, error_message: str | None = None, warnings: Sequence[STFReport] = (), export_time: float = -1, profile: STF_Profiler | None = None, profile_filepath: str | None = None):
 		self.success: bool = success
 		self.error_message: str | None = error_message
 		self.warnings: Sequence[STFReport] = warnings
 		self.export_time: float = export_time
+		self.profile: STF_Profiler | None = profile
+		self.profile_filepath: str | None = profile_filepath
+
+def _write_in_background(filepath: str, encode: Callable[[], bytes]) -> threading.Thread:
+	"""Encode and write a file without holding up the export. The export may have returned by the time this fails, so failures get logged."""
+	def _write():
+		try:
+			data = encode()
+			with open(filepath, "wb") as file:
+				file.write(data)
+		except Exception:
+			_logger.error("Failed to write \"" + filepath + "\"", exc_info=True)
+	thread = threading.Thread(target=_write, name="stf_export_write")
+	thread.start()
+	return thread
 
 def export_stf_file(collection: bpy.types.Collection, filepath: str, export_settings: STF_ExportSettings, debug: bool = False) -> STF_Export_Result:
 	import time
 	time_start = time.time()
 	files: Sequence[BufferedWriter] = []
 	trash_objects: list[bpy.types.Object] = []
+	stf_state: STF_ExportState | None = None
+	stf_file: STF_File | None = None
 	try:
 		stf_state = STF_ExportState(collection.stf_meta.to_stf_meta_assetInfo(), get_export_handlers(), trash_objects, settings = export_settings)
 		stf_context = STF_ExportContext(stf_state, collection)
@@ -43,21 +67,34 @@ def export_stf_file(collection: bpy.types.Collection, filepath: str, export_sett
 
 		# Create and write stf_file to disk
 		stf_file = stf_state.create_stf_binary_file()
+		compact_json = export_settings.stf_compact_json if export_settings else True
+		# Without compact JSON, the definition is indented for the debug json file and encoded only once for both
+		definition_buffer = stf_file.encode_definition(compact_json, "\t" if debug and not compact_json else None)
 		files.append(open(export_filepath, "wb"))
-		stf_file.serialize(files[len(files) - 1])
+		stf_file.serialize(files[len(files) - 1], definition_buffer)
 
 		if(debug):
-			# Write out the json itself for debugging purposes
-			import json
-			json_string = json.dumps(stf_file.definition.to_dict(), indent="\t").encode(encoding="utf-8")
-			files.append(open(export_filepath + ".json", "wb"))
-			files[len(files) - 1].write(json_string)
-		return STF_Export_Result(True, warnings=stf_state._reports, export_time=time.time() - time_start)
+			# Write out the json itself for debugging purposes, without holding up the export
+			if(compact_json):
+				# The definition is final at this point, so the readable version can be encoded in the background as well
+				definition = stf_file.definition.to_dict()
+				_write_in_background(export_filepath + ".json", lambda: encode_json(definition, compact=False, indent="\t"))
+			else:
+				_write_in_background(export_filepath + ".json", lambda: definition_buffer)
+
+		# let profile_filepath
+		profile_filepath = None
+		if(export_settings and export_settings.stf_profile_report != "none"):
+			profile_filepath = export_filepath + ".profile." + export_settings.stf_profile_report
+			stf_state._profiler.write(profile_filepath)
+		return STF_Export_Result(True, warnings=stf_state._reports, export_time=time.time() - time_start, profile=stf_state._profiler, profile_filepath=profile_filepath)
 	except Exception as error:
 		print(error)
 		print(traceback.format_exc())
 		return STF_Export_Result(False, error_message=str(error))
 	finally:
+		if(stf_file is not None): stf_file.close()
+		if(stf_state is not None): stf_state.close()
 		for file in files:
 			if(file is not None and not file.closed): file.close()
 		for trash in trash_objects:
@@ -128,6 +165,11 @@ class ExportSTF(bpy.types.Operator, ExportHelper):
 						self.report({"WARNING"}, report.to_string())
 					if(report.severity.value >= STFReportSeverity.Info.value):
 						print(report.to_string() + "\n")
+				if(ret.profile and ret.profile_filepath):
+					self.report({"INFO"}, "Profile written to \"" + ret.profile_filepath + "\"")
+					for line in ret.profile.format_top(10, "handler") + ret.profile.format_top(10, "resource"):
+						self.report({"INFO"}, line)
+						print(line)
 				return {"FINISHED"}
 			else:
 				self.report({"ERROR"}, export_filepath + " :: " + ret.error_message)
@@ -174,7 +216,15 @@ class ExportSTF(bpy.types.Operator, ExportHelper):
 		layout.separator(factor=2, type="LINE")
 
 		layout.prop(self.export_settings, property="stf_animation_bake_constraints")
+		layout.prop(self.export_settings, property="stf_animation_cache_baked")
 		layout.prop(self.export_settings, property="stf_animation_preserve_baked")
+		layout.prop(self.export_settings, property="stf_animation_binary_keyframes")
+
+		layout.separator(factor=2, type="LINE")
+
+		layout.prop(self.export_settings, property="stf_compress_buffers")
+		layout.prop(self.export_settings, property="stf_compact_json")
+		layout.prop(self.export_settings, property="stf_profile_report")
 
 
 def export_button(self, context: bpy.types.Context):
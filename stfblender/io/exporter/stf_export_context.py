@@ -1,5 +1,6 @@
 import bpy
 import logging
+from contextlib import AbstractContextManager
 from typing import Any, Callable
 
 from ....stfblender_common import STF_ExportContext as ISTF_ExportContext, STF_TaskSteps, STF_Meta_AssetInfo_Json,  STFReportSeverity, STFReport, STFPropertyPathPart, STF_Category
@@ -9,6 +10,23 @@ from .stf_export_state import STF_ExportState
 _logger = logging.getLogger(__name__)
 
 
+def _matrix_key(matrix: Any) -> tuple:
+	return tuple(tuple(row) for row in matrix)
+
+def _get_converter_inputs(blender_object: Any) -> tuple | None:
+	"""Everything the converters of an objects animated properties capture when they get created"""
+	if(type(blender_object) is not bpy.types.Object):
+		return None
+	ret = [blender_object.parent, blender_object.parent_type, blender_object.parent_bone, _matrix_key(blender_object.matrix_parent_inverse), tuple(blender_object.scale), _matrix_key(blender_object.matrix_world)]
+	if(blender_object.parent):
+		ret.append(_matrix_key(blender_object.parent.matrix_world))
+		if(blender_object.parent_type == "BONE" and blender_object.parent.pose and blender_object.parent_bone in blender_object.parent.pose.bones):
+			pose_bone = blender_object.parent.pose.bones[blender_object.parent_bone]
+			ret.append(_matrix_key(pose_bone.matrix))
+			ret.append((pose_bone.tail - pose_bone.head).length)
+	return tuple(ret)
+
+
 class STF_ExportContext(ISTF_ExportContext):
 	"""Context for resource export. It will be passed to each STF_Module's export func."""
 
@@ -47,9 +65,11 @@ class STF_ExportContext(ISTF_ExportContext):
 			if("components" not in json_resource): json_resource["components"] = []
 			for component in components:
 				if(selected_handler := self._state.determine_handler(component, "component")):
-					component_ret = selected_handler.export_resource(self, component, blender_object)
+					with self._state._profiler.measure(("handler", selected_handler.stf_type)) as profile:
+						component_ret = selected_handler.export_resource(self, component, blender_object)
 					if(component_ret and type(component_ret) is not STFReport):
 						component_json_resource, component_id = component_ret # pyright: ignore[reportGeneralTypeIssues]
+						profile.add_key("resource", component_id)
 						self._state.register_serialized_resource(component, component_json_resource, component_id)
 						json_resource["components"].append(component_id)
 					else:
@@ -81,10 +101,12 @@ class STF_ExportContext(ISTF_ExportContext):
 		if(existing_id := self.get_resource_id(blender_object)): return existing_id
 
 		if(selected_handler := self._state.determine_handler(blender_object, stf_category)):
-			handler_ret = selected_handler.export_resource(self, blender_object, context_object)
+			with self._state._profiler.measure(("handler", selected_handler.stf_type)) as profile:
+				handler_ret = selected_handler.export_resource(self, blender_object, context_object)
 
 			if(handler_ret and type(handler_ret) is not STFReport):
 				json_resource, resource_id = handler_ret # pyright: ignore[reportGeneralTypeIssues]
+				profile.add_key("resource", resource_id)
 				self._state.register_serialized_resource(blender_object, json_resource, resource_id)
 
 				if(selected_handler.stf_category not in ["component", "instance"]):
@@ -137,10 +159,23 @@ class STF_ExportContext(ISTF_ExportContext):
 
 		if(data_path.startswith(".")): data_path = data_path[1:]
 
+		# The same data paths get resolved for every action animating a data-block. Nested resolutions, like those of armature bones, are part of the cached result.
+		# Converters capture the parenting and current transforms of objects, so a resolution is only valid as long as these don't change, i.e. by baking stepping through frames.
+		# let cache_key, converter_inputs
+		cache_key = converter_inputs = None
+		if(isinstance(blender_object, bpy.types.ID)):
+			cache_key = (blender_object, property_index, data_path)
+			converter_inputs = _get_converter_inputs(blender_object)
+			if((cached := self._state._property_path_cache.get(cache_key)) and cached[0] == converter_inputs):
+				return cached[1]
+
+		ret = None
 		if(selected_handler := self._state.determine_property_resolution_handler(blender_object, data_path)):
-			return selected_handler.export_blender_animation(self, blender_object, property_index, data_path)
+			ret = selected_handler.export_blender_animation(self, blender_object, property_index, data_path)
 
-		return None
+		if(cache_key):
+			self._state._property_path_cache[cache_key] = (converter_inputs, ret)
+		return ret
 
 
 	def add_task(self, step: int | STF_TaskSteps, task: Callable):
@@ -170,5 +205,16 @@ class STF_ExportContext(ISTF_ExportContext):
 	def get_root_id(self) -> str | None:
 		return self._state._root_id
 
+	def get_cached(self, key: Any) -> Any | None:
+		"""Get data derived from exported resources, which another handler might need again, i.e. the actions waiting for a constraint bake."""
+		return self._state._cache.get(key)
+
+	def set_cached(self, key: Any, value: Any):
+		self._state._cache[key] = value
+
+	def profile(self, category: str, key: str) -> AbstractContextManager:
+		"""Measure a section of an export, i.e. `with context.profile("constraint_bake", action.name):`. Nested sections are excluded from the time of the resource being exported."""
+		return self._state._profiler.measure((category, key))
+
 	def get_asset_info(self) -> STF_Meta_AssetInfo_Json:
 		return self._state._asset_info
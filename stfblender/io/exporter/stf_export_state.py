@@ -1,10 +1,14 @@
 import bpy
 import logging
+import os
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any
 
-from ....stfblender_common import STFReportSeverity, STFReport, STF_ExportComponentHook, STF_Buffer_Json, STF_JsonDefinition, STF_Meta_AssetInfo_Json, STF_Meta_AssetProperties_Json
+from ....stfblender_common import STFReportSeverity, STFReport, STFPropertyPathPart, STF_ExportComponentHook, STF_Buffer_Json, STF_JsonDefinition, STF_Meta_AssetInfo_Json, STF_Meta_AssetProperties_Json
 from ....stfblender_common.resource.stf_handler_base import STF_HandlerBase
 from ....stfblender_common.helpers import get_stf_version
+from ..stf_buffer_compression import buffer_type_included, compress_buffer
 from ..stf_file import STF_File
 from ..stf_state_base import STF_State_Base
 from .export_settings import STF_ExportSettings
@@ -37,7 +41,8 @@ class STF_ExportState(STF_State_Base):
 		self._resources: dict[Any, str] = {} # original application object -> ID of exported STF Json resource
 		self._resources_inverse: dict[str, Any] = {} # original application object -> ID of exported STF Json resource
 		self._exported_resources: dict[str, dict] = {} # ID -> exported STF Json resource
-		self._exported_buffers: dict[str, bytes] = {} # ID -> exported STF Json buffer
+		self._exported_buffers: dict[str, tuple[int, int, str]] = {} # ID -> offset and length of the exported buffer in the spool file, and its buffer type
+		self._buffer_spool = tempfile.TemporaryFile() # Buffers get written out as soon as they are serialized, instead of being held in memory until the end
 
 		self._asset_info: STF_Meta_AssetInfo_Json = asset_info[0]
 		self._asset_properties: STF_Meta_AssetProperties_Json = asset_info[1]
@@ -49,21 +54,73 @@ class STF_ExportState(STF_State_Base):
 
 		self._settings: STF_ExportSettings | None = settings
 
+		self._cache: dict[Any, Any] = {} # Data derived from exported resources, shared between handlers
+
+		# Buffers get compressed on a thread pool, and written to the spool file in order once done
+		compression_workers = os.cpu_count() or 1
+		self._compression_pool: ThreadPoolExecutor | None = ThreadPoolExecutor(max_workers=compression_workers) if settings and settings.stf_compress_buffers else None
+		self._pending_buffers: dict[str, Future] = {} # ID -> compression task
+		self._max_pending_buffers: int = 4 * (compression_workers if self._compression_pool else 1)
+
+		# Dispatch tables, built once per export
+		self._handler_dispatch: dict[Any, tuple[list[tuple[int, STF_HandlerBase]], tuple[int, STF_HandlerBase] | None]] = {} # type -> handlers deciding per object, and the first handler accepting any object of the type, with their position in the registry
+		for handler_type, handler_list in self._handlers.items():
+			dynamic_handlers: list[tuple[int, STF_HandlerBase]] = []
+			static_handler: tuple[int, STF_HandlerBase] | None = None
+			for index, handler in enumerate(handler_list):
+				if(hasattr(handler, "can_handle_blender_resource")):
+					dynamic_handlers.append((index, handler))
+				elif(static_handler is None):
+					static_handler = (index, handler)
+			self._handler_dispatch[handler_type] = (dynamic_handlers, static_handler)
+
+		self._animation_path_tries: dict[Any, dict] = {} # type -> prefix trie of understood animation data paths
+		rank = 0
+		for _, handler_list in self._handlers.items():
+			for handler in handler_list:
+				if(hasattr(handler, "understood_blender_animation_types") and hasattr(handler, "understood_blender_animation_data_paths") and hasattr(handler, "export_blender_animation")):
+					for animation_type in handler.understood_blender_animation_types:
+						trie = self._animation_path_tries.setdefault(animation_type, {})
+						for understood_property in handler.understood_blender_animation_data_paths:
+							node = trie
+							for character in understood_property:
+								node = node.setdefault(character, {})
+							# The empty key marks the end of a prefix. If registered more than once, the first handler wins.
+							if("" not in node):
+								node[""] = (rank, handler)
+							rank += 1
+		self._property_resolution_cache: dict[tuple[Any, str], STF_HandlerBase | None] = {} # (type, data_path) -> handler
+		self._property_path_cache: dict[tuple[Any, int, str], tuple[Any, STFPropertyPathPart | None]] = {} # (data-block, datablock index, data_path) -> what its converters captured when resolved, and the resolved path
+
 
 	def determine_handler(self, application_object: Any, stf_category: str | None = None) -> STF_HandlerBase | None:
 		"""Find the best suited registered STF_Handler for the type of this object"""
+		object_type = type(application_object)
+		if(object_type not in self._handler_dispatch):
+			return None
+		dynamic_handlers, static_handler = self._handler_dispatch[object_type]
+		if(len(dynamic_handlers) == 0):
+			return static_handler[1] if static_handler else None
+
 		selected_handler = None
 		selected_priority = -1
-
-		for handler in self._handlers.get(type(application_object), []):
-			if(hasattr(handler, "can_handle_blender_resource")):
-				priority = handler.can_handle_blender_resource(application_object)
-				if(priority > selected_priority and (stf_category is None or handler.stf_category == stf_category)):
-					selected_handler = handler
-					selected_priority = priority
-			elif(1 > selected_priority):
+		selected_index = -1
+
+		# Handlers accepting any object of this type have a priority of 1. On equal priority, the handler registered first wins.
+		if(static_handler):
+			selected_index, selected_handler = static_handler
+			selected_priority = 1
+
+		for index, handler in dynamic_handlers:
+			if(stf_category is not None and handler.stf_category != stf_category):
+				continue
+			priority = handler.can_handle_blender_resource(application_object)
+			if(priority is None):
+				continue
+			if(priority > selected_priority or (priority == selected_priority and index < selected_index)):
 				selected_handler = handler
-				selected_priority = 1
+				selected_priority = priority
+				selected_index = index
 
 		return selected_handler
 
@@ -74,16 +131,26 @@ class STF_ExportState(STF_State_Base):
 
 	def determine_property_resolution_handler(self, application_object: Any, data_path: str) -> STF_HandlerBase | None:
 		# TODO handle priority for animation path handling maybe at some point?
+		cache_key = (type(application_object), data_path)
+		if(cache_key in self._property_resolution_cache):
+			return self._property_resolution_cache[cache_key]
+
+		# Walk the data path through the trie. Of all understood prefixes along the way, the one registered first wins.
+		selected: tuple[int, STF_HandlerBase] | None = None
+		node = self._animation_path_tries.get(type(application_object))
+		for character in data_path:
+			if(node is None):
+				break
+			if("" in node and (selected is None or node[""][0] < selected[0])):
+				selected = node[""]
+			node = node.get(character)
+		else:
+			if(node is not None and "" in node and (selected is None or node[""][0] < selected[0])):
+				selected = node[""]
 
-		for _, handler_list in self._handlers.items():
-			for handler in handler_list:
-				if(hasattr(handler, "understood_blender_animation_types") and type(application_object) in handler.understood_blender_animation_types
-						and hasattr(handler, "understood_blender_animation_data_paths")
-						and hasattr(handler, "export_blender_animation")):
-					for understood_property in handler.understood_blender_animation_data_paths:
-						if(data_path.startswith(understood_property)):
-							return handler
-		return None
+		ret = selected[1] if selected else None
+		self._property_resolution_cache[cache_key] = ret
+		return ret
 
 
 	def get_resource_id(self, application_object: Any) -> str | None:
@@ -118,12 +185,34 @@ class STF_ExportState(STF_State_Base):
 
 
 	def serialize_buffer(self, data: bytes, buffer_id: str | None = None) -> str:
-		"""Register a serialized buffer."""
+		"""Register a serialized buffer. It will be written to the spool file right away, or once it's compressed."""
 		import uuid
 		buffer_id = buffer_id if buffer_id else str(uuid.uuid4())
-		self._exported_buffers[buffer_id] = data
+		self._profiler.add_bytes(len(data))
+		if(self._compression_pool):
+			self._pending_buffers.pop(buffer_id, None)
+			self._pending_buffers[buffer_id] = self._compression_pool.submit(compress_buffer, data)
+			self.__write_pending_buffers(len(self._pending_buffers) >= self._max_pending_buffers)
+		else:
+			self.__write_buffer(buffer_id, data, buffer_type_included)
 		return buffer_id
 
+	def __write_buffer(self, buffer_id: str, data: bytes | memoryview, buffer_type: str):
+		offset = self._buffer_spool.seek(0, 2)
+		self._buffer_spool.write(data)
+		self._exported_buffers[buffer_id] = (offset, self._buffer_spool.tell() - offset, buffer_type)
+
+	def __write_pending_buffers(self, wait_for_first: bool = False, wait_for_all: bool = False):
+		"""Write compressed buffers in the order they were serialized. Stop at the first one still being compressed, unless told to wait."""
+		while(len(self._pending_buffers) > 0):
+			buffer_id, future = next(iter(self._pending_buffers.items()))
+			if(not future.done() and not wait_for_first and not wait_for_all):
+				break
+			del self._pending_buffers[buffer_id]
+			data, buffer_type = future.result()
+			self.__write_buffer(buffer_id, data, buffer_type)
+			wait_for_first = False
+
 
 	def id_exists(self, id: str) -> bool:
 		return id in self._resources_inverse
@@ -151,17 +240,27 @@ class STF_ExportState(STF_State_Base):
 		ret.stf.metric_multiplier = self._metric_multiplier
 		ret.resources = self._exported_resources
 		ret.buffers = {}
+		self.__write_pending_buffers(wait_for_all=True)
 		buffer_index = 0
-		for id, buffer in self._exported_buffers.items():
+		for id, (_, _, buffer_type) in self._exported_buffers.items():
 			json_buffer_def = STF_Buffer_Json()
 			json_buffer_def.index = buffer_index
+			if(buffer_type != buffer_type_included):
+				json_buffer_def.type = buffer_type
 			ret.buffers[id] = json_buffer_def
 			buffer_index += 1
 		return ret
 
 	def create_stf_binary_file(self) -> STF_File:
+		"""The buffers of the returned STF_File are mapped from the spool file. Call `close()` on both once the file is written."""
 		ret = STF_File()
 		ret.definition = self.create_stf_definition()
-		for _, buffer in self._exported_buffers.items():
-			ret.buffers_included.append(buffer)
+		self._buffer_spool.flush()
+		ret.map_buffers(self._buffer_spool, [(offset, length) for offset, length, _ in self._exported_buffers.values()])
 		return ret
+
+	def close(self):
+		"""Stop the compression threads and delete the spool file."""
+		if(self._compression_pool):
+			self._compression_pool.shutdown(cancel_futures=True)
+		self._buffer_spool.close()
@@ -3,4 +3,6 @@ import bpy
 
 class STF_ImportSettings(bpy.types.PropertyGroup):
 	import_baked_animations: bpy.props.BoolProperty(name="Import Baked Animations", default=True)
+	memory_map_buffers: bpy.props.BoolProperty(name="Memory-Map Buffers", default=True, description="Load buffers from the file only once they are imported, instead of reading the entire file into memory upfront")
+	profile_report: bpy.props.EnumProperty(items=[("none", "None", "", 0),("json", "JSON", "", 1),("csv", "CSV", "", 2)], name="Profile Report", default="none", description="Write the time spent per handler, resource and Blender mode switch next to the imported file")
 
@@ -2,58 +2,150 @@ import bpy
 from bpy_extras.io_utils import ImportHelper
 import os
 import io
+import time
 import traceback
-from collections.abc import Sequence
+from collections.abc import Iterator, Sequence
 
 from ....stfblender_common import STFReport, STFReportSeverity
 from ....stfblender_common.resource.stf_registry import get_import_handlers, get_import_handlers_fallback
+from ....stfblender_common.resource.stf_handler_base import STF_HandlerBase
 from ....stfblender_common.helpers import draw_slot_link_warning, get_stf_version
 from ..stf_file import STF_File
+from ..stf_buffer_compression import decompress_buffer
+from ..stf_profiler import STF_Profiler
 from .import_settings import STF_ImportSettings
 from .stf_import_state import STF_ImportState
 from .stf_import_context import STF_ImportContext
 
 
-__all__ = ["STF_Import_Result", "import_stf_file", "ImportSTF"]
+__all__ = ["STF_Import_Result", "STF_Parsed_File", "parse_stf_file", "import_stf_file", "import_stf_files", "ImportSTF"]
 
 
 class STF_Import_Result:
-	def __init__(self, success: bool, collection: bpy.types.Collection | None = None, error_message: str | None = None, warnings: Sequence[STFReport] = (), import_time: float = -1):
+	def __init__(self, success: bool, collection: bpy.types.Collection | None = None, error_message: str | None = None, warnings: Sequence[STFReport] = (), import_time: float = -1, profile: STF_Profiler | None = None, profile_filepath: str | None = None, parse_time: float = -1):
 		self.success: bool = success
 		self.collection: bpy.types.Collection | None = collection
 		self.error_message: str | None = error_message
 		self.warnings: Sequence[STFReport] = warnings
-		self.import_time: float = import_time
+		self.import_time: float = import_time # Only the import into Blender on the main thread, parsing is measured in `parse_time`
+		self.profile: STF_Profiler | None = profile
+		self.profile_filepath: str | None = profile_filepath
+		self.parse_time: float = parse_time
+
+class STF_Parsed_File:
+	"""An STF file read from disk, with its JSON definition parsed and its compressed buffers decompressed, ready to be imported."""
+	def __init__(self, filepath: str):
+		self.filepath: str = filepath
+		self.file: io.BufferedReader | None = None
+		self.stf_file: STF_File | None = None
+		self.decoded_buffers: dict[str, bytes] = {}
+		self.parse_time: float = 0
+		self.error: Exception | None = None
+
+	def close(self):
+		if(self.stf_file is not None): self.stf_file.close()
+		if(self.file is not None and not self.file.closed): self.file.close()
+		self.decoded_buffers = {}
+
+
+def parse_stf_file(filepath: str, memory_map: bool = False, decode_buffers: bool = False) -> STF_Parsed_File:
+	"""
+	Everything of an import that doesn't touch Blender data, so it can run on a worker thread.
+	Reading the file and decompressing buffers release the GIL.
+
+	:param bool decode_buffers: Decompress compressed buffers now, instead of once they are imported.
+	"""
+	time_start = time.time()
+	ret = STF_Parsed_File(filepath)
+	try:
+		ret.file = open(filepath, "rb")
+		ret.stf_file = STF_File.parse(ret.file, memory_map=memory_map)
+		if(decode_buffers):
+			for buffer_id, buffer in ret.stf_file.definition.buffers.items():
+				if(buffer.type.startswith("stf.buffer.included.")):
+					if((data := decompress_buffer(ret.stf_file.buffers_included[buffer.index], buffer.type)) is not None):
+						ret.decoded_buffers[buffer_id] = data
+	except Exception as error:
+		ret.error = error
+	ret.parse_time = time.time() - time_start
+	return ret
 
-def import_stf_file(filepath: str, import_settings: STF_ImportSettings) -> STF_Import_Result:
-	import time
+
+def _import_parsed_stf_file(parsed_file: STF_Parsed_File, import_settings: STF_ImportSettings, handlers: dict[str, STF_HandlerBase], fallback_handlers: dict[str, STF_HandlerBase]) -> STF_Import_Result:
 	time_start = time.time()
-	file: io.BufferedReader | None = None
 	trash_objects: list[bpy.types.Object] = []
 	try:
-		# Read and parse stf_file from disk
-		file = open(filepath, "rb")
-		stf_file = STF_File.parse(file)
+		if(parsed_file.error is not None):
+			raise parsed_file.error
+		if(parsed_file.stf_file is None):
+			raise Exception("Import Failed, file was not parsed!")
 
-		stf_state = STF_ImportState(stf_file, get_import_handlers(), get_import_handlers_fallback(), trash_objects, STFReportSeverity.FatalError, import_settings)
+		stf_state = STF_ImportState(parsed_file.stf_file, handlers, fallback_handlers, trash_objects, STFReportSeverity.FatalError, import_settings, parsed_file.decoded_buffers)
 		stf_context = STF_ImportContext(stf_state)
 		root = stf_context.run()
 
 		if(not root or type(root) is not bpy.types.Collection):
 			raise Exception("Import Failed, invalid root!")
 
-		return STF_Import_Result(True, collection = root, import_time=time.time() - time_start, warnings=stf_state._reports)
+		# let profile_filepath
+		profile_filepath = None
+		if(import_settings and import_settings.profile_report != "none"):
+			profile_filepath = parsed_file.filepath + ".profile." + import_settings.profile_report
+			stf_state._profiler.write(profile_filepath)
+		return STF_Import_Result(True, collection = root, import_time=time.time() - time_start, warnings=stf_state._reports, profile=stf_state._profiler, profile_filepath=profile_filepath, parse_time=parsed_file.parse_time)
 	except Exception as error:
 		print(error)
 		print(traceback.format_exc())
-		return STF_Import_Result(False, error_message=str(error))
+		return STF_Import_Result(False, error_message=str(error), parse_time=parsed_file.parse_time)
 	finally:
-		if(file is not None and not file.closed): file.close()
+		parsed_file.close()
 		for trash in trash_objects:
 			if(trash is not None):
 				bpy.data.objects.remove(trash)
 
 
+def import_stf_file(filepath: str, import_settings: STF_ImportSettings) -> STF_Import_Result:
+	parsed_file = parse_stf_file(filepath, memory_map=import_settings.memory_map_buffers if import_settings else False)
+	return _import_parsed_stf_file(parsed_file, import_settings, get_import_handlers(), get_import_handlers_fallback())
+
+
+def import_stf_files(filepaths: Sequence[str], import_settings: STF_ImportSettings, max_workers: int | None = None) -> Iterator[tuple[str, STF_Import_Result]]:
+	"""
+	Import multiple STF files, while the next files are parsed and their buffers decompressed on a thread pool.
+	Blender data can only be created from the main thread, so the actual imports still run one after another, in order.
+	The handler registries are resolved once for the entire batch.
+
+	:return: Yields the filepath and result of each import, as soon as it's done.
+	"""
+	from concurrent.futures import ThreadPoolExecutor, Future
+	from collections import deque
+
+	handlers = get_import_handlers()
+	fallback_handlers = get_import_handlers_fallback()
+	# Settings are Blender data, so read them here instead of in the workers
+	memory_map = import_settings.memory_map_buffers if import_settings else False
+
+	if(max_workers is None):
+		max_workers = min(4, os.cpu_count() or 1)
+	# Bound how far parsing runs ahead, since parsed files keep their decompressed buffers in memory
+	max_pending = max_workers + 1
+
+	with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stf_import") as executor:
+		remaining_filepaths = deque(filepaths)
+		pending: deque[Future[STF_Parsed_File]] = deque()
+		try:
+			while(len(remaining_filepaths) > 0 or len(pending) > 0):
+				while(len(remaining_filepaths) > 0 and len(pending) < max_pending):
+					pending.append(executor.submit(parse_stf_file, remaining_filepaths.popleft(), memory_map, True))
+				parsed_file = pending.popleft().result()
+				yield parsed_file.filepath, _import_parsed_stf_file(parsed_file, import_settings, handlers, fallback_handlers)
+		finally:
+			# If the batch is aborted, close the files which were already parsed
+			for future in pending:
+				if(not future.cancel()):
+					future.result().close()
+
+
 class ImportSTF(bpy.types.Operator, ImportHelper):
 	"""Import STF files (.stf)"""
 	bl_idname = "stf.import_files"
@@ -78,14 +170,21 @@ class ImportSTF(bpy.types.Operator, ImportHelper):
 		try:
 			result_str = ""
 			total_time = 0
+			total_parse_time = 0
 			total_successes = 0
 			last_success = None
-			for file in self.files:
-				filepath = os.path.join(self.directory, file.name)
-				result = import_stf_file(filepath, self.import_settings)
+			time_start = time.time()
+			filepaths = [os.path.join(self.directory, file.name) for file in self.files]
+			# let results
+			if(len(filepaths) > 1):
+				results = import_stf_files(filepaths, self.import_settings)
+			else:
+				results = ((filepath, import_stf_file(filepath, self.import_settings)) for filepath in filepaths)
+			for filepath, result in results:
 				if(result.success):
 					total_successes += 1
 					total_time += result.import_time
+					total_parse_time += result.parse_time
 					if(result.collection):
 						last_success = result.collection
 						result.collection.color_tag = "COLOR_07"
@@ -95,15 +194,24 @@ class ImportSTF(bpy.types.Operator, ImportHelper):
 							print(filepath + " :: " + report.to_string() + "\n")
 							self.report({"WARNING"}, filepath + " :: " + report.to_string())
 
-					result_str = "STF asset \"" + filepath + "\" imported successfully! (%.3f sec.)" % result.import_time
+					if(result.profile and result.profile_filepath):
+						self.report({"INFO"}, "Profile written to \"" + result.profile_filepath + "\"")
+						for line in result.profile.format_top(10, "handler") + result.profile.format_top(5, "mode_set"):
+							self.report({"INFO"}, line)
+							print(line)
+
+					result_str = "STF asset \"" + filepath + "\" imported successfully! (%.3f sec.)" % (result.parse_time + result.import_time)
 					if(len(self.files) > 1):
+						file_str = "%s :: parsed in %.3f sec., imported in %.3f sec." % (filepath, result.parse_time, result.import_time)
+						self.report({"INFO"}, file_str)
 						print(result_str)
 				else:
 					self.report({"ERROR"}, filepath + " :: " + result.error_message)
 
 			if(total_successes == len(self.files)):
 				if(total_successes > 1):
-					result_str = str(len(self.files)) + " STF assets imported successfully! (%.3f sec.)" % total_time
+					# Files are parsed in parallel, so only the import times add up to the cost on Blender's side
+					result_str = str(len(self.files)) + " STF assets imported successfully! (%.3f sec., %.3f sec. combined import, %.3f sec. combined parsing in parallel)" % (time.time() - time_start, total_time, total_parse_time)
 				self.report({"INFO"}, result_str)
 				print(result_str)
 			if(last_success):
@@ -132,6 +240,8 @@ class ImportSTF(bpy.types.Operator, ImportHelper):
 		draw_slot_link_warning(layout, 30)
 
 		layout.prop(self.import_settings, "import_baked_animations")
+		layout.prop(self.import_settings, "memory_map_buffers")
+		layout.prop(self.import_settings, "profile_report")
 
 
 def import_button(self, context: bpy.types.Context):
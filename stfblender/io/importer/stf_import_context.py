@@ -1,5 +1,6 @@
 import bpy
 import logging
+from contextlib import AbstractContextManager
 from typing import Any, Callable
 
 from ....stfblender_common import STF_ImportContext as ISTF_ImportContext, STF_Category, STF_TaskSteps, STFReportSeverity, STFReport, BlenderPropertyPathPart, STF_Component_Editmode_Resistant_Reference
@@ -40,7 +41,9 @@ class STF_ImportContext(ISTF_ImportContext):
 			for component_id in json_resource["components"]:
 				if(json_component := self.get_json_resource(component_id)):
 					if(component_handler := self._state.determine_handler(json_component, STF_Category.COMPONENT)):
-						component_result = component_handler.import_resource(self, json_component, component_id, blender_resource)
+						with self._state._profiler.measure(("handler", component_handler.stf_type), ("resource", component_id)):
+							component_result = component_handler.import_resource(self, json_component, component_id, blender_resource)
+						self.__release_buffers(json_component)
 						if(component_result and type(component_result) is not STFReport):
 							application_component_object: Any = component_result
 							self.register_imported_resource(component_id, STF_Component_Editmode_Resistant_Reference(application_component_object, blender_resource))
@@ -81,9 +84,11 @@ class STF_ImportContext(ISTF_ImportContext):
 			if(handler.stf_category == STF_Category.COMPONENT and stf_category != STF_Category.COMPONENT):
 				return None # clearly a fail, likely caused by fallback handling
 
-			blender_resource = handler.import_resource(self, json_resource, stf_id, context_resource) # pyright: ignore[reportArgumentType]
+			with self._state._profiler.measure(("handler", handler.stf_type), ("resource", stf_id)):
+				blender_resource = handler.import_resource(self, json_resource, stf_id, context_resource) # pyright: ignore[reportArgumentType]
 			if(blender_resource and type(blender_resource) is not STFReport):
 				self.register_imported_resource(stf_id, blender_resource)
+				self.__release_buffers(json_resource)
 				if(handler.stf_category in [STF_Category.DATA, STF_Category.NODE]):
 					self.__run_components(json_resource, handler.get_components_holder(blender_resource) if hasattr(handler, "get_components_holder") else blender_resource) # pyright: ignore[reportArgumentType]
 				return blender_resource
@@ -98,7 +103,7 @@ class STF_ImportContext(ISTF_ImportContext):
 		return None
 
 
-	def import_buffer(self, json_parent: dict, buffer_index: int) -> bytes | None:
+	def import_buffer(self, json_parent: dict, buffer_index: int) -> bytes | memoryview | None:
 		if(type(buffer_index) is str): # todo remove this possibility sometime after stf v0.1.x
 			return self._state.import_buffer(buffer_index)
 		if(buffer_index is None or "referenced_buffers" not in json_parent or len(json_parent["referenced_buffers"]) < buffer_index):
@@ -106,9 +111,14 @@ class STF_ImportContext(ISTF_ImportContext):
 		else:
 			return self._state.import_buffer(json_parent["referenced_buffers"][buffer_index])
 
-	def _import_buffer(self, stf_id: str) -> bytes | None:
+	def _import_buffer(self, stf_id: str) -> bytes | memoryview | None:
 		return self._state.import_buffer(stf_id)
 
+	def __release_buffers(self, json_resource: dict):
+		"""Once a resource is imported, its buffers can be dropped from memory. They remain accessible, should they be needed again."""
+		for buffer_id in json_resource.get("referenced_buffers", []):
+			self._state.release_buffer(buffer_id)
+
 
 	def resolve_stf_property_path(self, stf_path: list[str], blender_object: Any = None) -> BlenderPropertyPathPart | None:
 		if(stf_path is None or len(stf_path) == 0): return None
@@ -145,5 +155,16 @@ class STF_ImportContext(ISTF_ImportContext):
 	def get_filename(self) -> str:
 		return self._state._file.filename
 
+	def get_cached(self, key: Any) -> Any | None:
+		"""Get data derived from imported resources, which another handler might need again, i.e. lookup indices for a mesh."""
+		return self._state._cache.get(key)
+
+	def set_cached(self, key: Any, value: Any):
+		self._state._cache[key] = value
+
+	def profile(self, category: str, key: str) -> AbstractContextManager:
+		"""Measure a section of an import, i.e. `with context.profile("mode_set", "EDIT"):`. Nested sections are excluded from the time of the resource being imported."""
+		return self._state._profiler.measure((category, key))
+
 	def report(self, report: STFReport):
 		self._state.report(report)
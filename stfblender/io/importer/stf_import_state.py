@@ -5,6 +5,7 @@ from typing import Any
 from ....stfblender_common import STFReportSeverity, STFReport, STF_Category, STF_Meta_AssetInfo_Json
 from ....stfblender_common.resource.stf_handler_base import STF_HandlerBase
 from ..stf_state_base import STF_State_Base
+from ..stf_buffer_compression import decompress_buffer
 from ..stf_file import STF_File
 from .import_settings import STF_ImportSettings
 
@@ -18,10 +19,11 @@ class STF_ImportState(STF_State_Base):
 	Gets passed to the STF_ImportContext.
 	"""
 
-	def __init__(self, file: STF_File, handlers: dict[str, STF_HandlerBase], fallback_handlers: dict[str, STF_HandlerBase] = {}, trash_objects: list[bpy.types.Object] = [], fail_on_severity: STFReportSeverity = STFReportSeverity.FatalError, settings: STF_ImportSettings | None = None):
+	def __init__(self, file: STF_File, handlers: dict[str, STF_HandlerBase], fallback_handlers: dict[str, STF_HandlerBase] = {}, trash_objects: list[bpy.types.Object] = [], fail_on_severity: STFReportSeverity = STFReportSeverity.FatalError, settings: STF_ImportSettings | None = None, decoded_buffers: dict[str, bytes] | None = None):
 		super().__init__(fail_on_severity)
 
 		self._file: STF_File = file
+		self._decoded_buffers: dict[str, bytes] = decoded_buffers if decoded_buffers is not None else {} # Compressed buffers which were already decompressed ahead of the import
 
 		self._resources: dict[str, STF_HandlerBase] = handlers
 		self._fallback_modules: dict[str, STF_HandlerBase] = fallback_handlers
@@ -33,6 +35,8 @@ class STF_ImportState(STF_State_Base):
 
 		self._settings: STF_ImportSettings | None = settings
 
+		self._cache: dict[Any, Any] = {} # Data derived from imported resources, shared between handlers
+
 
 	def determine_handler(self, json_resource: dict[str, Any], stf_category: str = STF_Category.DATA) -> STF_HandlerBase | None:
 		return self._resources.get(json_resource["type"], self._fallback_modules.get(stf_category))
@@ -43,16 +47,31 @@ class STF_ImportState(STF_State_Base):
 	def get_imported_resource(self, stf_id: str):
 		return self._imported_resources.get(stf_id, None)
 
-	def import_buffer(self, stf_id: str) -> bytes | None:
+	def import_buffer(self, stf_id: str) -> bytes | memoryview | None:
 		if(buffer := self._file.definition.buffers.get(stf_id)):
-			match(buffer.type):
-				case "stf.buffer.included":
-					return self._file.buffers_included[buffer.index]
-				case _:
-					_logger.fatal("Invalid buffer type: " + buffer.type, stack_info=True)
-					self.report(STFReport("Invalid buffer type: " + buffer.type, severity=STFReportSeverity.FatalError))
+			self._profiler.add_bytes(len(self._file.buffers_included[buffer.index]) if buffer.type.startswith("stf.buffer.included") else 0)
+			with self._profiler.measure(("buffer", buffer.type)):
+				match(buffer.type):
+					case "stf.buffer.included":
+						return self._file.buffers_included[buffer.index]
+					case "stf.buffer.included.zlib" | "stf.buffer.included.zstd":
+						if((data := self._decoded_buffers.get(stf_id)) is not None):
+							return data
+						if((data := decompress_buffer(self._file.buffers_included[buffer.index], buffer.type)) is not None):
+							return data
+						_logger.error("Unsupported buffer compression: " + buffer.type, stack_info=True)
+						self.report(STFReport("Unsupported buffer compression: " + buffer.type, severity=STFReportSeverity.Error))
+					case _:
+						_logger.fatal("Invalid buffer type: " + buffer.type, stack_info=True)
+						self.report(STFReport("Invalid buffer type: " + buffer.type, severity=STFReportSeverity.FatalError))
 		return None
 
+	def release_buffer(self, stf_id: str):
+		if(buffer := self._file.definition.buffers.get(stf_id)):
+			if(buffer.type.startswith("stf.buffer.included")):
+				self._file.release_buffer(buffer.index)
+			self._decoded_buffers.pop(stf_id, None)
+
 
 	def determine_property_resolution_handler(self, stf_id: str) -> STF_HandlerBase | None:
 		if(json_resource := self.get_json_resource(stf_id)):
@@ -0,0 +1,59 @@
+import zlib
+
+try:
+	from compression import zstd # Python 3.14+
+except ImportError:
+	zstd = None
+
+__all__ = ["buffer_type_included", "buffer_type_included_zlib", "buffer_type_included_zstd", "compress_buffer", "decompress_buffer"]
+
+
+buffer_type_included = "stf.buffer.included"
+buffer_type_included_zlib = "stf.buffer.included.zlib"
+buffer_type_included_zstd = "stf.buffer.included.zstd"
+
+# Smaller buffers are not worth the overhead
+min_compression_size = 4096
+# A quick compression of this many leading bytes decides if compressing the entire buffer is worth it
+sample_size = 65536
+# Keep the buffer uncompressed, unless it shrinks to this fraction of its size
+max_compression_ratio = 0.9
+
+
+def compress_buffer(data: bytes | memoryview) -> tuple[bytes | memoryview, str]:
+	"""
+	Compress a buffer if it's large enough and compresses well, i.e. mesh and animation data, but not already compressed image files.
+	Both zstd and zlib release the GIL while compressing, so this scales when called from multiple threads.
+
+	:return: The buffer data and its STF buffer type.
+	"""
+	if(len(data) < min_compression_size):
+		return data, buffer_type_included
+
+	sample = memoryview(data)[:sample_size]
+	if(len(zlib.compress(sample, 1)) > len(sample) * max_compression_ratio):
+		return data, buffer_type_included
+
+	# let compressed, buffer_type
+	if(zstd):
+		compressed = zstd.compress(data)
+		buffer_type = buffer_type_included_zstd
+	else:
+		compressed = zlib.compress(data)
+		buffer_type = buffer_type_included_zlib
+
+	if(len(compressed) > len(data) * max_compression_ratio):
+		return data, buffer_type_included
+	return compressed, buffer_type
+
+
+def decompress_buffer(data: bytes | memoryview, buffer_type: str) -> bytes | memoryview | None:
+	"""Returns None if the compression isn't supported by this Python version"""
+	match(buffer_type):
+		case "stf.buffer.included":
+			return data
+		case "stf.buffer.included.zlib":
+			return zlib.decompress(data)
+		case "stf.buffer.included.zstd":
+			return zstd.decompress(data) if zstd else None
+	return None
@@ -2,9 +2,12 @@
 
 import io
 import json
+import mmap
+from typing import IO
 
 from ...stfblender_common import STF_JsonDefinition
 from ...stfblender_common.utils import buffer_utils
+from .stf_json import encode_json
 
 __all__ = ["STF_File"]
 
@@ -19,13 +22,18 @@ class STF_File:
 		self.binary_version: int = 0
 		self.padding_future_use: int = 0
 		self.definition: STF_JsonDefinition = STF_JsonDefinition()
-		self.buffers_included: list[bytes] = []
+		self.buffers_included: list[bytes | memoryview] = []
 		self.filename: str = ""
 
+		self._memory_map: mmap.mmap | None = None
+		self._memory_map_view: memoryview | None = None
+		self._buffer_offsets: list[int] = []
+
 	@staticmethod
-	def parse(buffer: io.BufferedReader):
+	def parse(buffer: io.BufferedReader, memory_map: bool = False):
 		"""
 		:param io.BufferedReader buffer: The `.stf` as it was read from disk.
+		:param bool memory_map: Don't read the included buffers, but map the file into memory. Buffers will be `memoryview` slices, which are only loaded once accessed. Call `close()` once done.
 		"""
 		ret = STF_File()
 		ret.filename = buffer.name
@@ -57,14 +65,85 @@ class STF_File:
 		ret.definition = STF_JsonDefinition.from_dict(json.loads(buffer.read(json_buffer_len).decode("utf-8")))
 
 		# Read all other buffers
-		for buffer_idx in range(0, num_buffers):
-			ret.buffers_included.append(buffer.read(buffer_lens[buffer_idx]))
+		if(memory_map):
+			buffer_ranges: list[tuple[int, int]] = []
+			offset = buffer.tell()
+			for buffer_idx in range(0, num_buffers):
+				buffer_ranges.append((offset, buffer_lens[buffer_idx]))
+				offset += buffer_lens[buffer_idx]
+			if(not ret.map_buffers(buffer, buffer_ranges)):
+				raise ImportError("Invalid buffer length, the file is truncated!")
+		else:
+			for buffer_idx in range(0, num_buffers):
+				ret.buffers_included.append(buffer.read(buffer_lens[buffer_idx]))
 
 		return ret
 
-	def serialize(self, buffer: io.BufferedWriter):
+	def map_buffers(self, file: IO[bytes], buffer_ranges: list[tuple[int, int]]) -> bool:
+		"""
+		Include buffers from a file without reading them. Call `close()` once done.
+
+		:param IO[bytes] file: File containing the buffers.
+		:param list[tuple[int, int]] buffer_ranges: Offset and length of each buffer within the file.
+		:return: False if a buffer exceeds the file.
+		"""
+		file.seek(0, io.SEEK_END)
+		file_len = file.tell()
+		for offset, length in buffer_ranges:
+			if(offset + length > file_len): return False
+
+		if(file_len > 0): # Empty files can't be mapped
+			self._memory_map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+			self._memory_map_view = memoryview(self._memory_map)
+		for offset, length in buffer_ranges:
+			self._buffer_offsets.append(offset)
+			self.buffers_included.append(self._memory_map_view[offset : offset + length] if self._memory_map_view is not None else b"")
+		return True
+
+	def release_buffer(self, buffer_idx: int):
+		"""
+		Hint that an included buffer is not needed anymore.
+		A memory-mapped buffer gets dropped from memory, and is loaded from the file again if it's accessed afterwards.
+		"""
+		if(self._memory_map is None or not hasattr(mmap, "MADV_DONTNEED")): return
+		start = self._buffer_offsets[buffer_idx]
+		start_page = start - start % mmap.PAGESIZE
+		length = start + len(self.buffers_included[buffer_idx]) - start_page
+		if(length > 0):
+			self._memory_map.madvise(mmap.MADV_DONTNEED, start_page, length)
+
+	def close(self):
+		"""Close the memory-map, if the buffers were mapped instead of read."""
+		if(self._memory_map is None): return
+		# Release every view, even if some are still referenced elsewhere
+		released = True
+		for view in self.buffers_included + [self._memory_map_view]:
+			if(type(view) is memoryview):
+				try:
+					view.release()
+				except BufferError:
+					released = False
+		if(released):
+			try:
+				self._memory_map.close()
+			except BufferError:
+				released = False
+		if(not released):
+			return # Something still references a buffer. Keep the mapping, so a later close() can try again.
+		self._memory_map = None
+		self._memory_map_view = None
+
+	def encode_definition(self, compact: bool = False, indent: str | None = None) -> bytes:
+		"""
+		:param bool compact: Write the JSON definition without whitespace.
+		:param str | None indent: Indentation for each nesting level, when not compact.
+		"""
+		return encode_json(self.definition.to_dict(), compact, indent)
+
+	def serialize(self, buffer: io.BufferedWriter, definition_buffer: bytes | None = None):
 		"""
 		:param io.BufferedWriter buffer: The buffer to which an `.stf` file containing this classes data will be written.
+		:param bytes | None definition_buffer: The already encoded JSON definition, as returned by `encode_definition()`.
 		"""
 		# Serialize Magic number
 		buffer.write("STF0".encode("ascii"))
@@ -78,7 +157,8 @@ class STF_File:
 		buffer.write(buffer_utils.serialize_uint(num_buffers + 1, 4)) # +1 for the Json definition buffer
 
 		# Convert Json definition to buffer
-		definition_buffer = json.dumps(self.definition.to_dict()).encode(encoding="utf-8")
+		if(definition_buffer is None):
+			definition_buffer = self.encode_definition()
 
 		# Serialize length of Json definition buffer
 		buffer.write(buffer_utils.serialize_uint(len(definition_buffer), 8))
@@ -93,3 +173,4 @@ class STF_File:
 		# Serialize all other buffers
 		for buffer_idx in range(0, num_buffers):
 			buffer.write(self.buffers_included[buffer_idx])
+			self.release_buffer(buffer_idx)
@@ -0,0 +1,47 @@
+import json
+import math
+from typing import Any
+
+try:
+	import orjson # pyright: ignore[reportMissingImports]
+except ImportError:
+	orjson = None
+
+__all__ = ["encode_json"]
+
+
+def _replace_non_finite(data: Any) -> Any:
+	"""NaN and Infinity aren't valid JSON. Replace them with null, like orjson does."""
+	if(isinstance(data, float)):
+		# Also numpy floats, which subclass float
+		return float(data) if math.isfinite(data) else None
+	if(isinstance(data, dict)):
+		return {key: _replace_non_finite(value) for key, value in data.items()}
+	if(isinstance(data, (list, tuple))):
+		return [_replace_non_finite(value) for value in data]
+	return data
+
+
+def _dumps(data: Any, **kwargs) -> str:
+	try:
+		return json.dumps(data, allow_nan=False, **kwargs)
+	except ValueError:
+		return json.dumps(_replace_non_finite(data), allow_nan=False, **kwargs)
+
+
+def encode_json(data: Any, compact: bool = False, indent: str | None = None) -> bytes:
+	"""
+	Encode the JSON definition of an STF file as UTF-8.
+	In compact mode no whitespace is written, and orjson is used if it's installed into Blender's Python.
+	NaN and Infinity values are written as null in every mode.
+
+	:param str | None indent: Indentation for each nesting level, when not in compact mode.
+	"""
+	if(compact):
+		if(orjson):
+			try:
+				return orjson.dumps(data)
+			except (orjson.JSONEncodeError, TypeError):
+				pass # i.e. integers beyond 64 bit, which the json module can still handle
+		return _dumps(data, separators=(",", ":"), ensure_ascii=False).encode(encoding="utf-8")
+	return _dumps(data, indent=indent).encode(encoding="utf-8")
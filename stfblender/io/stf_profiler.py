@@ -0,0 +1,110 @@
+import csv
+import json
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+__all__ = ["STF_ProfileEntry", "STF_Profiler"]
+
+
+class STF_ProfileEntry:
+	def __init__(self, category: str, key: str):
+		self.category: str = category
+		self.key: str = key
+		self.count: int = 0
+		self.time: float = 0 # Wall time including nested measurements
+		self.self_time: float = 0 # Wall time excluding nested measurements
+		self.bytes: int = 0 # Size of buffers produced or consumed
+
+	def to_dict(self) -> dict:
+		return {"category": self.category, "key": self.key, "count": self.count, "time": self.time, "self_time": self.self_time, "bytes": self.bytes}
+
+
+class _Frame:
+	def __init__(self, profiler: "STF_Profiler", keys: list[tuple[str, str]]):
+		self.profiler: STF_Profiler = profiler
+		self.keys: list[tuple[str, str]] = keys
+		self.child_time: float = 0
+		self.bytes: int = 0
+		self.duration: float | None = None # Set once the measurement is finished
+
+	def add_key(self, category: str, key: str):
+		"""I.e. the resource ID, which is only known once the handler has run. Can be called after the measurement is finished."""
+		if((category, key) not in self.keys):
+			self.keys.append((category, key))
+			if(self.duration is not None):
+				self.profiler._record(self, category, key)
+
+
+class STF_Profiler:
+	"""
+	Records wall time, call count and buffer sizes per category and key, i.e. per handler `stf_type` and per resource ID.
+	Measurements can be nested. The time of nested measurements is excluded from the `self_time` of the outer one.
+	"""
+
+	csv_fields = ["category", "key", "count", "time", "self_time", "bytes"]
+
+	def __init__(self):
+		self._entries: dict[tuple[str, str], STF_ProfileEntry] = {}
+		self._stack: list[_Frame] = []
+
+	def _get_entry(self, category: str, key: str) -> STF_ProfileEntry:
+		if((category, key) not in self._entries):
+			self._entries[(category, key)] = STF_ProfileEntry(category, key)
+		return self._entries[(category, key)]
+
+	def _record(self, frame: _Frame, category: str, key: str):
+		entry = self._get_entry(category, key)
+		entry.count += 1
+		entry.time += frame.duration
+		entry.self_time += frame.duration - frame.child_time
+		entry.bytes += frame.bytes
+
+	@contextmanager
+	def measure(self, *keys: tuple[str, str]) -> Iterator[_Frame]:
+		frame = _Frame(self, list(keys))
+		self._stack.append(frame)
+		time_start = time.perf_counter()
+		try:
+			yield frame
+		finally:
+			frame.duration = time.perf_counter() - time_start
+			self._stack.pop()
+			if(len(self._stack) > 0):
+				self._stack[-1].child_time += frame.duration
+			for category, key in frame.keys:
+				self._record(frame, category, key)
+
+	def add_bytes(self, num_bytes: int):
+		"""Attribute buffer data to the innermost running measurement."""
+		if(len(self._stack) > 0):
+			self._stack[-1].bytes += num_bytes
+
+	def current_keys(self) -> list[tuple[str, str]]:
+		"""Keys of the innermost running measurement, so deferred tasks can be attributed to what created them. Keys added to the measurement later will show up in the returned list."""
+		return self._stack[-1].keys if len(self._stack) > 0 else []
+
+	def get_entries(self, category: str | None = None) -> list[STF_ProfileEntry]:
+		return [entry for entry in self._entries.values() if category is None or entry.category == category]
+
+	def get_top(self, num: int = 10, category: str | None = None) -> list[STF_ProfileEntry]:
+		"""The entries with the most `self_time`"""
+		return sorted(self.get_entries(category), key=lambda entry: entry.self_time, reverse=True)[:num]
+
+	def format_top(self, num: int = 10, category: str | None = None) -> list[str]:
+		return ["%s %s: %.3f sec. (%d calls, %.3f sec. total, %d bytes)" % (entry.category, entry.key, entry.self_time, entry.count, entry.time, entry.bytes) for entry in self.get_top(num, category)]
+
+	def to_dict(self) -> dict:
+		return {"entries": [entry.to_dict() for entry in sorted(self._entries.values(), key=lambda entry: (entry.category, -entry.self_time))]}
+
+	def write(self, filepath: str):
+		"""Write the profile as `.json` or `.csv`, depending on the extension."""
+		if(filepath.endswith(".csv")):
+			with open(filepath, "w", newline="", encoding="utf-8") as file:
+				writer = csv.DictWriter(file, fieldnames=self.csv_fields)
+				writer.writeheader()
+				for entry in self.to_dict()["entries"]:
+					writer.writerow(entry)
+		else:
+			with open(filepath, "w", encoding="utf-8") as file:
+				json.dump(self.to_dict(), file, indent="\t")
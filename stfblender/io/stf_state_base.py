@@ -2,16 +2,23 @@ import sys
 from typing import Callable
 
 from ...stfblender_common.base import STF_TaskSteps, STFReportSeverity, STFException, STFReport
+from .stf_profiler import STF_Profiler
 
 __all__ = ["STF_State_Base"]
 
+def _get_task_keys(creator_keys: list[tuple[str, str]]) -> list[tuple[str, str]]:
+	"""Attribute a task to the handler and resource that created it. A task created by another task is attributed to the same ones, not to a further suffixed category."""
+	return [(category.removesuffix("_task") + "_task", key) for category, key in creator_keys if category != "task_step"]
+
+
 class STF_State_Base:
 	def __init__(self, fail_on_severity: STFReportSeverity = STFReportSeverity.FatalError):
-		self._tasks: dict[int, list[Callable]] = {}
+		self._tasks: dict[int, list[tuple[Callable, list[tuple[str, str]]]]] = {} # step -> tasks, and the profiler keys of what created them
 		self._cleanup_tasks: list[Callable] = []
 		self._reports: list[STFReport] = []
 		self._fail_on_severity: STFReportSeverity = fail_on_severity
 		self._current_task_step: int = 0
+		self._profiler: STF_Profiler = STF_Profiler()
 
 	def report(self, report: STFReport):
 		self._reports.append(report)
@@ -23,11 +30,18 @@ class STF_State_Base:
 		step = int(step)
 		if(step < self._current_task_step): step = self._current_task_step
 		if(step not in self._tasks): self._tasks[step] = []
-		self._tasks[step].append(task)
+		# The keys of the creating measurement, which may still get its resource ID added. They are copied once the task runs.
+		self._tasks[step].append((task, self._profiler.current_keys()))
 
 	def add_cleanup_task(self, task: Callable):
 		self._cleanup_tasks.append(task)
 
+	def __get_task_step_name(self, step: int) -> str:
+		try:
+			return STF_TaskSteps(step).name
+		except ValueError:
+			return str(step)
+
 	def run_tasks(self):
 		last_taskstep: int = -1
 
@@ -43,13 +57,14 @@ class STF_State_Base:
 
 		while(task_step := get_next_step()):
 			self._current_task_step = task_step
-			task = self._tasks[task_step]
+			task_step_key = ("task_step", self.__get_task_step_name(task_step))
 			max_iterations = 1000
 			while(len(self._tasks) > 0 and max_iterations > 0):
 				taskset = self._tasks[task_step]
 				self._tasks[task_step] = []
-				for task in taskset:
-					task()
+				for task, task_keys in taskset:
+					with self._profiler.measure(task_step_key, *_get_task_keys(task_keys)):
+						task()
 				max_iterations -= 1
 			if(len(self._tasks[task_step]) > 0):
 				self.report(STFReport(message="Task Recursion", severity=STFReportSeverity.FatalError))
@@ -61,7 +76,8 @@ class STF_State_Base:
 			taskset = self._cleanup_tasks
 			self._cleanup_tasks = []
 			for task in taskset:
-				task()
+				with self._profiler.measure(("task_step", "cleanup")):
+					task()
 			max_iterations -= 1
 		if(len(self._cleanup_tasks) > 0):
 			self.report(STFReport(message="Task Recursion", severity=STFReportSeverity.FatalError))
@@ -4,7 +4,7 @@ import bpy
 from .....stfblender_common import STF_Category, STF_ImportContext, STF_ExportContext, STF_Handler_ComponentHolder, STF_Handler_BlenderNative, STFReport, boilerplate_register, boilerplate_unregister, get_components_from_object
 from .....stfblender_common.helpers import draw_slot_link_warning
 from .....stfblender_common.slot_link import ActionSlotLink, get_slot_link_data_model_version, get_slot_link_version
-from .stf_animation_bake import STFBakeAnimationOperator
+from .stf_animation_bake import STFBakeAnimationOperator, STFClearBakeCacheOperator
 from .stf_animation_common import stf_animation_type
 from .stf_animation_export import stf_animation_export
 from .stf_animation_import import stf_animation_import
@@ -17,6 +17,7 @@ class STF_Animation(bpy.types.PropertyGroup):
 	fps: bpy.props.FloatProperty(name="FPS", default=30, options=set())
 	is_baked_from: bpy.props.PointerProperty(name="Is Baked From", type=bpy.types.Action)
 	constraint_bake: bpy.props.EnumProperty(name="Constraint-Baking", items=(("auto", "Automatic", ""), ("bake", "Bake", ""), ("nobake", "Don't Bake", "")), default="auto")
+	bake_hash: bpy.props.StringProperty(name="Bake Hash", default="", options=set()) # Set on cached bakes, the hash of everything the bake depends on
 
 
 class Handler_STF_Animation(STF_Handler_BlenderNative, STF_Handler_ComponentHolder):
@@ -49,7 +50,9 @@ class Handler_STF_Animation(STF_Handler_BlenderNative, STF_Handler_ComponentHold
 
 			layout.prop(context.active_action.stf_animation, "constraint_bake")
 			if(context.active_action.stf_animation.constraint_bake != "nobake"):
-				layout.operator(STFBakeAnimationOperator.bl_idname)
+				row = layout.row()
+				row.operator(STFBakeAnimationOperator.bl_idname)
+				row.operator(STFClearBakeCacheOperator.bl_idname)
 
 	@classmethod
 	def import_resource(cls, context: STF_ImportContext, json_resource: dict, stf_id: str, context_resource: Any) -> Any | STFReport:
@@ -1,70 +1,387 @@
 # pyright: reportCallIssue=false
 
+import hashlib
+from typing import Any
 import bpy
-from bpy_extras import anim_utils
+import mathutils
+import numpy as np
 
+from .....stfblender_common.slot_link.slot_link import ensure_first_slot_link_target, get_slot_link_targets
 
-def bake_constraints(action: bpy.types.Action) -> bpy.types.Action:
+
+# Baked keyframes which differ from both neighbours by less than this are removed, like with the `do_clean` option of Blender's own bake
+_clean_threshold = 0.0001
+
+# Increase whenever the output of `bake_constraints()` changes, so bakes cached by earlier versions are not reused
+_bake_cache_version = 2
+
+_rotation_data_paths = {
+	"QUATERNION": "rotation_quaternion",
+	"AXIS_ANGLE": "rotation_axis_angle",
+}
+
+
+class _BakeTarget:
+	"""An object animated by the action being baked. It gets sampled on every frame, and its baked keyframes go into their own slot."""
+
+	def __init__(self, blender_object: bpy.types.Object, slot_handle: int, datablock_index: int):
+		self.blender_object: bpy.types.Object = blender_object
+		self.slot_handle: int = slot_handle
+		self.datablock_index: int = datablock_index
+		self.object_matrices: list[mathutils.Matrix] = []
+		self.bone_matrices: dict[str, list[mathutils.Matrix]] = {bone_name: [] for bone_name in blender_object.pose.bones.keys()} if blender_object.pose else {}
+
+	def sample(self, depsgraph: bpy.types.Depsgraph):
+		"""Store the visual transforms of the object and its pose bones, relative to their parents."""
+		evaluated: bpy.types.Object = self.blender_object.evaluated_get(depsgraph)
+		if(evaluated.parent):
+			self.object_matrices.append((_get_parent_matrix(evaluated) @ evaluated.matrix_parent_inverse).inverted_safe() @ evaluated.matrix_world)
+		else:
+			self.object_matrices.append(evaluated.matrix_world.copy())
+		if(evaluated.pose):
+			for bone_name, pose_bone in evaluated.pose.bones.items():
+				if(bone_name in self.bone_matrices):
+					self.bone_matrices[bone_name].append(evaluated.convert_space(pose_bone=pose_bone, matrix=pose_bone.matrix, from_space="POSE", to_space="LOCAL"))
+
+
+def _get_parent_matrix(evaluated: bpy.types.Object) -> mathutils.Matrix:
+	parent = evaluated.parent
+	if(evaluated.parent_type == "BONE" and parent.pose and evaluated.parent_bone in parent.pose.bones):
+		# Children of a bone are relative to its tail
+		pose_bone = parent.pose.bones[evaluated.parent_bone]
+		return parent.matrix_world @ pose_bone.matrix @ mathutils.Matrix.Translation((0, pose_bone.length, 0))
+	return parent.matrix_world
+
+
+def _gather_targets(action: bpy.types.Action) -> list[_BakeTarget]:
+	slots = {slot.handle: slot for slot in action.slots}
+	ret: list[_BakeTarget] = []
+	for slotlink in action.slot_link.links:
+		slot = slots.get(slotlink.slot_handle)
+		if(not slot or slot.target_id_type != "OBJECT"):
+			continue
+		for link_target in get_slot_link_targets(slotlink):
+			if(type(link_target.target) is bpy.types.Object):
+				ret.append(_BakeTarget(link_target.target, slotlink.slot_handle, link_target.datablock_index))
+	return ret
+
+
+def _get_bake_frames(action: bpy.types.Action) -> range:
+	animation_range = [int(action.frame_start), int(action.frame_end)] if action.use_frame_range else [int(action.frame_range[0]), int(action.frame_range[1])]
+	if(animation_range[1] <= animation_range[0]): animation_range[1] = animation_range[0] + 1
+	return range(animation_range[0], animation_range[1])
+
+
+def _split_passes(targets: list[_BakeTarget]) -> list[list[_BakeTarget]]:
+	"""An object can only have one action slot assigned at a time. Objects targeted by multiple slots are sampled in additional passes."""
+	ret: list[list[_BakeTarget]] = []
+	for target in targets:
+		for bake_pass in ret:
+			if(all(other.blender_object != target.blender_object for other in bake_pass)):
+				bake_pass.append(target)
+				break
+		else:
+			ret.append([target])
+	return ret
+
+
+def _sample_pass(action: bpy.types.Action, targets: list[_BakeTarget], frames: range):
+	original_assignments = []
+	for target in targets:
+		if(not target.blender_object.animation_data):
+			target.blender_object.animation_data_create()
+		original_assignments.append((target.blender_object.animation_data.action, target.blender_object.animation_data.action_slot_handle))
+		target.blender_object.animation_data.action = action
+		target.blender_object.animation_data.action_slot_handle = target.slot_handle
+	try:
+		# Evaluate the scene once per frame, for all targets
+		for frame in frames:
+			bpy.context.scene.frame_set(frame)
+			depsgraph = bpy.context.evaluated_depsgraph_get()
+			for target in targets:
+				target.sample(depsgraph)
+	finally:
+		for target, (original_action, original_slot) in zip(targets, original_assignments):
+			target.blender_object.animation_data.action = original_action
+			target.blender_object.animation_data.action_slot_handle = original_slot
+
+
+def _decompose(matrices: list[mathutils.Matrix], rotation_mode: str) -> dict[str, np.ndarray]:
+	"""Split the sampled matrices into location, rotation and scale values, with one row per frame."""
+	locations = np.zeros((len(matrices), 3), dtype=np.float64)
+	rotations = np.zeros((len(matrices), 3 if rotation_mode not in _rotation_data_paths else 4), dtype=np.float64)
+	scales = np.zeros((len(matrices), 3), dtype=np.float64)
+	previous_euler = None
+	for index, matrix in enumerate(matrices):
+		location, quaternion, scale = matrix.decompose()
+		locations[index] = location
+		scales[index] = scale
+		if(rotation_mode == "QUATERNION"):
+			rotations[index] = quaternion
+		elif(rotation_mode == "AXIS_ANGLE"):
+			axis, angle = quaternion.to_axis_angle()
+			rotations[index] = (angle, *axis)
+		else:
+			# Keep eulers close to the previous frame, so they don't jump by full turns
+			previous_euler = quaternion.to_euler(rotation_mode, previous_euler) if previous_euler else quaternion.to_euler(rotation_mode)
+			rotations[index] = previous_euler
+	if(rotation_mode == "QUATERNION" and len(rotations) > 1):
+		# Flip quaternions into the same hemisphere as the previous frame, so they interpolate the short way
+		signs = np.cumprod(np.where(np.sum(rotations[1:] * rotations[:-1], axis=1) < 0, -1.0, 1.0))
+		rotations[1:] *= signs[:, None]
+	return {"location": locations, _rotation_data_paths.get(rotation_mode, "rotation_euler"): rotations, "scale": scales}
+
+
+def _clean_keyframes(column: np.ndarray) -> np.ndarray:
+	"""
+	Which keyframes to keep, the same way the `do_clean` option of Blender's own bake removes them one at a time.
+	A keyframe is compared to the last kept one before it, so slow but steady changes are kept.
+	"""
+	keep = np.ones(len(column), dtype=bool)
+	values = column.tolist()
+	previous_value = values[0] if len(values) > 0 else 0
+	for index in range(1, len(values) - 1):
+		if(abs(values[index] - previous_value) + abs(values[index] - values[index + 1]) < _clean_threshold):
+			keep[index] = False
+		else:
+			previous_value = values[index]
+	return keep
+
+
+def _write_fcurves(channelbag: bpy.types.ActionChannelbag, data_path_prefix: str, values_by_data_path: dict[str, np.ndarray], frames: np.ndarray):
+	"""Create all keyframes of an FCurve at once, instead of inserting them one by one."""
+	for data_path, values in values_by_data_path.items():
+		for array_index in range(values.shape[1]):
+			column = values[:, array_index]
+			keep = _clean_keyframes(column)
+			fcurve = channelbag.fcurves.new(data_path_prefix + data_path, index=array_index)
+			fcurve.keyframe_points.add(int(np.count_nonzero(keep)))
+			fcurve.keyframe_points.foreach_set("co", np.ravel(np.column_stack([frames[keep], column[keep]])).astype(np.float32))
+			fcurve.update()
+
+
+def bake_constraints(action: bpy.types.Action, restore_frame: bool = True) -> bpy.types.Action:
+	"""
+	Bake the visual transforms of all objects and pose bones the action animates into a new action.
+	The frame range is stepped through once, and all targets are sampled on each frame.
+
+	:param bool restore_frame: Set the scene back to its current frame afterwards. When baking many actions, this can be done once at the end.
+	"""
 	ret = bpy.data.actions.new(action.name + "_baked")
 	ret.stf_animation.is_baked_from = action
 	ret.stf_animation.exclude = True
 	ret.stf_animation.constraint_bake = "nobake"
 	ret.use_cyclic = action.use_cyclic
 
-	animation_range = [int(action.frame_start), int(action.frame_end)] if action.use_frame_range else [int(action.frame_range[0]), int(action.frame_range[1])]
-	if(animation_range[1] <= animation_range[0]): animation_range[1] = animation_range[0] + 1
+	frames = _get_bake_frames(action)
 
-	for slotlink in action.slot_link.links:
-		if(slotlink.target):
-			for slot in action.slots:
-				if(slot.handle == slotlink.slot_handle):
-					break
-			else:
-				continue
-			if(slot.target_id_type != "OBJECT"):
-				continue
-
-			if(not slotlink.target.animation_data):
-				slotlink.target.animation_data_create()
-			original_action = slotlink.target.animation_data.action
-			original_slot = slotlink.target.animation_data.action_slot_handle
-
-			slotlink.target.animation_data.action = action
-			slotlink.target.animation_data.action_slot_handle = slotlink.slot_handle
-
-			anim_utils.bake_action(slotlink.target, action=ret, frames=range(animation_range[0], animation_range[1]), bake_options=anim_utils.BakeOptions( # pyright: ignore[reportArgumentType]
-				only_selected=False,
-				do_pose=True,
-				do_object=True,
-				do_visual_keying=True,
-				do_constraint_clear=False,
-				do_parents_clear=False,
-				do_clean=True,
-				do_location=True,
-				do_rotation=True,
-				do_scale=True,
-				do_bbone=True,
-				do_custom_props=True
-			))
-
-			for ret_slot in ret.slots:
-				for ret_slotlink in ret.slot_link.links:
-					if(ret_slot.handle == ret_slotlink.slot_handle):
-						break
-				else:
-					new_slotlink = ret.slot_link.links.add()
-					new_slotlink.slot_handle = ret_slot.handle
-					new_slotlink.target = slotlink.target
-					new_slotlink.datablock_index = slotlink.datablock_index
-
-			slotlink.target.animation_data.action = original_action
-			slotlink.target.animation_data.action_slot_handle = original_slot
-
-	bpy.context.scene.frame_set(bpy.context.scene.frame_current)
+	frame_current = bpy.context.scene.frame_current
+	targets = _gather_targets(action)
+	try:
+		for bake_pass in _split_passes(targets):
+			_sample_pass(action, bake_pass, frames)
+	finally:
+		if(restore_frame):
+			bpy.context.scene.frame_set(frame_current)
+
+	layer = ret.layers.new("stf_layer")
+	strip: bpy.types.ActionKeyframeStrip = layer.strips.new(type="KEYFRAME") # pyright: ignore[reportAssignmentType]
+	frame_values = np.array(frames, dtype=np.float64)
+	for target in targets:
+		slot = ret.slots.new("OBJECT", target.blender_object.name) # pyright: ignore[reportArgumentType]
+		slotlink = ret.slot_link.links.add()
+		slotlink.slot_handle = slot.handle
+		link_target = ensure_first_slot_link_target(slotlink)
+		link_target.target = target.blender_object
+		link_target.datablock_index = target.datablock_index
+
+		channelbag = strip.channelbags.new(slot)
+		_write_fcurves(channelbag, "", _decompose(target.object_matrices, target.blender_object.rotation_mode), frame_values)
+		for bone_name, matrices in target.bone_matrices.items():
+			_write_fcurves(channelbag, "pose.bones[\"" + bpy.utils.escape_identifier(bone_name) + "\"].", _decompose(matrices, target.blender_object.pose.bones[bone_name].rotation_mode), frame_values)
 
 	return ret
 
 
+def _hash_value(digest: Any, value: Any):
+	if(isinstance(value, bpy.types.ID)):
+		value = (type(value).__name__, value.name, value.library.filepath if value.library else None)
+	elif(isinstance(value, set)):
+		value = sorted(value)
+	elif(hasattr(value, "__len__") and not isinstance(value, str)):
+		# Vectors, matrices and property arrays
+		value = np.array(value, dtype=np.float64).tobytes()
+	digest.update(repr(value).encode(encoding="utf-8"))
+
+
+def _hash_struct(digest: Any, struct: bpy.types.bpy_struct, referenced_objects: list[bpy.types.Object], visited: set[int] | None = None):
+	"""Hash all settings of i.e. a constraint, including nested structs. Objects it references get collected, to hash their transforms as well."""
+	if(visited is None): visited = set()
+	if(struct.as_pointer() in visited):
+		_hash_value(digest, "visited")
+		return
+	visited.add(struct.as_pointer())
+
+	_hash_value(digest, struct.bl_rna.identifier)
+	for rna_property in struct.bl_rna.properties:
+		# Read-only values are either covered by the type, or evaluation results which change from frame to frame
+		if(rna_property.identifier == "rna_type" or (rna_property.is_readonly and rna_property.type not in ("COLLECTION", "POINTER"))):
+			continue
+		value = getattr(struct, rna_property.identifier)
+		if(rna_property.type == "COLLECTION"):
+			for item in value:
+				_hash_struct(digest, item, referenced_objects, visited)
+		elif(rna_property.type == "POINTER"):
+			if(isinstance(value, bpy.types.ID) or value is None):
+				_hash_value(digest, value)
+				if(type(value) is bpy.types.Object and value not in referenced_objects):
+					referenced_objects.append(value)
+			else:
+				_hash_struct(digest, value, referenced_objects, visited)
+		else:
+			_hash_value(digest, value)
+
+
+def _hash_fcurve(digest: Any, fcurve: bpy.types.FCurve):
+	_hash_value(digest, (fcurve.data_path, fcurve.array_index, fcurve.mute, fcurve.extrapolation, [modifier.type for modifier in fcurve.modifiers]))
+	keyframe_points = fcurve.keyframe_points
+	for attribute, num_components, dtype in [("co", 2, np.float32), ("handle_left", 2, np.float32), ("handle_right", 2, np.float32), ("interpolation", 1, np.int32), ("easing", 1, np.int32)]:
+		values = np.zeros(len(keyframe_points) * num_components, dtype=dtype)
+		keyframe_points.foreach_get(attribute, values)
+		digest.update(values.tobytes())
+
+
+def _get_channelbags(action: bpy.types.Action) -> list[bpy.types.ActionChannelbag]:
+	return [channelbag for layer in action.layers for strip in layer.strips if strip.type == "KEYFRAME" for channelbag in strip.channelbags] # pyright: ignore[reportAttributeAccessIssue]
+
+
+def _hash_fcurves(digest: Any, action: bpy.types.Action):
+	for channelbag in _get_channelbags(action):
+		_hash_value(digest, channelbag.slot_handle)
+		for fcurve in channelbag.fcurves:
+			_hash_fcurve(digest, fcurve)
+
+
+def _get_keyed_channels(action: bpy.types.Action | None, slot_handle: int) -> set[tuple[str, int]]:
+	"""The data paths and array indices the slot of the action animates"""
+	if(not action):
+		return set()
+	return {(fcurve.data_path, fcurve.array_index) for channelbag in _get_channelbags(action) if channelbag.slot_handle == slot_handle for fcurve in channelbag.fcurves}
+
+
+def _hash_unkeyed_channels(digest: Any, owner: bpy.types.Object | bpy.types.PoseBone, data_path_prefix: str, data_paths: list[str], keyed_channels: set[tuple[str, int]]):
+	"""Channels the action doesn't animate keep their current value while baking"""
+	for data_path in data_paths:
+		for array_index, value in enumerate(getattr(owner, data_path)):
+			if((data_path_prefix + data_path, array_index) not in keyed_channels):
+				_hash_value(digest, (data_path_prefix + data_path, array_index, value))
+
+
+def _hash_animation_data(digest: Any, blender_object: bpy.types.Object, referenced_objects: list[bpy.types.Object], hashed_animations: list[bpy.types.Action]):
+	"""Drivers and NLA tracks keep evaluating while the action being baked is assigned"""
+	animation_data = blender_object.animation_data
+	if(not animation_data):
+		return
+	_hash_value(digest, (animation_data.action_blend_type, animation_data.action_extrapolation, animation_data.action_influence, animation_data.use_nla, animation_data.use_tweak_mode))
+	for fcurve in animation_data.drivers:
+		_hash_fcurve(digest, fcurve)
+		_hash_struct(digest, fcurve.driver, referenced_objects)
+	for nla_track in animation_data.nla_tracks:
+		_hash_struct(digest, nla_track, referenced_objects)
+		for nla_strip in nla_track.strips:
+			if(nla_strip.action and nla_strip.action not in hashed_animations):
+				hashed_animations.append(nla_strip.action)
+				_hash_fcurves(digest, nla_strip.action)
+
+
+def _hash_object(digest: Any, blender_object: bpy.types.Object, referenced_objects: list[bpy.types.Object], hashed_animations: list[bpy.types.Action], keyed_channels: set[tuple[str, int]]):
+	"""
+	:param set[tuple[str, int]] keyed_channels: Transform channels the action evaluated while baking animates. These don't depend on the objects current transforms.
+	"""
+	_hash_value(digest, (blender_object, blender_object.parent, blender_object.parent_type, blender_object.parent_bone, blender_object.rotation_mode))
+	_hash_value(digest, blender_object.matrix_parent_inverse)
+	_hash_unkeyed_channels(digest, blender_object, "", ["location", _rotation_data_paths.get(blender_object.rotation_mode, "rotation_euler"), "scale", "delta_location", "delta_rotation_quaternion" if blender_object.rotation_mode in _rotation_data_paths else "delta_rotation_euler", "delta_scale"], keyed_channels)
+	if(blender_object.parent and blender_object.parent not in referenced_objects):
+		referenced_objects.append(blender_object.parent)
+	for constraint in blender_object.constraints:
+		_hash_struct(digest, constraint, referenced_objects)
+	_hash_animation_data(digest, blender_object, referenced_objects, hashed_animations)
+	if(blender_object.pose and type(blender_object.data) is bpy.types.Armature):
+		for bone in blender_object.data.bones:
+			_hash_value(digest, (bone.name, bone.parent.name if bone.parent else None, bone.use_connect, bone.use_inherit_rotation, bone.inherit_scale, bone.use_local_location, bone.use_relative_parent, bone.length))
+			_hash_value(digest, bone.matrix_local)
+		for pose_bone in blender_object.pose.bones:
+			_hash_value(digest, (pose_bone.name, pose_bone.rotation_mode))
+			_hash_unkeyed_channels(digest, pose_bone, "pose.bones[\"" + bpy.utils.escape_identifier(pose_bone.name) + "\"].", ["location", _rotation_data_paths.get(pose_bone.rotation_mode, "rotation_euler"), "scale"], keyed_channels)
+			for constraint in pose_bone.constraints:
+				_hash_struct(digest, constraint, referenced_objects)
+
+
+def compute_bake_hash(action: bpy.types.Action) -> str:
+	"""
+	A hash of everything a constraint bake of this action depends on.
+	That's its FCurves and frame range, its slot-link targets including the transforms the action doesn't animate, their constraints, drivers and NLA tracks, and all objects these reference, including their animations.
+	Values drivers read from other data-blocks, like custom properties, are not covered.
+	"""
+	digest = hashlib.sha256()
+	frames = _get_bake_frames(action)
+	_hash_value(digest, (_bake_cache_version, frames.start, frames.stop, action.use_cyclic))
+	_hash_fcurves(digest, action)
+
+	hashed_objects: list[bpy.types.Object] = []
+	hashed_animations: list[bpy.types.Action] = [action]
+	referenced_objects: list[bpy.types.Object] = []
+	for target in _gather_targets(action):
+		# An object targeted by several slots is baked once per slot, with different channels animated
+		_hash_value(digest, (target.slot_handle, target.datablock_index))
+		if(target.blender_object not in hashed_objects):
+			hashed_objects.append(target.blender_object)
+		_hash_object(digest, target.blender_object, referenced_objects, hashed_animations, _get_keyed_channels(action, target.slot_handle))
+
+	# Objects referenced by constraints, drivers and parenting can reference further objects in turn
+	index = 0
+	while(index < len(referenced_objects)):
+		blender_object = referenced_objects[index]
+		index += 1
+		if(blender_object in hashed_objects):
+			continue
+		hashed_objects.append(blender_object)
+		keyed_channels: set[tuple[str, int]] = set()
+		if(blender_object.animation_data and blender_object.animation_data.action):
+			referenced_action = blender_object.animation_data.action
+			keyed_channels = _get_keyed_channels(referenced_action, blender_object.animation_data.action_slot_handle)
+			_hash_value(digest, (referenced_action, blender_object.animation_data.action_slot_handle))
+			if(referenced_action not in hashed_animations):
+				hashed_animations.append(referenced_action)
+				_hash_fcurves(digest, referenced_action)
+		_hash_object(digest, blender_object, referenced_objects, hashed_animations, keyed_channels)
+	return digest.hexdigest()
+
+
+def find_cached_bake(action: bpy.types.Action, bake_hash: str) -> bpy.types.Action | None:
+	for candidate in bpy.data.actions:
+		if(candidate.stf_animation.is_baked_from == action and candidate.stf_animation.bake_hash == bake_hash):
+			return candidate
+	return None
+
+
+def store_cached_bake(action: bpy.types.Action, baked: bpy.types.Action, bake_hash: str):
+	"""Keep the baked action as a hidden action in the blend file, and remove older cached bakes of the same action."""
+	for candidate in list(bpy.data.actions):
+		if(candidate != baked and candidate.stf_animation.is_baked_from == action and candidate.stf_animation.bake_hash):
+			bpy.data.actions.remove(candidate)
+	baked.name = "." + action.name + "_baked" # Names starting with a dot are hidden from Blender's UI
+	baked.use_fake_user = True
+	baked.stf_animation.bake_hash = bake_hash
+
+
+def clear_bake_cache() -> int:
+	cached_bakes = [candidate for candidate in bpy.data.actions if candidate.stf_animation.is_baked_from and candidate.stf_animation.bake_hash]
+	for candidate in cached_bakes:
+		bpy.data.actions.remove(candidate)
+	return len(cached_bakes)
+
+
 class STFBakeAnimationOperator(bpy.types.Operator):
 	bl_idname = "stf.bake_animation"
 	bl_label = "Bake Animation"
@@ -80,3 +397,14 @@ class STFBakeAnimationOperator(bpy.types.Operator):
 	def execute(self, context: bpy.types.Context) -> set:
 		bake_constraints(context.active_action)  # pyright: ignore[reportArgumentType]
 		return {"FINISHED"}
+
+
+class STFClearBakeCacheOperator(bpy.types.Operator):
+	"""Remove the hidden constraint bakes kept from previous exports"""
+	bl_idname = "stf.clear_animation_bake_cache"
+	bl_label = "Clear Bake Cache"
+	bl_options = {"REGISTER", "UNDO"}
+
+	def execute(self, context: bpy.types.Context) -> set:
+		self.report({"INFO"}, "Removed %d cached bakes" % clear_bake_cache())
+		return {"FINISHED"}
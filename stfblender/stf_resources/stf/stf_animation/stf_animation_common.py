@@ -14,3 +14,28 @@ handle_type_to_blender = {
 	"aligned": "ALIGNED",
 	"auto": "AUTO_CLAMPED"
 }
+
+# Values of Blender's keyframe enums, as `foreach_get()` and `foreach_set()` use them
+blender_interpolation_values = {
+	"CONSTANT": 0,
+	"LINEAR": 1,
+	"BEZIER": 2,
+	"BACK": 3,
+	"BOUNCE": 4,
+	"CIRC": 5,
+	"CUBIC": 6,
+	"ELASTIC": 7,
+	"EXPO": 8,
+	"QUAD": 9,
+	"QUART": 10,
+	"QUINT": 11,
+	"SINE": 12,
+}
+
+blender_handle_type_values = {
+	"FREE": 0,
+	"AUTO": 1,
+	"VECTOR": 2,
+	"ALIGNED": 3,
+	"AUTO_CLAMPED": 4,
+}
@@ -0,0 +1,61 @@
+from typing import Callable
+import numpy as np
+
+
+# Random values to check a conversion against, with mixed signs so conversions which canonicalize signs, like quaternions, don't pass as affine
+_num_probes = 8
+_probe_tolerance = 1e-5
+
+
+def _convert_row(conversion_func: Callable, row: list[float]) -> list[float]:
+	return list(conversion_func(row))
+
+
+def _probe_affine(conversion_func: Callable, num_components: int) -> tuple[np.ndarray, np.ndarray] | None:
+	"""If the conversion is an affine transform, like an axis swap or a constant offset, return its matrix and offset."""
+	try:
+		offset = np.array(_convert_row(conversion_func, [0.0] * num_components), dtype=np.float64)
+		if(not np.all(np.isfinite(offset))): return None
+		matrix = np.empty((len(offset), num_components), dtype=np.float64)
+		for component in range(num_components):
+			basis = [0.0] * num_components
+			basis[component] = 1.0
+			column = np.array(_convert_row(conversion_func, basis), dtype=np.float64)
+			if(column.shape != offset.shape): return None
+			matrix[:, component] = column - offset
+
+		probes = np.random.default_rng(0).normal(0, 10, (_num_probes, num_components))
+		for probe in probes:
+			expected = np.array(_convert_row(conversion_func, probe.tolist()), dtype=np.float64)
+			if(expected.shape != offset.shape or not np.allclose(matrix @ probe + offset, expected, rtol=_probe_tolerance, atol=_probe_tolerance)):
+				return None
+		return matrix, offset
+	except Exception:
+		return None # Conversions may reject arbitrary values, i.e. a zero quaternion
+
+
+def axis_conversion_matrix(conversion_func: Callable[[list[float]], list[float]], num_components: int) -> np.ndarray:
+	"""The matrix of a conversion which only reorders, flips or scales components, like `convert_translation_to_stf`. Used to build `convert_array` variants."""
+	return np.array([_convert_row(conversion_func, basis) for basis in np.eye(num_components).tolist()], dtype=np.float64).T
+
+
+def vectorize_conversion(conversion_func: Callable[[list[float]], list[float]] | None, num_components: int) -> Callable[[np.ndarray], np.ndarray]:
+	"""
+	Turn a conversion of one value with `num_components` components into one that converts an array of shape (n, `num_components`) at once.
+
+	Conversions can provide their own array variant as a `convert_array` attribute.
+	Otherwise, if the conversion turns out to be affine, it's applied as a matrix. Only if neither works, it gets called for each value.
+	"""
+	if(not conversion_func):
+		return lambda values: values
+
+	if(convert_array := getattr(conversion_func, "convert_array", None)):
+		return convert_array
+
+	if(affine := _probe_affine(conversion_func, num_components)):
+		matrix, offset = affine
+		return lambda values: values @ matrix.T + offset
+
+	def _convert_rows(values: np.ndarray) -> np.ndarray:
+		return np.array([_convert_row(conversion_func, row) for row in values.tolist()], dtype=np.float64).reshape(len(values), -1)
+	return _convert_rows
@@ -1,17 +1,34 @@
-from io import BytesIO
+import time
 from typing import Any, Callable
 import bpy
+import numpy as np
 
 from .....stfblender_common import STF_ExportContext, STFReportSeverity, STFReport, STF_TaskSteps, ensure_stf_id
 from .....stfblender_common.slot_link import ActionSlotLink, SlotLinkTarget
 from .....stfblender_common.slot_link.slot_link import get_slot_link_data_model_version, get_slot_link_targets, get_slot_link_version
-from .....stfblender_common.utils.buffer_utils import serialize_float
+from .....stfblender_common.utils.buffer_utils import determine_pack_format_float
 from .stf_animation_common import *
-from .stf_animation_bake import bake_constraints
+from .stf_animation_bake import bake_constraints, compute_bake_hash, find_cached_bake, store_cached_bake
+from .stf_animation_conversion import vectorize_conversion
+from .stf_animation_keyframes import STF_Keyframes, encode_timepoints, interpolation_to_code, interpolation_unsupported, min_binary_keyframes, tangent_type_to_code
 
 
 _stf_type = stf_animation_type
 
+_constraint_bake_batch_key = "stf.animation.constraint_bake_batch"
+
+blender_interpolation_names = {value: name for name, value in blender_interpolation_values.items()}
+
+# Lookup tables from the values of Blender's keyframe enums to STF keyframe codes
+blender_interpolation_value_to_code = np.full(max(blender_interpolation_values.values()) + 1, interpolation_unsupported, dtype=np.uint8)
+for _blender_interpolation, _interpolation in [("CONSTANT", "constant"), ("LINEAR", "linear"), ("BEZIER", "bezier"), ("QUAD", "quadratic"), ("CUBIC", "cubic")]:
+	blender_interpolation_value_to_code[blender_interpolation_values[_blender_interpolation]] = interpolation_to_code[_interpolation]
+
+blender_handle_type_value_to_code = np.full(max(blender_handle_type_values.values()) + 2, tangent_type_to_code["split"], dtype=np.uint8)
+for _blender_handle_type, _handle_type in handle_type_to_stf.items():
+	if(_blender_handle_type in blender_handle_type_values):
+		blender_handle_type_value_to_code[blender_handle_type_values[_blender_handle_type]] = tangent_type_to_code[_handle_type]
+
 
 def stf_animation_export(context: STF_ExportContext, blender_resource: Any, context_resource: Any) -> tuple[dict, str] | STFReport:
 	blender_animation: bpy.types.Action = blender_resource
@@ -38,15 +55,6 @@ def stf_animation_export(context: STF_ExportContext, blender_resource: Any, cont
 	reference_holder = {}
 
 	stf_tracks, requires_constraint_bake = __convert(context, blender_animation, animation_range, reference_holder)
-	stf_tracks_baked = None
-	if(requires_constraint_bake and context.get_setting("stf_animation_bake_constraints") and blender_animation.stf_animation.constraint_bake != "nobake" or blender_animation.stf_animation.constraint_bake == "bake"):
-		baked = bake_constraints(blender_animation)
-		if(baked):
-			stf_tracks_baked, _ = __convert(context, baked, animation_range, reference_holder, True)
-			if(not context.get_setting("stf_animation_preserve_baked")):
-				def _clean_baked():
-					bpy.data.actions.remove(baked)
-				context.add_cleanup_task(_clean_baked)
 
 	if(len(stf_tracks) == 0):
 		return STFReport("Empty Animation", STFReportSeverity.Debug, None, _stf_type, blender_animation)
@@ -63,8 +71,14 @@ def stf_animation_export(context: STF_ExportContext, blender_resource: Any, cont
 		if("referenced_buffers" in reference_holder):
 			ret["referenced_buffers"] = reference_holder["referenced_buffers"]
 
-		if(stf_tracks_baked):
-			ret["tracks_baked"] = stf_tracks_baked
+		if(requires_constraint_bake and context.get_setting("stf_animation_bake_constraints") and blender_animation.stf_animation.constraint_bake != "nobake" or blender_animation.stf_animation.constraint_bake == "bake"):
+			def _handle_baked(baked: bpy.types.Action):
+				stf_tracks_baked, _ = __convert(context, baked, animation_range, reference_holder, True)
+				if(stf_tracks_baked):
+					ret["tracks_baked"] = stf_tracks_baked
+				if("referenced_buffers" in reference_holder):
+					ret["referenced_buffers"] = reference_holder["referenced_buffers"]
+			__queue_constraint_bake(context, blender_animation, _handle_baked)
 
 		def _handle_reset_animation():
 			if(action_slot_link.is_reset_animation):
@@ -76,6 +90,60 @@ def stf_animation_export(context: STF_ExportContext, blender_resource: Any, cont
 		return ret, blender_animation.stf_info.stf_id
 
 
+def __queue_constraint_bake(context: STF_ExportContext, blender_animation: bpy.types.Action, handle_baked: Callable[[bpy.types.Action], None]):
+	"""Actions which require a constraint bake are gathered, and baked in one task once the animations of the prefab have been exported."""
+	batch: dict[bpy.types.Action, Callable[[bpy.types.Action], None]] | None = context.get_cached(_constraint_bake_batch_key) # pyright: ignore[reportAttributeAccessIssue]
+	if(batch is None):
+		batch = {}
+		context.set_cached(_constraint_bake_batch_key, batch) # pyright: ignore[reportAttributeAccessIssue]
+		def _bake_batch():
+			# Animations exported after this point start a new batch
+			context.set_cached(_constraint_bake_batch_key, None) # pyright: ignore[reportAttributeAccessIssue]
+			__bake_constraints_batch(context, batch)
+		context.add_task(STF_TaskSteps.ANIMATION, _bake_batch)
+	batch[blender_animation] = handle_baked
+
+
+def __bake_constraints_batch(context: STF_ExportContext, batch: dict[bpy.types.Action, Callable[[bpy.types.Action], None]]):
+	use_cache = context.get_setting("stf_animation_cache_baked")
+	baked_animations: list[tuple[bpy.types.Action, bpy.types.Action]] = []
+	num_cache_hits = 0
+	frame_current = bpy.context.scene.frame_current
+	try:
+		for index, blender_animation in enumerate(batch.keys()):
+			time_start = time.perf_counter()
+			# let baked
+			baked = None
+			if(use_cache):
+				with context.profile("constraint_bake_cache", "lookup") as profile: # pyright: ignore[reportAttributeAccessIssue]
+					bake_hash = compute_bake_hash(blender_animation)
+					baked = find_cached_bake(blender_animation, bake_hash)
+					profile.add_key("constraint_bake_cache", "hit" if baked else "miss")
+			if(baked):
+				num_cache_hits += 1
+				context.report(STFReport("Reused cached constraint bake of \"%s\" (%d/%d)" % (blender_animation.name, index + 1, len(batch)), STFReportSeverity.Info, blender_animation.stf_info.stf_id, _stf_type, blender_animation))
+			else:
+				with context.profile("constraint_bake", blender_animation.name): # pyright: ignore[reportAttributeAccessIssue]
+					baked = bake_constraints(blender_animation, restore_frame=False)
+				if(use_cache):
+					store_cached_bake(blender_animation, baked, bake_hash)
+				elif(not context.get_setting("stf_animation_preserve_baked")):
+					def _clean_baked(baked: bpy.types.Action = baked):
+						bpy.data.actions.remove(baked)
+					context.add_cleanup_task(_clean_baked)
+				context.report(STFReport("Baked constraints of \"%s\" (%d/%d) in %.3f sec." % (blender_animation.name, index + 1, len(batch), time.perf_counter() - time_start), STFReportSeverity.Info, blender_animation.stf_info.stf_id, _stf_type, blender_animation))
+			baked_animations.append((blender_animation, baked))
+	finally:
+		bpy.context.scene.frame_set(frame_current)
+
+	if(use_cache):
+		context.report(STFReport("Constraint bake cache: %d hits, %d misses" % (num_cache_hits, len(baked_animations) - num_cache_hits), STFReportSeverity.Info, None, _stf_type))
+
+	# Convert once the scene is back on its original frame
+	for blender_animation, baked in baked_animations:
+		batch[blender_animation](baked)
+
+
 def __convert(context: STF_ExportContext, blender_animation: bpy.types.Action, animation_range: list[float], reference_holder: dict, bake_only: bool = False) -> tuple[list, bool]:
 	# All of this is a mess
 	stf_tracks = []
@@ -132,143 +200,144 @@ def __convert(context: STF_ExportContext, blender_animation: bpy.types.Action, a
 	return stf_tracks, requires_constraint_bake
 
 
+def __get_vectorized_conversion(context: STF_ExportContext, conversion_func: Callable[[list[float]], list[float]], num_components: int) -> Callable[[np.ndarray], np.ndarray]:
+	"""Resolved property paths are cached for the export, so their conversions recur. Probe each of them only once."""
+	cache_key = ("stf.animation.vectorized_conversion", conversion_func, num_components)
+	if((convert := context.get_cached(cache_key)) is None): # pyright: ignore[reportAttributeAccessIssue]
+		convert = vectorize_conversion(conversion_func, num_components)
+		context.set_cached(cache_key, convert) # pyright: ignore[reportAttributeAccessIssue]
+	return convert
+
+
+def __read_keyframes(fcurve: bpy.types.FCurve) -> dict[str, np.ndarray]:
+	keyframe_points = fcurve.keyframe_points
+	ret = {
+		"co": np.zeros(len(keyframe_points) * 2, dtype=np.float32),
+		"handle_left": np.zeros(len(keyframe_points) * 2, dtype=np.float32),
+		"handle_right": np.zeros(len(keyframe_points) * 2, dtype=np.float32),
+		"interpolation": np.zeros(len(keyframe_points), dtype=np.int32),
+		"handle_right_type": np.zeros(len(keyframe_points), dtype=np.int32),
+	}
+	for attribute, values in ret.items():
+		keyframe_points.foreach_get(attribute, values)
+	for attribute in ["co", "handle_left", "handle_right"]:
+		ret[attribute] = np.reshape(ret[attribute], (-1, 2)).astype(np.float64)
+	return ret
+
+
 def __serialize_subtracks(context: STF_ExportContext, blender_animation: bpy.types.Action, stf_target: list, fcurves: dict[int, bpy.types.FCurve], animation_range: list[float], index_conversion: list[int], conversion_func: Callable[[list[float]], list[float]], bake_only: bool, reference_holder: dict) -> dict:
-	real_timepoints_set: set[float] = set()
+	num_components = len(index_conversion)
+	convert = __get_vectorized_conversion(context, conversion_func, num_components)
+	keyframes_by_fcurve = {array_index: __read_keyframes(fcurve) for array_index, fcurve in fcurves.items()}
+
 	# for each subtrack (i.e. the x,y,z components of a location), determine at which times have a keyframe at any of these subtracks
-	for _, fcurve in fcurves.items():
-		for keyframe in fcurve.keyframe_points:
-			real_timepoints_set.add(keyframe.co.x)
-	real_timepoints = list(real_timepoints_set)
-	real_timepoints.sort()
+	real_timepoints = np.unique(np.concatenate([keyframes["co"][:, 0] for keyframes in keyframes_by_fcurve.values()] + [np.zeros(0)]))
+	num_timepoints = len(real_timepoints)
+
+	# Gather values from subtracks, one column per Blender array index
+	value_convert = np.zeros((num_timepoints, num_components), dtype=np.float64)
+	left_tangent_convert = np.zeros((num_timepoints, num_components), dtype=np.float64)
+	right_tangent_convert = np.zeros((num_timepoints, num_components), dtype=np.float64)
+	keyframe_timepoint_indices: dict[int, np.ndarray] = {}
+	for array_index, fcurve in fcurves.items():
+		keyframes = keyframes_by_fcurve[array_index]
+		timepoint_indices = np.searchsorted(real_timepoints, keyframes["co"][:, 0])
+		keyframe_timepoint_indices[array_index] = timepoint_indices
+		# If is real keyframe, get source of truth values
+		value_convert[timepoint_indices, array_index] = keyframes["co"][:, 1]
+		left_tangent_convert[timepoint_indices, array_index] = keyframes["handle_left"][:, 1]
+		right_tangent_convert[timepoint_indices, array_index] = keyframes["handle_right"][:, 1]
+		# If one of the curves for this data_path doesn't contain a keyframe when the others do, bake it, regardless of the `bake` setting
+		is_baked = np.ones(num_timepoints, dtype=bool)
+		is_baked[timepoint_indices] = False
+		for timepoint_index in np.flatnonzero(is_baked).tolist():
+			value_convert[timepoint_index, array_index] = fcurve.evaluate(real_timepoints[timepoint_index])
+
+	# Convert values, for all timepoints at once
+	converted = convert(np.concatenate([value_convert, left_tangent_convert, right_tangent_convert]))
+	value_convert, left_tangent_convert, right_tangent_convert = converted[:num_timepoints], converted[num_timepoints:num_timepoints * 2], converted[num_timepoints * 2:]
 
-	# Set empty track objects
 	ret: list[dict | None] = [None] * len(index_conversion)
-	for _, fcurve in fcurves.items():
-		ret[index_conversion[fcurve.array_index]] = {"keyframes": []}
-
-	interpolation: str | None = None
-
-	# Convert keyframes
-	keyframe_indices: list[int] = [0] * len(index_conversion)
-
-	for real_timepoint in real_timepoints:
-		value_convert: list[float] = [0] * len(index_conversion)
-		left_tangent_convert: list[float] = [0] * len(index_conversion)
-		right_tangent_convert: list[float] = [0] * len(index_conversion)
-
-		# Gather value from subtracks
-		for _, fcurve in fcurves.items():
-			# If is real keyframe, get source of truth values
-			if(fcurve.keyframe_points[keyframe_indices[fcurve.array_index]].co.x == real_timepoint):
-				keyframe = fcurve.keyframe_points[keyframe_indices[fcurve.array_index]]
-				value_convert[fcurve.array_index] = keyframe.co.y
-				left_tangent_convert[fcurve.array_index] = keyframe.handle_left.y
-				right_tangent_convert[fcurve.array_index] = keyframe.handle_right.y
-			else:
-				# If one of the curves for this data_path doesn't contain a keyframe when the others do, bake it, regardless of the `bake` setting
-				value_convert[fcurve.array_index] = fcurve.evaluate(real_timepoint)
-
-		# Convert values
-		value_convert = conversion_func(value_convert) if conversion_func else value_convert
-		left_tangent_convert = conversion_func(left_tangent_convert) if conversion_func else left_tangent_convert
-		right_tangent_convert = conversion_func(right_tangent_convert) if conversion_func else right_tangent_convert
-
-		# Write keyframes for subtracks
-		for _, fcurve in fcurves.items():
-			# If is real keyframe, write source of truth values
-			if(fcurve.keyframe_points[keyframe_indices[fcurve.array_index]].co.x == real_timepoint):
-				keyframe = fcurve.keyframe_points[keyframe_indices[fcurve.array_index]]
-				prev_keyframe = fcurve.keyframe_points[keyframe_indices[fcurve.array_index] - 1] if keyframe_indices[fcurve.array_index] > 0 else None
-				next_keyframe = fcurve.keyframe_points[keyframe_indices[fcurve.array_index] + 1] if keyframe_indices[fcurve.array_index] + 1 < len(fcurve.keyframe_points) else None
-
-				if(not interpolation):
-					interpolation = keyframe.interpolation
-				elif(keyframe.interpolation != interpolation):
-					interpolation = "mixed"
-
-				stf_keyframe = [
-					True, # is source of truth, false when it's baked
-					value_convert[index_conversion[fcurve.array_index]], #value
-				]
-
-				left_tangent = None
-				if(prev_keyframe and prev_keyframe.interpolation == "BEZIER"):
-					left_frame_offset = keyframe.co.x - prev_keyframe.co.x
-					left_tangent_factor = max(abs((keyframe.handle_left.x - keyframe.co.x) / left_frame_offset), 1)
-					left_tangent = [[(keyframe.handle_left.x - keyframe.co.x) / left_tangent_factor, (value_convert[index_conversion[fcurve.array_index]] - left_tangent_convert[index_conversion[fcurve.array_index]]) / left_tangent_factor]] # left tangent values relative to keyframe
-
-				if(keyframe.interpolation == "BEZIER"):
-					right_tangent_factor = 1
-					if(next_keyframe):
-						right_frame_offset = next_keyframe.co.x - keyframe.co.x
-						right_tangent_factor = max(abs((keyframe.handle_right.x - keyframe.co.x) / right_frame_offset), 1)
-
-					stf_keyframe += [
-						"bezier", # interpolation type
-						handle_type_to_stf.get(keyframe.handle_right_type, "split"), # tangent type
-						[(keyframe.handle_right.x - keyframe.co.x) / right_tangent_factor, (value_convert[index_conversion[fcurve.array_index]] - right_tangent_convert[index_conversion[fcurve.array_index]]) / right_tangent_factor], # right tangent values relative to keyframe
-					]
-				elif(keyframe.interpolation == "CONSTANT"):
-					stf_keyframe.append("constant")
-				elif(keyframe.interpolation == "LINEAR"):
-					stf_keyframe.append("linear")
-				elif(keyframe.interpolation == "QUAD"):
-					stf_keyframe.append("quadratic")
-				elif(keyframe.interpolation == "CUBIC"):
-					stf_keyframe.append("cubic")
-				else:
-					context.report(STFReport("Unsupported interpolation type: " + str(keyframe.interpolation), STFReportSeverity.Warn, blender_animation.stf_info.stf_id, _stf_type, blender_animation))
-
-				if(left_tangent):
-					stf_keyframe = stf_keyframe + left_tangent
-
-				# Finally write the stf_keyframe
-				ret[index_conversion[fcurve.array_index]]["keyframes"].append(stf_keyframe) # pyright: ignore[reportOptionalSubscript]
-
-				keyframe_indices[fcurve.array_index] += 1
-			else:
-				# If one of the curves for this data_path doesn't contain a keyframe when the others do, bake it, regardless of the `bake` setting
-				ret[index_conversion[fcurve.array_index]]["keyframes"].append([ # pyright: ignore[reportOptionalSubscript]
-					False, # is source of truth, false because it's baked
-					value_convert[index_conversion[fcurve.array_index]], #value
-					"baked",
-				]) # don't add the left tangent at all, since this is not a real keyframe
-
-	match(interpolation):  # pyright: ignore[reportPossiblyUnboundVariable]
-		case "mixed": interpolation = "mixed"
-		case "BEZIER": interpolation = "bezier"
-		case "CONSTANT": interpolation = "constant"
-		case "LINEAR": interpolation = "linear"
-		case "QUAD": interpolation = "quadratic"
-		case "CUBIC": interpolation = "cubic"
-		case _: interpolation = "unknown"
+	subtrack_keyframes: list[STF_Keyframes | None] = [None] * len(index_conversion)
+	used_interpolations: set[int] = set()
+	for array_index, fcurve in fcurves.items():
+		stf_index = index_conversion[array_index]
+		keyframes = keyframes_by_fcurve[array_index]
+		timepoint_indices = keyframe_timepoint_indices[array_index]
+		co, handle_left, handle_right = keyframes["co"], keyframes["handle_left"], keyframes["handle_right"]
+		interpolations = keyframes["interpolation"]
+		used_interpolations.update(np.unique(interpolations).tolist())
+
+		# Timepoints without a keyframe of this subtrack stay baked
+		stf_keyframes = STF_Keyframes(num_timepoints)
+		stf_keyframes.values[:] = value_convert[:, stf_index]
+		stf_keyframes.interpolations[timepoint_indices] = blender_interpolation_value_to_code[np.minimum(interpolations, len(blender_interpolation_value_to_code) - 1)]
+		if(np.any(stf_keyframes.interpolations[timepoint_indices] == interpolation_unsupported)):
+			context.report(STFReport("Unsupported interpolation type", STFReportSeverity.Warn, blender_animation.stf_info.stf_id, _stf_type, blender_animation))
+		values = value_convert[timepoint_indices, stf_index]
+
+		with np.errstate(divide="ignore", invalid="ignore"):
+			# Left tangent values relative to keyframe, if the previous keyframe is bezier
+			has_left_tangents = np.zeros(len(co), dtype=bool)
+			has_left_tangents[1:] = interpolations[:-1] == blender_interpolation_values["BEZIER"]
+			left_frame_offsets = np.ones(len(co))
+			left_frame_offsets[1:] = co[1:, 0] - co[:-1, 0]
+			left_tangent_factors = np.maximum(np.abs((handle_left[:, 0] - co[:, 0]) / left_frame_offsets), 1)
+			stf_keyframes.has_left_tangents[timepoint_indices] = has_left_tangents
+			stf_keyframes.left_tangents[timepoint_indices] = np.where(has_left_tangents[:, None], np.column_stack([(handle_left[:, 0] - co[:, 0]) / left_tangent_factors, (values - left_tangent_convert[timepoint_indices, stf_index]) / left_tangent_factors]), 0)
+
+			# Right tangent values relative to keyframe, if this keyframe is bezier
+			is_bezier = interpolations == blender_interpolation_values["BEZIER"]
+			right_frame_offsets = np.ones(len(co))
+			right_frame_offsets[:-1] = co[1:, 0] - co[:-1, 0]
+			right_tangent_factors = np.maximum(np.abs((handle_right[:, 0] - co[:, 0]) / right_frame_offsets), 1)
+			right_tangent_factors[-1:] = 1 # The last keyframe has nothing to scale its tangent against
+			stf_keyframes.right_tangents[timepoint_indices] = np.where(is_bezier[:, None], np.column_stack([(handle_right[:, 0] - co[:, 0]) / right_tangent_factors, (values - right_tangent_convert[timepoint_indices, stf_index]) / right_tangent_factors]), 0)
+			stf_keyframes.tangent_types[timepoint_indices] = blender_handle_type_value_to_code[np.minimum(keyframes["handle_right_type"], len(blender_handle_type_value_to_code) - 1)]
+
+		subtrack_keyframes[stf_index] = stf_keyframes
+		ret[stf_index] = {}
+
+	# let interpolation
+	if(len(used_interpolations) > 1):
+		interpolation = "mixed"
+	else:
+		match(blender_interpolation_names.get(next(iter(used_interpolations), -1))):
+			case "BEZIER": interpolation = "bezier"
+			case "CONSTANT": interpolation = "constant"
+			case "LINEAR": interpolation = "linear"
+			case "QUAD": interpolation = "quadratic"
+			case "CUBIC": interpolation = "cubic"
+			case _: interpolation = "unknown"
+
+	stf_track: dict[str, Any] = {"target": stf_target}
+	if(context.get_setting("stf_animation_binary_keyframes") and num_timepoints >= min_binary_keyframes):
+		stf_track["timepoints_buffer"] = context.serialize_buffer(reference_holder, encode_timepoints(real_timepoints))
+		for subtrack, stf_keyframes in zip(ret, subtrack_keyframes):
+			if(subtrack is not None and stf_keyframes is not None):
+				keyframe_codes, keyframe_values = stf_keyframes.to_buffers()
+				subtrack["keyframe_codes"] = context.serialize_buffer(reference_holder, keyframe_codes)
+				subtrack["keyframe_values"] = context.serialize_buffer(reference_holder, keyframe_values)
+	else:
+		stf_track["timepoints"] = real_timepoints.tolist()
+		for subtrack, stf_keyframes in zip(ret, subtrack_keyframes):
+			if(subtrack is not None and stf_keyframes is not None):
+				subtrack["keyframes"] = stf_keyframes.to_json()
 
 	# Bake values, for bake_only, the keyframes are already baked, no need to do so again
 	if(not bake_only and interpolation not in ["constant", "linear", "quadratic", "cubic"]):
-		baked_values: list[BytesIO | None] = [None] * len(index_conversion)
-		# Create buffer for each subtrack
-		for _, fcurve in fcurves.items():
-			baked_values[index_conversion[fcurve.array_index]] = BytesIO()
-
-		for timepoint in range(int(animation_range[0]), int(animation_range[1] + 1)):
-			value_convert = [None] * len(index_conversion) # pyright: ignore[reportAssignmentType]
-			# Get evaluated value from each subtrack
-			for _, fcurve in fcurves.items():
-				value_convert[fcurve.array_index] = fcurve.evaluate(timepoint)
-			# Convert value
-			value_convert = conversion_func(value_convert) if conversion_func else value_convert
-			# Write buffers
-			for _, fcurve in fcurves.items():
-				baked_values[index_conversion[fcurve.array_index]].write(serialize_float(value_convert[index_conversion[fcurve.array_index]], 4))
+		frames = np.arange(int(animation_range[0]), int(animation_range[1] + 1), dtype=np.float64)
+		# Get evaluated value from each subtrack
+		baked_values = np.zeros((len(frames), num_components), dtype=np.float64)
+		for array_index, fcurve in fcurves.items():
+			baked_values[:, array_index] = np.fromiter(map(fcurve.evaluate, frames.tolist()), dtype=np.float64, count=len(frames))
+		baked_values = convert(baked_values)
 		# Serialize buffers for each subtrack
-		for _, fcurve in fcurves.items():
-			if(ret[index_conversion[fcurve.array_index]]):
-				ret[index_conversion[fcurve.array_index]]["baked"] = context.serialize_buffer(reference_holder, baked_values[index_conversion[fcurve.array_index]].getbuffer())  # pyright: ignore[reportOptionalSubscript, reportArgumentType]
-
-	return {
-		"target": stf_target,
-		"timepoints": real_timepoints,
-		"subtracks": ret,
-		"interpolation": interpolation,
-		"track_baked": bake_only,
-	}
+		for array_index in fcurves.keys():
+			if(ret[index_conversion[array_index]] is not None):
+				ret[index_conversion[array_index]]["baked"] = context.serialize_buffer(reference_holder, baked_values[:, index_conversion[array_index]].astype(determine_pack_format_float(4)).tobytes())  # pyright: ignore[reportOptionalSubscript]
+
+	stf_track["subtracks"] = ret
+	stf_track["interpolation"] = interpolation
+	stf_track["track_baked"] = bake_only
+	return stf_track
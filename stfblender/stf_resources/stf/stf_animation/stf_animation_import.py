@@ -1,14 +1,25 @@
 from typing import Any, Callable
 import bpy
+import numpy as np
 
 from .....stfblender_common import STF_ImportContext, STF_TaskSteps, STFReportSeverity, STFReport, STF_Category
 from .....stfblender_common.slot_link import SlotLink, SlotLinkTarget
 from .....stfblender_common.slot_link.slot_link import ensure_first_slot_link_target, get_slot_link_data_model_version, get_slot_link_targets, get_slot_link_version
 from .stf_animation_common import *
+from .stf_animation_conversion import vectorize_conversion
+from .stf_animation_keyframes import STF_Keyframes, code_to_tangent_type, decode_timepoints, interpolation_to_code, interpolation_unsupported
 
 
 _stf_type = stf_animation_type
 
+code_to_blender_interpolation = {
+	interpolation_to_code["constant"]: "CONSTANT",
+	interpolation_to_code["linear"]: "LINEAR",
+	interpolation_to_code["bezier"]: "BEZIER",
+	interpolation_to_code["quadratic"]: "QUAD",
+	interpolation_to_code["cubic"]: "CUBIC",
+}
+
 
 def stf_animation_import(context: STF_ImportContext, json_resource: dict, stf_id: str, context_resource: Any) -> Any | STFReport:
 	slot_link_version = get_slot_link_version()
@@ -40,7 +51,7 @@ def stf_animation_import(context: STF_ImportContext, json_resource: dict, stf_id
 
 	layer = blender_animation.layers.new("stf_layer")
 	strip: bpy.types.ActionKeyframeStrip = layer.strips.new(type="KEYFRAME") # pyright: ignore[reportAssignmentType]
-	__parse_tracks(context, stf_id, json_resource.get("tracks", []), blender_animation, strip, False)
+	__parse_tracks(context, stf_id, json_resource, json_resource.get("tracks", []), blender_animation, strip, False)
 
 	if("tracks_baked" in json_resource and context.get_setting("import_baked_animations")):
 		baked_blender_animation = bpy.data.actions.new(blender_animation.name + "_baked")
@@ -58,7 +69,7 @@ def stf_animation_import(context: STF_ImportContext, json_resource: dict, stf_id
 		baked_layer = baked_blender_animation.layers.new("stf_layer")
 		baked_strip: bpy.types.ActionKeyframeStrip = baked_layer.strips.new(type="KEYFRAME") # pyright: ignore[reportAssignmentType]
 
-		__parse_tracks(context, stf_id, json_resource.get("tracks_baked", []), baked_blender_animation, baked_strip, True)
+		__parse_tracks(context, stf_id, json_resource, json_resource.get("tracks_baked", []), baked_blender_animation, baked_strip, True)
 
 	if("is_reset_animation" in json_resource and json_resource["is_reset_animation"]):
 		blender_animation.slot_link.is_reset_animation = True
@@ -75,7 +86,7 @@ def stf_animation_import(context: STF_ImportContext, json_resource: dict, stf_id
 	return blender_animation
 
 
-def __parse_tracks(context: STF_ImportContext, stf_id: str, tracks: list, blender_animation: bpy.types.Action, strip: bpy.types.ActionKeyframeStrip, is_baked_only: bool):
+def __parse_tracks(context: STF_ImportContext, stf_id: str, json_resource: dict, tracks: list, blender_animation: bpy.types.Action, strip: bpy.types.ActionKeyframeStrip, is_baked_only: bool):
 	# All of this is a mess
 	for track in tracks:
 		target_ret = context.resolve_stf_property_path(track.get("target", []))
@@ -127,96 +138,119 @@ def __parse_tracks(context: STF_ImportContext, stf_id: str, tracks: list, blende
 				break
 
 		# Yay we can finally deal with curves
-		__parse_subtracks(context, stf_id, track, selected_channelbag, target_ret.blender_path, index_conversion, target_ret.convert_func, is_baked_only) # pyright: ignore[reportArgumentType]
+		__parse_subtracks(context, stf_id, json_resource, track, selected_channelbag, target_ret.blender_path, index_conversion, target_ret.convert_func, is_baked_only) # pyright: ignore[reportArgumentType]
 
 
-def __parse_subtracks(context: STF_ImportContext, stf_id: str, track: dict, selected_channelbag: bpy.types.ActionChannelbag, fcurve_target: Any, index_conversion: list[int], conversion_func: Callable[[list[float]], list[float]], is_baked_only: bool):
+def __decode_track(context: STF_ImportContext, json_resource: dict, track: dict) -> tuple[np.ndarray, list[STF_Keyframes | None]] | None:
+	"""Decode the timepoints and keyframes of a track, from either the JSON or the binary keyframe encoding."""
+	subtracks = track.get("subtracks", [])
+	if("timepoints_buffer" in track):
+		timepoints_buffer = context.import_buffer(json_resource, track["timepoints_buffer"])
+		if(timepoints_buffer is None): return None
+		subtrack_keyframes: list[STF_Keyframes | None] = []
+		for subtrack in subtracks:
+			if(not subtrack):
+				subtrack_keyframes.append(None)
+				continue
+			keyframe_codes = context.import_buffer(json_resource, subtrack.get("keyframe_codes"))
+			keyframe_values = context.import_buffer(json_resource, subtrack.get("keyframe_values"))
+			if(keyframe_codes is None or keyframe_values is None): return None
+			subtrack_keyframes.append(STF_Keyframes.from_buffers(keyframe_codes, keyframe_values))
+		return decode_timepoints(timepoints_buffer), subtrack_keyframes
+	else:
+		return np.array(track.get("timepoints", []), dtype=np.float64), [STF_Keyframes.from_json(subtrack.get("keyframes", [])) if subtrack else None for subtrack in subtracks]
+
+
+def __parse_subtracks(context: STF_ImportContext, stf_id: str, json_resource: dict, track: dict, selected_channelbag: bpy.types.ActionChannelbag, fcurve_target: Any, index_conversion: list[int], conversion_func: Callable[[list[float]], list[float]], is_baked_only: bool):
 	subtracks = track.get("subtracks", [])
-	timepoints = track.get("timepoints", [])
-	if(len(subtracks) == 0 or len(timepoints) == 0): return
+	if(len(subtracks) == 0): return
+
+	decoded_track = __decode_track(context, json_resource, track)
+	if(decoded_track is None):
+		context.report(STFReport("Invalid keyframe buffers", STFReportSeverity.Error, stf_id, _stf_type))
+		return
+	timepoints, subtrack_keyframes = decoded_track
+	if(len(timepoints) == 0): return
 
 	num_frames = -1
 
 	fcurves: list[bpy.types.FCurve] = [None] * len(subtracks) # pyright: ignore[reportAssignmentType]
-	for subtrack_index, subtrack in enumerate(subtracks):
-		if(subtrack):
+	for subtrack_index, keyframes in enumerate(subtrack_keyframes):
+		if(keyframes is not None):
 			fcurves[subtrack_index] = selected_channelbag.fcurves.new(fcurve_target, index=index_conversion[subtrack_index])
-			num_frames = len(subtrack["keyframes"]) if len(subtrack["keyframes"]) > num_frames else num_frames
+			num_frames = len(keyframes) if len(keyframes) > num_frames else num_frames
 
+	num_frames = min(num_frames, len(timepoints))
 	if(num_frames <= 0): return
-
-	for keyframe_index in range(num_frames):
-		timepoint = timepoints[keyframe_index]
-
-		value_convert: list[float] = [None] * len(index_conversion) # pyright: ignore[reportAssignmentType]
-		has_left_tangent: list[bool] = [False] * len(index_conversion)
-		left_tangent_index: list[float] = [0] * len(index_conversion)
-		left_tangent_convert: list[float] = [0] * len(index_conversion)
-		right_tangent_convert: list[float] = [0] * len(index_conversion)
-
-		# Collect values for conversion. If the target is the translation of an object, this will collect the x-y-z values.
-		for subtrack_index, subtrack in enumerate(subtracks):
-			if(not subtrack): continue
-
-			stf_keyframe = subtrack["keyframes"][keyframe_index]
-			if(not stf_keyframe[0]): continue # Not source of truth, ignore
-
-			value_convert[subtrack_index] = stf_keyframe[1]
-			interpolation_type = stf_keyframe[2]
-			if(interpolation_type == "bezier"):
-				right_tangent_convert[subtrack_index] = stf_keyframe[4][1]
-				if(len(stf_keyframe) > 5):
-					has_left_tangent[subtrack_index] = True
-					left_tangent_index[subtrack_index] = 5
-					left_tangent_convert[subtrack_index] = stf_keyframe[5][1]
-			elif(interpolation_type in ["constant", "linear", "quadratic", "cubic"]):
-				if(len(stf_keyframe) > 3):
-					has_left_tangent[subtrack_index] = True
-					left_tangent_index[subtrack_index] = 4
-					left_tangent_convert[subtrack_index] = stf_keyframe[3][1]
-
+	timepoints = timepoints[:num_frames]
+	num_components = len(index_conversion)
+	bezier = interpolation_to_code["bezier"]
+
+	# Collect values for conversion, one column per subtrack. If the target is the translation of an object, these are the x-y-z values.
+	# Baked keyframes don't become Blender keyframes, but their value is still needed to convert the others.
+	values = np.zeros((num_frames, num_components), dtype=np.float64)
+	left_handles = np.zeros((num_frames, num_components), dtype=np.float64)
+	right_handles = np.zeros((num_frames, num_components), dtype=np.float64)
+	for subtrack_index, keyframes in enumerate(subtrack_keyframes):
+		if(keyframes is None): continue
+		num_keyframes = min(len(keyframes), num_frames)
+		values[:num_keyframes, subtrack_index] = keyframes.values[:num_keyframes]
 		# De-normalize tangent values for Blender
-		for i in range(len(index_conversion)):
-			left_tangent_convert[i] += value_convert[i]
-			right_tangent_convert[i] += value_convert[i]
-
-		# Convert Y-axis values
-		if(conversion_func):
-			value_convert = conversion_func(value_convert)
-			left_tangent_convert = conversion_func(left_tangent_convert)
-			right_tangent_convert = conversion_func(right_tangent_convert)
-
-		# Create Blender keyframes
-		for subtrack_index, subtrack in enumerate(subtracks):
-			if(not subtrack): continue
-
-			stf_keyframe = subtrack["keyframes"][keyframe_index]
-			if(not stf_keyframe[0]): continue # Not source of truth, ignore
-
-			keyframe = fcurves[subtrack_index].keyframe_points.insert(timepoint, value_convert[index_conversion[subtrack_index]])
-
-			interpolation_type = stf_keyframe[2]
-			if(interpolation_type == "bezier"):
-				keyframe.interpolation = "BEZIER"
-				keyframe.handle_right_type = handle_type_to_blender[stf_keyframe[3]]
-				keyframe.handle_right.x = keyframe.co.x + stf_keyframe[4][0]
-				keyframe.handle_right.y = right_tangent_convert[index_conversion[subtrack_index]]
-			elif(interpolation_type == "constant"):
-				keyframe.interpolation = "CONSTANT"
-			elif(interpolation_type == "linear"):
-				keyframe.interpolation = "LINEAR"
-			elif(interpolation_type == "quadratic"):
-				keyframe.interpolation = "QUAD"
-			elif(interpolation_type == "cubic"):
-				keyframe.interpolation = "CUBIC"
-			else:
-				context.report(STFReport("Unsupported interpolation type: " + str(interpolation_type), STFReportSeverity.Warn, stf_id, _stf_type))
-
-			if(has_left_tangent[subtrack_index]):
-				#keyframe.handle_left_type = "FREE"
-				keyframe.handle_left.x = keyframe.co.x + stf_keyframe[left_tangent_index[subtrack_index]][0]
-				keyframe.handle_left.y = left_tangent_convert[index_conversion[subtrack_index]]
+		left_handles[:num_keyframes, subtrack_index] = keyframes.values[:num_keyframes] + np.where(keyframes.has_left_tangents[:num_keyframes], keyframes.left_tangents[:num_keyframes, 1], 0)
+		right_handles[:num_keyframes, subtrack_index] = keyframes.values[:num_keyframes] + np.where(keyframes.interpolations[:num_keyframes] == bezier, keyframes.right_tangents[:num_keyframes, 1], 0)
+
+	# Convert Y-axis values, for all keyframes and handles at once
+	converted = vectorize_conversion(conversion_func, num_components)(np.concatenate([values, left_handles, right_handles]))
+	values, left_handles, right_handles = converted[:num_frames], converted[num_frames:num_frames * 2], converted[num_frames * 2:]
+
+	# Keyframes get the same defaults as if they were inserted one by one
+	default_interpolation = blender_interpolation_values.get(bpy.context.preferences.edit.keyframe_new_interpolation_type, blender_interpolation_values["BEZIER"])
+	default_handle_type = blender_handle_type_values.get(bpy.context.preferences.edit.keyframe_new_handle_type, blender_handle_type_values["AUTO_CLAMPED"])
+	interpolation_lookup = np.full(interpolation_unsupported + 1, default_interpolation, dtype=np.int32)
+	for code, blender_interpolation in code_to_blender_interpolation.items():
+		interpolation_lookup[code] = blender_interpolation_values[blender_interpolation]
+	tangent_type_lookup = np.array([blender_handle_type_values[handle_type_to_blender[code_to_tangent_type.get(code, "split")]] for code in range(4)], dtype=np.int32)
+
+	# Create Blender keyframes, all of one FCurve at once
+	for subtrack_index, keyframes in enumerate(subtrack_keyframes):
+		if(keyframes is None): continue
+		blender_index = index_conversion[subtrack_index]
+		if(blender_index >= values.shape[1]):
+			context.report(STFReport("Invalid conversion result", STFReportSeverity.Warn, stf_id, _stf_type))
+			continue
+
+		keyframe_indices = np.flatnonzero(keyframes.is_source_of_truth[:num_frames])
+		num_keyframes = len(keyframe_indices)
+		if(num_keyframes == 0): continue
+
+		interpolations = keyframes.interpolations[keyframe_indices]
+		if(not np.all(np.isin(interpolations, list(code_to_blender_interpolation.keys())))):
+			context.report(STFReport("Unsupported interpolation type", STFReportSeverity.Warn, stf_id, _stf_type))
+		is_bezier = interpolations == bezier
+		has_left_tangents = keyframes.has_left_tangents[keyframe_indices]
+		keyframe_timepoints = timepoints[keyframe_indices]
+		keyframe_values = values[keyframe_indices, blender_index]
+
+		co = np.column_stack([keyframe_timepoints, keyframe_values])
+		handle_left = np.column_stack([
+			keyframe_timepoints + np.where(has_left_tangents, keyframes.left_tangents[keyframe_indices, 0], 0),
+			np.where(has_left_tangents, left_handles[keyframe_indices, blender_index], keyframe_values),
+		])
+		handle_right = np.column_stack([
+			keyframe_timepoints + np.where(is_bezier, keyframes.right_tangents[keyframe_indices, 0], 0),
+			np.where(is_bezier, right_handles[keyframe_indices, blender_index], keyframe_values),
+		])
+		handle_right_types = np.where(is_bezier, tangent_type_lookup[np.minimum(keyframes.tangent_types[keyframe_indices], len(tangent_type_lookup) - 1)], default_handle_type).astype(np.int32)
+
+		keyframe_points = fcurves[subtrack_index].keyframe_points
+		keyframe_points.add(num_keyframes)
+		keyframe_points.foreach_set("co", np.ravel(co).astype(np.float32))
+		keyframe_points.foreach_set("interpolation", interpolation_lookup[interpolations])
+		keyframe_points.foreach_set("handle_left_type", np.full(num_keyframes, default_handle_type, dtype=np.int32))
+		keyframe_points.foreach_set("handle_right_type", handle_right_types)
+		keyframe_points.foreach_set("handle_left", np.ravel(handle_left).astype(np.float32))
+		keyframe_points.foreach_set("handle_right", np.ravel(handle_right).astype(np.float32))
 
 	for fcurve in fcurves:
 		if(fcurve):
-			fcurve.keyframe_points.handles_recalc()
+			fcurve.update()
@@ -0,0 +1,129 @@
+"""
+Binary keyframe encoding, for tracks with at least `min_binary_keyframes` timepoints.
+
+Instead of `timepoints` as a list, the track has `timepoints_buffer`, the index of a buffer of float32 timepoints.
+Instead of `keyframes` as lists, each subtrack has two buffer indices, both with one element per timepoint:
+* `keyframe_codes`: uint8 per keyframe. Bits 0-2 are the interpolation code, bits 3-4 the tangent type code, and bit 5 is set if the keyframe has a left tangent.
+* `keyframe_values`: 5 float32 per keyframe. The value, the left tangent and the right tangent. Tangents are relative to the keyframe, like in the JSON encoding.
+"""
+
+import numpy as np
+
+
+# Shorter tracks stay JSON, since each buffer adds its own ID to the definition
+min_binary_keyframes = 8
+
+interpolation_baked = 0 # Not a source of truth keyframe
+interpolation_unsupported = 7
+
+interpolation_to_code = {
+	"baked": interpolation_baked,
+	"constant": 1,
+	"linear": 2,
+	"bezier": 3,
+	"quadratic": 4,
+	"cubic": 5,
+}
+code_to_interpolation = {code: interpolation for interpolation, code in interpolation_to_code.items()}
+
+tangent_type_to_code = {
+	"split": 0,
+	"aligned": 1,
+	"auto": 2,
+}
+code_to_tangent_type = {code: tangent_type for tangent_type, code in tangent_type_to_code.items()}
+
+_interpolation_mask = 0b111
+_tangent_type_shift = 3
+_tangent_type_mask = 0b11
+_has_left_tangent_bit = 1 << 5
+
+
+class STF_Keyframes:
+	"""The keyframes of one subtrack, with one element per timepoint of the track. Independent of how they are encoded."""
+
+	def __init__(self, num_keyframes: int):
+		self.interpolations: np.ndarray = np.zeros(num_keyframes, dtype=np.uint8)
+		self.tangent_types: np.ndarray = np.zeros(num_keyframes, dtype=np.uint8)
+		self.has_left_tangents: np.ndarray = np.zeros(num_keyframes, dtype=bool)
+		self.values: np.ndarray = np.zeros(num_keyframes, dtype=np.float64)
+		self.left_tangents: np.ndarray = np.zeros((num_keyframes, 2), dtype=np.float64)
+		self.right_tangents: np.ndarray = np.zeros((num_keyframes, 2), dtype=np.float64)
+
+	def __len__(self) -> int:
+		return len(self.values)
+
+	@property
+	def is_source_of_truth(self) -> np.ndarray:
+		return self.interpolations != interpolation_baked
+
+	@staticmethod
+	def from_json(stf_keyframes: list[list]) -> "STF_Keyframes":
+		ret = STF_Keyframes(len(stf_keyframes))
+		for index, stf_keyframe in enumerate(stf_keyframes):
+			ret.values[index] = stf_keyframe[1]
+			if(not stf_keyframe[0]):
+				ret.interpolations[index] = interpolation_baked
+				continue
+			# let left_tangent
+			left_tangent = None
+			interpolation = stf_keyframe[2] if len(stf_keyframe) > 2 and type(stf_keyframe[2]) is str else None
+			if(interpolation == "bezier"):
+				ret.tangent_types[index] = tangent_type_to_code.get(stf_keyframe[3], 0)
+				ret.right_tangents[index] = stf_keyframe[4]
+				left_tangent = stf_keyframe[5] if len(stf_keyframe) > 5 else None
+			elif(interpolation in interpolation_to_code):
+				left_tangent = stf_keyframe[3] if len(stf_keyframe) > 3 else None
+			else:
+				# Keyframes with an unsupported interpolation have no interpolation at all
+				left_tangent = stf_keyframe[2] if len(stf_keyframe) > 2 and interpolation is None else None
+			ret.interpolations[index] = interpolation_to_code.get(interpolation, interpolation_unsupported) # pyright: ignore[reportArgumentType]
+			if(left_tangent is not None):
+				ret.has_left_tangents[index] = True
+				ret.left_tangents[index] = left_tangent
+		return ret
+
+	def to_json(self) -> list[list]:
+		ret: list[list] = []
+		for interpolation, tangent_type, has_left_tangent, value, left_tangent, right_tangent in zip(self.interpolations.tolist(), self.tangent_types.tolist(), self.has_left_tangents.tolist(), self.values.tolist(), self.left_tangents.tolist(), self.right_tangents.tolist()):
+			if(interpolation == interpolation_baked):
+				ret.append([False, value, "baked"])
+				continue
+			stf_keyframe = [True, value]
+			if(interpolation == interpolation_to_code["bezier"]):
+				stf_keyframe += ["bezier", code_to_tangent_type[tangent_type], right_tangent]
+			elif(interpolation in code_to_interpolation):
+				stf_keyframe.append(code_to_interpolation[interpolation])
+			if(has_left_tangent):
+				stf_keyframe.append(left_tangent)
+			ret.append(stf_keyframe)
+		return ret
+
+	@staticmethod
+	def from_buffers(codes_buffer: bytes | memoryview, values_buffer: bytes | memoryview) -> "STF_Keyframes":
+		codes = np.frombuffer(codes_buffer, dtype=np.uint8)
+		values = np.reshape(np.frombuffer(values_buffer, dtype="<f4"), (-1, 5)).astype(np.float64)
+		num_keyframes = min(len(codes), len(values))
+		codes = codes[:num_keyframes]
+
+		ret = STF_Keyframes(0)
+		ret.interpolations = codes & _interpolation_mask
+		ret.tangent_types = (codes >> _tangent_type_shift) & _tangent_type_mask
+		ret.has_left_tangents = (codes & _has_left_tangent_bit) != 0
+		ret.values = values[:num_keyframes, 0]
+		ret.left_tangents = values[:num_keyframes, 1:3]
+		ret.right_tangents = values[:num_keyframes, 3:5]
+		return ret
+
+	def to_buffers(self) -> tuple[bytes, bytes]:
+		""":return: The `keyframe_codes` and `keyframe_values` buffers."""
+		codes = self.interpolations.astype(np.uint8) | (self.tangent_types.astype(np.uint8) << _tangent_type_shift) | np.where(self.has_left_tangents, _has_left_tangent_bit, 0).astype(np.uint8)
+		values = np.column_stack([self.values, self.left_tangents, self.right_tangents]).astype("<f4")
+		return codes.tobytes(), values.tobytes()
+
+
+def encode_timepoints(timepoints: list[float] | np.ndarray) -> bytes:
+	return np.asarray(timepoints, dtype="<f4").tobytes()
+
+def decode_timepoints(buffer: bytes | memoryview) -> np.ndarray:
+	return np.frombuffer(buffer, dtype="<f4").astype(np.float64)
@@ -4,6 +4,7 @@ from typing import Any
 from .....stfblender_common import STF_ImportContext, STF_ExportContext, STF_Category, STFReport
 from .....stfblender_common.resource import STF_Handler_BlenderNative, STF_Handler_ComponentHolder, boilerplate_register, boilerplate_unregister, get_components_from_object, ensure_stf_id
 from .....stfblender_common.utils.armature_bone import ArmatureBone
+from ..stf_bone.stf_bone_import import create_bones
 from .stf_armature_ops import STFAddArmatureComponentOperator, STFEditArmatureComponentIdOperator, STFRemoveArmatureComponentOperator, STFSetArmatureIDOperator
 
 
@@ -26,8 +27,11 @@ class Handler_STF_Armature(STF_Handler_BlenderNative, STF_Handler_ComponentHolde
 		context.register_trash_object(tmp_hook_object)
 		bpy.context.scene.collection.objects.link(tmp_hook_object)
 
+		# Create all bones in one go, instead of entering and leaving edit-mode for each
+		bone_batch = create_bones(context, json_resource, json_resource.get("root_bones", []), tmp_hook_object)
+
 		for bone_id in json_resource.get("root_bones", []):
-			context.import_resource(json_resource, bone_id, tmp_hook_object, STF_Category.NODE)
+			context.import_resource(json_resource, bone_id, bone_batch, STF_Category.NODE)
 
 		return blender_armature
 
@@ -9,6 +9,7 @@ from .....stfblender_common.utils import trs_utils
 from .....stfblender_common.utils.armature_bone import ArmatureBone
 from .....stfblender_common.utils.animation_conversion_utils import *
 from .stf_bone_property_conversion import export_blender_bone_animation, import_blender_bone_animation
+from .stf_bone_import import STF_BoneImportBatch, create_bones
 from .stf_bone_ops import STFAddBoneComponentOperator, STFEditBoneComponentIdOperator, STFRemoveBoneComponentOperator, STFSetBoneIDOperator
 
 
@@ -42,41 +43,21 @@ class Handler_STF_Bone(STF_Handler_BlenderNative, STF_Handler_ComponentHolder, S
 
 	@classmethod
 	def import_resource(cls, context: STF_ImportContext, json_resource: dict, stf_id: str, context_object: Any) -> Any | STFReport:
-		blender_armature: bpy.types.Armature = context_object.data
-		blender_object: bpy.types.Object = context_object
+		# The armature creates all its bones at once. Should a bone be imported on its own, create it and its children the same way.
+		bone_batch: STF_BoneImportBatch = context_object if type(context_object) is STF_BoneImportBatch else create_bones(context, {"referenced_resources": [stf_id]}, [0], context_object, cls.stf_type)
+		blender_object: bpy.types.Object = bone_batch.blender_object
+		blender_armature: bpy.types.Armature = blender_object.data # pyright: ignore[reportAssignmentType]
 
-		# Once Blender enters into edit-mode, the Bone references will be invalidated. Store the child-names as string.
-		children = []
+		if(stf_id not in bone_batch.bone_names):
+			return STFReport("Failed to create Bone", STFReportSeverity.Error, stf_id, cls.stf_type, blender_object)
+		blender_bone_name = bone_batch.bone_names[stf_id]
+
+		# The children already exist, this registers them and imports their components
 		for child_id in json_resource.get("children", []):
-			child: ArmatureBone | None = context.import_resource(json_resource, child_id, context_object, STF_Category.NODE)
-			if(child):
-				children.append(child.name)
-			else:
+			child: ArmatureBone | None = context.import_resource(json_resource, child_id, bone_batch, STF_Category.NODE)
+			if(not child):
 				context.report(STFReport("Invalid Child: " + str(child_id), STFReportSeverity.Error, stf_id, cls.stf_type, blender_object))
 
-		if(bpy.context.mode != "OBJECT"): bpy.ops.object.mode_set(mode="OBJECT", toggle=False)
-		bpy.context.view_layer.objects.active = blender_object
-		bpy.ops.object.mode_set(mode="EDIT", toggle=False)
-
-		blender_edit_bone = blender_armature.edit_bones.new(json_resource.get("name", "STF Bone"))
-		blender_bone_name = blender_edit_bone.name
-
-		blender_edit_bone.head = mathutils.Vector([0, 0, 0])
-		blender_edit_bone.tail = mathutils.Vector([0, 0, 1])
-		blender_edit_bone.roll = 0
-
-		blender_edit_bone.matrix = mathutils.Matrix.LocRotScale(trs_utils.stf_translation_to_blender(json_resource["translation"]), trs_utils.stf_rotation_to_blender(json_resource["rotation"]), mathutils.Vector([1, 1, 1])) @ mathutils.Matrix.Rotation(math.radians(90), 4, "X") # pyright: ignore[reportArgumentType]
-		blender_edit_bone.length = json_resource["length"]
-
-		if("connected" in json_resource): blender_edit_bone.use_connect = json_resource["connected"]
-		if("deform" in json_resource): blender_edit_bone.use_deform = json_resource["deform"]
-
-		for child_name in children:
-			child = blender_armature.edit_bones[child_name]
-			child.parent = blender_edit_bone
-
-		bpy.ops.object.mode_set(mode="OBJECT", toggle=False)
-
 		blender_bone = ArmatureBone(blender_armature, blender_bone_name)
 
 		context.register_imported_resource(stf_id, blender_bone)
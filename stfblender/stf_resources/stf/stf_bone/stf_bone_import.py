@@ -0,0 +1,103 @@
+import bpy
+import mathutils
+import math
+
+from .....stfblender_common import STF_ImportContext, STFReportSeverity, STFReport
+from .....stfblender_common.utils import trs_utils
+
+
+class STF_BoneImportBatch:
+	"""
+	All bones of an armature, created in a single edit-mode session.
+	Gets passed as the context object into the import of each bone, which then only has to register the already existing Blender bone.
+	"""
+	def __init__(self, blender_object: bpy.types.Object):
+		self.blender_object: bpy.types.Object = blender_object
+		self.bone_names: dict[str, str] = {} # STF ID -> Blender bone name
+
+
+def _resolve_reference(json_parent: dict, reference: int | str) -> str | None:
+	if(type(reference) is str): # todo remove this possibility sometime after stf v0.1.x
+		return reference
+	if(reference is None or "referenced_resources" not in json_parent or len(json_parent["referenced_resources"]) <= reference):
+		return None
+	return json_parent["referenced_resources"][reference]
+
+
+def create_bones(context: STF_ImportContext, json_parent: dict, bone_references: list[int | str], blender_object: bpy.types.Object, bone_type: str = "stf.bone") -> STF_BoneImportBatch:
+	"""
+	Create the bones referenced by `json_parent`, and all of their children, with one switch into and out of edit-mode.
+	Entering edit-mode rebuilds the armatures edit data, so doing it once per bone gets very slow for large rigs.
+	"""
+	ret = STF_BoneImportBatch(blender_object)
+	blender_armature: bpy.types.Armature = blender_object.data # pyright: ignore[reportAssignmentType]
+
+	# Collect the bone hierarchy. Bones are created children first, in the order importing one bone after another did, so duplicate names get the same suffixes.
+	bones: list[tuple[str, dict, str | None]] = [] # STF ID, JSON resource, parent STF ID
+	visited: set[str] = set()
+	next_bones = [(json_parent, reference, None) for reference in bone_references]
+	while(len(next_bones) > 0):
+		json_bone_parent, reference, parent_id = next_bones.pop()
+		bone_id = _resolve_reference(json_bone_parent, reference)
+		if(not bone_id or bone_id in visited): continue
+		visited.add(bone_id)
+
+		json_bone = context.get_json_resource(bone_id)
+		if(not json_bone or json_bone.get("type") != bone_type):
+			continue # Let the regular import handle and report it
+		bones.append((bone_id, json_bone, parent_id))
+		for child_reference in json_bone.get("children", []):
+			next_bones.append((json_bone, child_reference, bone_id))
+	# Visiting the last child first and reversing the result yields every bone after its children
+	bones.reverse()
+	children: dict[str, list[str]] = {} # STF ID -> child STF IDs
+	for bone_id, _, parent_id in bones:
+		if(parent_id):
+			children.setdefault(parent_id, []).append(bone_id)
+
+	if(len(bones) == 0):
+		return ret
+
+	with context.profile("mode_set", "EDIT"): # pyright: ignore[reportAttributeAccessIssue]
+		if(bpy.context.mode != "OBJECT"): bpy.ops.object.mode_set(mode="OBJECT", toggle=False)
+		bpy.context.view_layer.objects.active = blender_object
+		bpy.ops.object.mode_set(mode="EDIT", toggle=False)
+
+	blender_edit_bones: dict[str, bpy.types.EditBone] = {}
+	try:
+		for bone_id, json_bone, _ in bones:
+			blender_edit_bone = blender_armature.edit_bones.new(json_bone.get("name", "STF Bone"))
+			blender_edit_bones[bone_id] = blender_edit_bone
+			try:
+				blender_edit_bone.head = mathutils.Vector([0, 0, 0])
+				blender_edit_bone.tail = mathutils.Vector([0, 0, 1])
+				blender_edit_bone.roll = 0
+
+				blender_edit_bone.matrix = mathutils.Matrix.LocRotScale(trs_utils.stf_translation_to_blender(json_bone["translation"]), trs_utils.stf_rotation_to_blender(json_bone["rotation"]), mathutils.Vector([1, 1, 1])) @ mathutils.Matrix.Rotation(math.radians(90), 4, "X") # pyright: ignore[reportArgumentType]
+				blender_edit_bone.length = json_bone["length"]
+
+				if("connected" in json_bone): blender_edit_bone.use_connect = json_bone["connected"]
+				if("deform" in json_bone): blender_edit_bone.use_deform = json_bone["deform"]
+			except KeyError as error:
+				blender_armature.edit_bones.remove(blender_edit_bones.pop(bone_id))
+				context.report(STFReport("Invalid Bone: missing " + str(error), STFReportSeverity.Error, bone_id, bone_type, blender_object))
+				continue
+			ret.bone_names[bone_id] = blender_edit_bone.name
+
+		# Parent the children of each bone once it exists, like importing one bone after another did
+		for bone_id, _, _ in bones:
+			if(bone_id not in blender_edit_bones): continue
+			for child_id in children.get(bone_id, []):
+				if(child_id in blender_edit_bones):
+					blender_edit_bones[child_id].parent = blender_edit_bones[bone_id]
+	except:
+		# Don't leave a partial hierarchy behind
+		for blender_edit_bone in blender_edit_bones.values():
+			blender_armature.edit_bones.remove(blender_edit_bone)
+		ret.bone_names.clear()
+		raise
+	finally:
+		with context.profile("mode_set", "OBJECT"): # pyright: ignore[reportAttributeAccessIssue]
+			bpy.ops.object.mode_set(mode="OBJECT", toggle=False)
+
+	return ret
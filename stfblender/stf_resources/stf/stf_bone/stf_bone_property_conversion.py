@@ -1,10 +1,13 @@
 import mathutils
 import math
+import re
+import numpy as np
 from typing import Any, Callable
 
 from .....stfblender_common import STF_ImportContext, STF_ExportContext, BlenderPropertyPathPart, STFPropertyPathPart
 from .....stfblender_common.utils.armature_bone import ArmatureBone
 from .....stfblender_common.utils.animation_conversion_utils import *
+from ..stf_animation.stf_animation_conversion import axis_conversion_matrix
 
 
 # In Blender, bones get animated relative to their own rest pose.
@@ -15,6 +18,11 @@ from .....stfblender_common.utils.animation_conversion_utils import *
 Export
 """
 
+_location_pattern = re.compile(r"^location")
+_rotation_quaternion_pattern = re.compile(r"^rotation_quaternion")
+_rotation_euler_pattern = re.compile(r"^rotation_euler")
+_scale_pattern = re.compile(r"^scale")
+
 def _create_translation_to_stf_func(blender_object: ArmatureBone) -> Callable:
 	# let offset
 	if(blender_object.get_bone().parent):
@@ -25,6 +33,11 @@ def _create_translation_to_stf_func(blender_object: ArmatureBone) -> Callable:
 	def _ret(value: list[float]) -> list[float]:
 		value = mathutils.Matrix.Translation(mathutils.Vector(value)) # pyright: ignore[reportArgumentType, reportAssignmentType]
 		return convert_bone_translation_to_stf((offset @ value).translation[:])
+
+	axis_matrix = axis_conversion_matrix(convert_bone_translation_to_stf, 3)
+	matrix = axis_matrix @ np.array(offset.to_3x3(), dtype=np.float64)
+	translation = axis_matrix @ np.array(offset.translation, dtype=np.float64)
+	_ret.convert_array = lambda values: values @ matrix.T + translation # pyright: ignore[reportFunctionMemberAccess]
 	return _ret
 
 def _create_rotation_to_stf_func(blender_object: ArmatureBone) -> Callable:
@@ -63,12 +76,13 @@ def _create_scale_to_stf_func(blender_object: ArmatureBone) -> Callable:
 	def _ret(value: list[float]) -> list[float]:
 		value = [value[i] * offset[i] for i in range(len(value))]
 		return convert_bone_scale_to_stf(value)
+
+	matrix = axis_conversion_matrix(convert_bone_scale_to_stf, 3) * np.array(offset, dtype=np.float64)
+	_ret.convert_array = lambda values: values @ matrix.T # pyright: ignore[reportFunctionMemberAccess]
 	return _ret
 
 
 def export_blender_bone_animation(context: STF_ExportContext, blender_resource: ArmatureBone, property_index: int, blender_property_path: str) -> STFPropertyPathPart | None:
-	import re
-
 	has_constraints = False
 	for obj in context.get_root().all_objects[:]:
 		if(obj.data and obj.data == blender_resource.armature):
@@ -86,16 +100,16 @@ def export_blender_bone_animation(context: STF_ExportContext, blender_resource:
 		if(has_constraints): break
 
 
-	if(match := re.search(r"^location", blender_property_path)):
+	if(match := _location_pattern.search(blender_property_path)):
 		return STFPropertyPathPart([blender_resource.get_bone().stf_info.stf_id, "t"], _create_translation_to_stf_func(blender_resource), translation_bone_index_conversion_to_stf, has_constraints)
 
-	if(match := re.search(r"^rotation_quaternion", blender_property_path)):
+	if(match := _rotation_quaternion_pattern.search(blender_property_path)):
 		return STFPropertyPathPart([blender_resource.get_bone().stf_info.stf_id, "r"], _create_rotation_to_stf_func(blender_resource), rotation_bone_index_conversion_to_stf, has_constraints)
 
-	if(match := re.search(r"^rotation_euler", blender_property_path)):
+	if(match := _rotation_euler_pattern.search(blender_property_path)):
 		return STFPropertyPathPart([blender_resource.get_bone().stf_info.stf_id, "r_euler"], _create_rotation_euler_to_stf_func(blender_resource), rotation_euler_bone_index_conversion_to_stf, has_constraints)
 
-	if(match := re.search(r"^scale", blender_property_path)):
+	if(match := _scale_pattern.search(blender_property_path)):
 		return STFPropertyPathPart([blender_resource.get_bone().stf_info.stf_id, "s"], _create_scale_to_stf_func(blender_resource), scale_bone_index_conversion_to_stf, has_constraints)
 
 	return None
@@ -37,7 +37,7 @@ class Handler_STF_Image(STF_Handler_BlenderNative, STF_Handler_ComponentHolder):
 			blender_image.stf_info.stf_name_source_of_truth = True
 
 		try:
-			image_buffer = context.import_buffer(json_resource, json_resource["buffer"])
+			image_buffer = bytes(context.import_buffer(json_resource, json_resource["buffer"])) # pyright: ignore[reportArgumentType]
 			blender_image.pack(data=image_buffer, data_len=len(image_buffer)) # pyright: ignore[reportArgumentType]
 			blender_image.source = "FILE"
 
@@ -2,6 +2,7 @@ import bpy
 from bpy.types import Context, UILayout
 import mathutils
 import math
+import re
 from typing import Any
 
 from .....stfblender_common import STF_ExportContext, STF_ImportContext, STF_TaskSteps, STFReportSeverity, STFReport, BlenderPropertyPathPart, STFPropertyPathPart, STF_Category, STF_Handler_BlenderNative, STF_Handler_Animation, STF_ComponentBoneInstanceRef, ensure_stf_id, STFSetIDOperatorBase
@@ -13,6 +14,9 @@ from .stf_instance_armature_ui import STFSetArmatureInstanceIDOperator, draw_arm
 from .stf_instance_armature_utils import parse_standin, process_components, serialize_standin, update_armature_instance_component_standins
 
 
+_bone_path_pattern = re.compile(r"^pose.bones\[\"(?P<bone_name>[\w. -:,]+)\"\]")
+
+
 class STF_Instance_Armature(bpy.types.PropertyGroup):
 	stf_components: bpy.props.CollectionProperty(type=STF_ComponentBoneInstanceRef, options=set())
 	stf_active_component_index: bpy.props.IntProperty(options=set())
@@ -46,10 +50,11 @@ class Handler_STF_Instance_Armature(STF_Handler_BlenderNative, STF_Handler_Anima
 		context.register_imported_resource(stf_id, (blender_object, blender_armature))
 
 		if("pose" in json_resource):
-			if(bpy.context.mode != "OBJECT"): bpy.ops.object.mode_set(mode="OBJECT", toggle=False)
-			bpy.context.view_layer.objects.active = blender_object
-			bpy.ops.object.mode_set(mode="POSE", toggle=False)
-			bpy.ops.object.mode_set(mode="OBJECT", toggle=False)
+			with context.profile("mode_set", "POSE"): # pyright: ignore[reportAttributeAccessIssue]
+				if(bpy.context.mode != "OBJECT"): bpy.ops.object.mode_set(mode="OBJECT", toggle=False)
+				bpy.context.view_layer.objects.active = blender_object
+				bpy.ops.object.mode_set(mode="POSE", toggle=False)
+				bpy.ops.object.mode_set(mode="OBJECT", toggle=False)
 
 			if(blender_object.pose):
 				root_poses = []
@@ -179,8 +184,7 @@ class Handler_STF_Instance_Armature(STF_Handler_BlenderNative, STF_Handler_Anima
 
 	@classmethod
 	def export_blender_animation(cls, context: STF_ExportContext, blender_resource: Any, property_index: int, blender_property_path: str) -> STFPropertyPathPart | None:
-		import re
-		if(match := re.search(r"^pose.bones\[\"(?P<bone_name>[\w. -:,]+)\"\]", blender_property_path)):
+		if(match := _bone_path_pattern.search(blender_property_path)):
 			if(type(blender_resource.data) is not bpy.types.Armature or match.groupdict()["bone_name"] not in blender_resource.data.bones):
 				return None
 			return STFPropertyPathPart([blender_resource.stf_info.stf_id, "instance"]) + context.resolve_blender_property_path(ArmatureBone(blender_resource.data, match.groupdict()["bone_name"]), property_index, blender_property_path[match.span()[1] :])
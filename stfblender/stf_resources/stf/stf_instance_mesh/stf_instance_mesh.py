@@ -1,4 +1,5 @@
 import bpy
+import re
 from typing import Any
 
 from .....stfblender_common import STF_ExportContext, STF_ImportContext, STF_Handler_BlenderNative, STF_Info, BlenderPropertyPathPart, STF_Handler_Animation, STFPropertyPathPart, STFReportSeverity, STFReport, STF_Category, ensure_stf_id
@@ -7,6 +8,9 @@ from .stf_instance_mesh_data import STF_Instance_Mesh
 from .stf_instance_mesh_ops import RemoveUnmodifiedBlendshapeOverrides, STFDrawMeshInstanceBlendshapeList, STFSetMeshInstanceIDOperator
 
 
+_blendshape_path_pattern = re.compile(r"^key_blocks\[\"(?P<blendshape_name>[\w. -:,]+)\"\].value")
+
+
 class Handler_STF_Instance_Mesh(STF_Handler_BlenderNative, STF_Handler_Animation):
 	stf_type = "stf.instance.mesh"
 	stf_category = STF_Category.INSTANCE
@@ -137,8 +141,7 @@ class Handler_STF_Instance_Mesh(STF_Handler_BlenderNative, STF_Handler_Animation
 
 	@classmethod
 	def export_blender_animation(cls, context: STF_ExportContext, blender_object: Any, application_object_property_index: int, data_path: str) -> STFPropertyPathPart | None:
-		import re
-		match = re.search(r"^key_blocks\[\"(?P<blendshape_name>[\w. -:,]+)\"\].value", data_path)
+		match = _blendshape_path_pattern.search(data_path)
 		if(match and "blendshape_name" in match.groupdict()):
 			return STFPropertyPathPart([blender_object.stf_info.stf_id, "instance", "blendshape", match.groupdict()["blendshape_name"], "value"])
 		return None
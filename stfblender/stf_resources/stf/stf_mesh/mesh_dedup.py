@@ -0,0 +1,53 @@
+import numpy as np
+
+
+def deduplicate_splits(loop_vertex_indices: np.ndarray, loop_attributes: list[np.ndarray], threshold: float) -> tuple[np.ndarray, np.ndarray]:
+	"""
+	Merge face corners (loops) of the same vertex whose attributes are equal within `threshold` into shared splits.
+
+	Same as a sequential pass over the loops: each face corner joins the first split of its vertex where every attribute differs by a length of less than `threshold` from the face corner that started the split. Otherwise it starts a new split.
+	Unlike the previous per-loop implementation, uvs also need a distance of less than `threshold`, not less or equal, to merge.
+	Instead of one face corner at a time, the nth face corner of every vertex is processed at once.
+
+	:param np.ndarray loop_vertex_indices: Vertex index of each face corner.
+	:param list[np.ndarray] loop_attributes: Per face corner attributes, i.e. normals, uvs and colors. Each with the face corners along the first axis.
+	:param float threshold: Attribute values closer than this are merged.
+	:return: The index of the first face corner for each split, and the split index for each face corner.
+	"""
+	num_loops = len(loop_vertex_indices)
+	if(num_loops == 0):
+		return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+	# Face corners sorted by vertex, and within each vertex in loop order
+	order = np.argsort(np.reshape(loop_vertex_indices, -1), kind="stable")
+	sorted_vertex_indices = np.reshape(loop_vertex_indices, -1)[order]
+	is_group_start = np.ones(num_loops, dtype=bool)
+	is_group_start[1:] = sorted_vertex_indices[1:] != sorted_vertex_indices[:-1]
+	group_starts = np.flatnonzero(is_group_start)
+	ranks = np.arange(num_loops) - np.repeat(group_starts, np.diff(np.append(group_starts, num_loops)))
+
+	sorted_attributes = [np.reshape(attribute, (num_loops, -1)).astype(np.float64)[order] for attribute in loop_attributes]
+
+	# For each sorted face corner, the sorted position of the face corner that started its split
+	split_starts = np.arange(num_loops)
+	positions_by_rank = np.argsort(ranks, kind="stable")
+	rank_bounds = np.searchsorted(ranks[positions_by_rank], np.arange(ranks.max() + 2))
+	for rank in range(1, ranks.max() + 1):
+		positions = positions_by_rank[rank_bounds[rank]:rank_bounds[rank + 1]]
+		# The earlier face corners of the same vertex, which started a split
+		candidates = positions[:, None] - rank + np.arange(rank)[None, :]
+		matches = split_starts[candidates] == candidates
+		for attribute in sorted_attributes:
+			matches &= np.linalg.norm(attribute[candidates] - attribute[positions][:, None, :], axis=2) < threshold
+		has_match = np.any(matches, axis=1)
+		split_starts[positions] = np.where(has_match, candidates[np.arange(len(positions)), np.argmax(matches, axis=1)], positions)
+
+	loop_split_starts = np.empty(num_loops, dtype=np.int64)
+	loop_split_starts[order] = order[split_starts]
+
+	# Splits are ordered by the face corner that started them
+	deduped_split_indices = np.flatnonzero(loop_split_starts == np.arange(num_loops))
+	loop_to_split = np.full(num_loops, -1, dtype=np.int64)
+	loop_to_split[deduped_split_indices] = np.arange(len(deduped_split_indices))
+	face_corners_to_split = loop_to_split[loop_split_starts]
+	return deduped_split_indices, face_corners_to_split
@@ -0,0 +1,45 @@
+import bpy
+import numpy as np
+
+from .....stfblender_common import STF_ImportContext
+
+
+class MeshEdgeIndex:
+	"""Resolves pairs of vertex indices to edge indices, in either vertex order."""
+
+	def __init__(self, blender_mesh: bpy.types.Mesh):
+		edge_vertices = np.zeros(len(blender_mesh.edges) * 2, dtype=np.int64)
+		blender_mesh.edges.foreach_get("vertices", edge_vertices)
+		self.num_edges: int = len(blender_mesh.edges)
+		self._num_vertices: int = len(blender_mesh.vertices)
+
+		edge_keys = self._to_keys(np.reshape(edge_vertices, (-1, 2)))
+		self._order: np.ndarray = np.argsort(edge_keys, kind="stable")
+		self._sorted_keys: np.ndarray = edge_keys[self._order]
+
+	def _to_keys(self, vertex_pairs: np.ndarray) -> np.ndarray:
+		return np.min(vertex_pairs, axis=1) * self._num_vertices + np.max(vertex_pairs, axis=1)
+
+	def find_edges(self, vertex_pairs: np.ndarray) -> np.ndarray:
+		"""
+		:param np.ndarray vertex_pairs: Vertex indices of shape (n, 2), or flat.
+		:return: The index of the edge connecting each vertex pair, or -1 if there is none.
+		"""
+		vertex_pairs = np.reshape(vertex_pairs, (-1, 2)).astype(np.int64)
+		if(self.num_edges == 0):
+			return np.full(len(vertex_pairs), -1, dtype=np.int64)
+		valid = np.all((vertex_pairs >= 0) & (vertex_pairs < self._num_vertices), axis=1)
+		keys = self._to_keys(np.where(valid[:, None], vertex_pairs, 0))
+		positions = np.minimum(np.searchsorted(self._sorted_keys, keys), self.num_edges - 1)
+		found = valid & (self._sorted_keys[positions] == keys)
+		return np.where(found, self._order[positions], -1)
+
+
+def get_mesh_edge_index(context: STF_ImportContext, blender_mesh: bpy.types.Mesh) -> MeshEdgeIndex:
+	"""The edge index of a mesh is built once per import, and shared between the mesh and its components."""
+	cache_key = ("stf.mesh.edge_index", blender_mesh.as_pointer())
+	edge_index: MeshEdgeIndex | None = context.get_cached(cache_key) # pyright: ignore[reportAttributeAccessIssue]
+	if(edge_index is None or edge_index.num_edges != len(blender_mesh.edges)):
+		edge_index = MeshEdgeIndex(blender_mesh)
+		context.set_cached(cache_key, edge_index) # pyright: ignore[reportAttributeAccessIssue]
+	return edge_index
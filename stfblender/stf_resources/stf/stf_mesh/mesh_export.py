@@ -1,26 +1,26 @@
 # pyright: reportGeneralTypeIssues=none, reportPossiblyUnboundVariable=none
 import bpy
-import mathutils
-from io import BytesIO
 from typing import Any
 import numpy as np
 
 from .....stfblender_common import STF_ExportContext, STFReport, STF_Category, ensure_stf_id
-from .....stfblender_common.utils.buffer_utils import determine_indices_width, determine_pack_format_float, determine_pack_format_uint, serialize_float, serialize_uint
+from .....stfblender_common.utils.buffer_utils import determine_indices_width, determine_pack_format_float, determine_pack_format_uint
 from .mesh_common import stf_mesh_type
+from .mesh_dedup import deduplicate_splits
+from .mesh_topology import encode_topology
+from .mesh_weights import read_vertex_group_weights, split_by_group
 
 
 
 float_threshold = 0.0001
 float_threshold_blendshape = 0.0001
+# Number of blendshapes processed at once. Bounds the memory of the batched position and normal buffers.
+blendshape_chunk_size = 16
 
 
 # Mesh import and export are the lowest hanging fruits for performance improvements.
 
 def export_stf_mesh(context: STF_ExportContext, blender_resource: Any, context_resource: Any) -> tuple[dict, str] | STFReport:
-	#import time
-	#time_start = time.time()
-
 	blender_mesh: bpy.types.Mesh = blender_resource
 	ensure_stf_id(context, blender_mesh)
 
@@ -64,6 +64,13 @@ def export_stf_mesh(context: STF_ExportContext, blender_resource: Any, context_r
 	# Loop deduplication (Loop -> Split)
 	# One or more loops with the same attributes (normal, uvs, colors) will become one split.
 
+	buffer_loop_vertex_indices = np.zeros(len(blender_mesh.loops), dtype=np.int32)
+	blender_mesh.loops.foreach_get("vertex_index", buffer_loop_vertex_indices)
+
+	buffer_loop_normals = np.zeros(len(blender_mesh.loops) * 3, dtype=determine_pack_format_float(float_width))
+	blender_mesh.loops.foreach_get("normal", buffer_loop_normals)
+	buffer_loop_normals = np.reshape(buffer_loop_normals, (-1, 3))
+
 	# copy uv data, because accessing this normally has severely degraded performance in Blender 5.1
 	uv_layers = []
 	for uv_layer in blender_mesh.uv_layers:
@@ -72,56 +79,29 @@ def export_stf_mesh(context: STF_ExportContext, blender_resource: Any, context_r
 		uv_array = np.reshape(uv_array, (-1, 2))
 		uv_layers.append(uv_array)
 
-	def compareUVs(a: int, b: int) -> bool:
-		for uv_layer in uv_layers:
-			if (np.linalg.norm((uv_layer[a] - uv_layer[b])) > float_threshold):
-				return False
-		return True
-
-	def compareColors(a: int, b: int) -> bool:
-		if(not blender_mesh.stf_mesh.export_vertex_colors or not blender_mesh.color_attributes.active_color or blender_mesh.color_attributes.active_color.domain != "CORNER"): return True
-		return (mathutils.Vector(blender_mesh.color_attributes.active_color.data[a].color[:]) - mathutils.Vector(blender_mesh.color_attributes.active_color.data[b].color[:])).length < float_threshold
-
-	verts_to_split: dict[int, list] = {}
-	deduped_split_indices_list: list[int] = [] # indices of unique face corners
-	face_corners_to_split_list: list[int] = [] # if multiple face corners share the same attributes, point to the same split
-
-	for loop in blender_mesh.loops:
-		if (loop.vertex_index not in verts_to_split):
-			verts_to_split[loop.vertex_index] = [loop.index]
-			deduped_split_indices_list.append(loop.index)
-			face_corners_to_split_list.append(len(deduped_split_indices_list) - 1)
-		else:
-			for candidate_index in range(len(verts_to_split[loop.vertex_index])):
-				split_candidate = verts_to_split[loop.vertex_index][candidate_index]
-				if (
-					(loop.normal - blender_mesh.loops[split_candidate].normal).length < float_threshold
-					and compareUVs(loop.index, split_candidate)
-					and compareColors(loop.index, split_candidate)
-				):
-					face_corners_to_split_list.append(face_corners_to_split_list[split_candidate])
-					break
-			else:
-				verts_to_split[loop.vertex_index].append(loop.index)
-				deduped_split_indices_list.append(loop.index)
-				face_corners_to_split_list.append(len(deduped_split_indices_list) - 1)
-
-	deduped_split_indices = np.array(deduped_split_indices_list, dtype=determine_pack_format_uint(indices_width))
-	face_corners_to_split = np.array(face_corners_to_split_list, dtype=determine_pack_format_uint(indices_width))
+	# let buffer_loop_colors
+	export_split_colors = blender_mesh.stf_mesh.export_vertex_colors and blender_mesh.color_attributes.active_color and blender_mesh.color_attributes.active_color.domain == "CORNER"
+	if(export_split_colors):
+		buffer_loop_colors = np.zeros(len(blender_mesh.loops) * 4, dtype=determine_pack_format_float(float_width))
+		blender_mesh.color_attributes.active_color.data.foreach_get("color", buffer_loop_colors)
+		buffer_loop_colors = np.reshape(buffer_loop_colors, (-1, 4))
+
+	split_attributes = [buffer_loop_normals] + uv_layers
+	if(export_split_colors):
+		split_attributes.append(buffer_loop_colors)
+
+	deduped_split_indices, face_corners_to_split = deduplicate_splits(buffer_loop_vertex_indices, split_attributes, float_threshold)
+	deduped_split_indices = deduped_split_indices.astype(determine_pack_format_uint(indices_width))
+	face_corners_to_split = face_corners_to_split.astype(determine_pack_format_uint(indices_width))
 
 	# Splits & face corners
-	buffer_splits = np.zeros(len(blender_mesh.loops), dtype=determine_pack_format_uint(indices_width))
-	blender_mesh.loops.foreach_get("vertex_index", buffer_splits)
-	buffer_splits = buffer_splits[deduped_split_indices]
+	buffer_splits = buffer_loop_vertex_indices[deduped_split_indices].astype(determine_pack_format_uint(indices_width))
 
 	stf_mesh["face_corners"] = context.serialize_buffer(stf_mesh, face_corners_to_split.tobytes()) # Index of unique face corners to index of shared split data
 	stf_mesh["splits"] = context.serialize_buffer(stf_mesh, buffer_splits.tobytes())
 
 	# Split normals
-	buffer_split_normals = np.zeros(len(blender_mesh.loops) * 3, dtype=determine_pack_format_float(float_width))
-	blender_mesh.loops.foreach_get("normal", buffer_split_normals)
-	buffer_split_normals = np.reshape(buffer_split_normals, (-1, 3))
-	buffer_split_normals = buffer_split_normals[deduped_split_indices]
+	buffer_split_normals = buffer_loop_normals[deduped_split_indices]
 	buffer_split_normals[:, [1, 2]] = buffer_split_normals[:, [2, 1]]
 	buffer_split_normals[:, 2] *= -1
 	stf_mesh["split_normals"] = context.serialize_buffer(stf_mesh, buffer_split_normals.tobytes())
@@ -135,73 +115,33 @@ def export_stf_mesh(context: STF_ExportContext, blender_resource: Any, context_r
 	stf_mesh["uvs"] = uvs
 
 	# Split colors
-	if(blender_mesh.stf_mesh.export_vertex_colors and blender_mesh.color_attributes.active_color):
-		if(blender_mesh.color_attributes.active_color.domain == "CORNER"):
-			color_buffer = np.zeros(len(blender_mesh.loops) * 4, dtype=determine_pack_format_float(float_width))
-			blender_mesh.color_attributes.active_color.data.foreach_get("color", color_buffer)
-			color_buffer = np.reshape(color_buffer, (-1, 4))
-			color_buffer = color_buffer[deduped_split_indices]
-			stf_mesh["split_colors"] = context.serialize_buffer(stf_mesh, color_buffer.tobytes())
-
-	# Topology
-	buffer_tris = BytesIO()
-
-	# Loop through triangles, and also store how many belong to the same face
-	face_lens: list[int] = [0]
-	last_face_index = 0
-	for tris in blender_mesh.loop_triangles:
-		if(last_face_index == tris.polygon_index):
-			face_lens[len(face_lens) - 1] += 1
-		else:
-			face_lens.append(1)
-		for split_index in tris.loops:
-			buffer_tris.write(serialize_uint(split_index, indices_width))
-		last_face_index = tris.polygon_index
+	if(export_split_colors):
+		color_buffer = buffer_loop_colors[deduped_split_indices]
+		stf_mesh["split_colors"] = context.serialize_buffer(stf_mesh, color_buffer.tobytes())
 
-	stf_mesh["tris"] = context.serialize_buffer(stf_mesh, buffer_tris.getvalue())
-
-	# Material indices and face sharpness
+	# Topology, material indices, face and edge sharpness
 	material_indices_width = determine_indices_width(len(blender_mesh.materials))
 	stf_mesh["material_indices_width"] = material_indices_width
-	buffer_faces = BytesIO()
-	buffer_face_material_indices = BytesIO()
-	buffer_flat_face_indices = BytesIO()
-	for polygon in blender_mesh.polygons:
-		buffer_faces.write(serialize_uint(face_lens[polygon.index], indices_width))
-		buffer_face_material_indices.write(serialize_uint(polygon.material_index, material_indices_width))
-		if(not polygon.use_smooth):
-			buffer_flat_face_indices.write(serialize_uint(polygon.index, indices_width))
-
-	stf_mesh["faces"] = context.serialize_buffer(stf_mesh, buffer_faces.getvalue())
-	stf_mesh["material_indices"] = context.serialize_buffer(stf_mesh, buffer_face_material_indices.getvalue())
-	stf_mesh["sharp_face_indices"] = context.serialize_buffer(stf_mesh, buffer_flat_face_indices.getvalue())
-
-	# Lines (Edges not part of any face)
-	buffer_lines = BytesIO()
-	for edge in blender_mesh.edges:
-		if(edge.is_loose):
-			for edge_vertex_index in edge.vertices:
-				buffer_lines.write(serialize_uint(edge_vertex_index, indices_width))
-	stf_mesh["lines"] = context.serialize_buffer(stf_mesh, buffer_lines.getvalue())
-
-	# Explicit edge sharpness
-	buffer_sharp_edges = BytesIO()
-	for edge in blender_mesh.edges:
-		if(edge.use_edge_sharp and not edge.is_loose):
-			for edge_vertex_index in edge.vertices:
-				buffer_sharp_edges.write(serialize_uint(edge_vertex_index, indices_width))
-	stf_mesh["sharp_edges"] = context.serialize_buffer(stf_mesh, buffer_sharp_edges.getvalue())
+	for key, buffer in encode_topology(blender_mesh, indices_width, material_indices_width).items():
+		stf_mesh[key] = context.serialize_buffer(stf_mesh, buffer)
 
 	# TODO explicit vertex sharpness at some point Blender plz
 
+	# Vertex group assignments, shared by the weightpaint and the generic vertex groups
+	# let assigned_vertex_indices, assigned_group_indices, assigned_weights
+	if(len(tmp_blender_mesh_object.vertex_groups) > 0):
+		assigned_vertex_indices, assigned_group_indices, assigned_weights = read_vertex_group_weights(blender_mesh)
+	else:
+		assigned_vertex_indices, assigned_group_indices, assigned_weights = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+
 	# Weightpaint
 	if(armature and tmp_blender_mesh_object):
 		stf_mesh["armature"] = context.serialize_resource(stf_mesh, armature, stf_category=STF_Category.DATA)
 
-		# Create vertex group lookup dictionary for stf_ids
+		# Create vertex group lookup array for stf_ids
 		weight_bone_map = []
-		# dict[blendergroup_index, bone_id_index]
-		group_to_bone_index: dict[int, int] = {}
+		# blendergroup_index -> bone_id_index, -1 for groups that aren't bones
+		group_to_bone_index = np.full(len(tmp_blender_mesh_object.vertex_groups), -1, dtype=np.int64)
 		for group in tmp_blender_mesh_object.vertex_groups:
 			if(group.name in armature.bones):
 				weight_bone_map.append(armature.bones[group.name].stf_info.stf_id)
@@ -211,75 +151,56 @@ def export_stf_mesh(context: STF_ExportContext, blender_resource: Any, context_r
 		bone_indices_width = determine_indices_width(len(weight_bone_map))
 		stf_mesh["bone_indices_width"] = bone_indices_width
 
-		max_len_weights_per_vertex = 0
+		weight_bone_indices = group_to_bone_index[assigned_group_indices]
+		valid_weights = (weight_bone_indices >= 0) & (assigned_weights > float_threshold)
+		weight_vertex_indices = assigned_vertex_indices[valid_weights]
+		weight_bone_indices = weight_bone_indices[valid_weights]
+		weights = assigned_weights[valid_weights]
 
-		# list[list[tuple[bone_index, weight]]]
-		vertex_weights: list[list[tuple[int, float]]] = []
-		for vertex in blender_mesh.vertices:
-			group_arr = []
-			for channel, group in enumerate(vertex.groups):
-				if(group.group in group_to_bone_index and group.weight > float_threshold):
-					group_arr.append((group_to_bone_index[group.group], group.weight))
-			group_arr.sort(key=lambda e: e[1], reverse=True)
-			max_len_weights_per_vertex = max(max_len_weights_per_vertex, len(group_arr))
-			vertex_weights.append(group_arr)
+		# Order by vertex, and the weights of each vertex from highest to lowest
+		weight_order = np.lexsort((-weights, weight_vertex_indices))
+		weight_lens = np.bincount(weight_vertex_indices, minlength=len(blender_mesh.vertices))
 
-		weight_lens_width = determine_indices_width(max_len_weights_per_vertex)
+		weight_lens_width = determine_indices_width(int(weight_lens.max()) if len(weight_lens) > 0 else 0)
 
 		stf_mesh["weight_lens_width"] = weight_lens_width
 
-		weight_lens = BytesIO()
-		buffer_bone_indices = BytesIO()
-		buffer_weights = BytesIO()
-		for weights in vertex_weights:
-			# Write the number of weights for that vertex
-			weight_lens.write(serialize_uint(len(weights), weight_lens_width)) # weights per vertex
-			for weight in weights:
-				# Write the bone index and bone weight
-				buffer_bone_indices.write(serialize_uint(weight[0], bone_indices_width)) # bone index
-				buffer_weights.write(serialize_float(weight[1], float_width)) # bone weight
-
-		stf_mesh["weight_lens"] = context.serialize_buffer(stf_mesh, weight_lens.getvalue())
-		stf_mesh["bone_indices"] = context.serialize_buffer(stf_mesh, buffer_bone_indices.getvalue())
-		stf_mesh["weights"] = context.serialize_buffer(stf_mesh, buffer_weights.getvalue())
+		stf_mesh["weight_lens"] = context.serialize_buffer(stf_mesh, weight_lens.astype(determine_pack_format_uint(weight_lens_width)).tobytes())
+		stf_mesh["bone_indices"] = context.serialize_buffer(stf_mesh, weight_bone_indices[weight_order].astype(determine_pack_format_uint(bone_indices_width)).tobytes())
+		stf_mesh["weights"] = context.serialize_buffer(stf_mesh, weights[weight_order].astype(determine_pack_format_float(float_width)).tobytes())
 
 	# Vertex groups
 	if(tmp_blender_mesh_object):
-		group_index_to_group_name: dict[int, str] = {}
-		vertex_groups: dict[str, dict[int, float]] = {}
+		vertex_group_names: list[str] = []
+		# blendergroup_index -> index into vertex_group_names, -1 for weight paint groups
+		group_to_vertex_group_index = np.full(len(tmp_blender_mesh_object.vertex_groups), -1, dtype=np.int64)
 		for group in tmp_blender_mesh_object.vertex_groups:
 			if(not armature or group.name not in armature.bones): # don't include weight paint groups
-				vertex_groups[group.name] = {}
-				group_index_to_group_name[group.index] = group.name
+				vertex_group_names.append(group.name)
+				group_to_vertex_group_index[group.index] = len(vertex_group_names) - 1
 
-		if(len(vertex_groups) > 0):
-			for vertex in blender_mesh.vertices:
-				for group in vertex.groups:
-					if(group.group in group_index_to_group_name):
-						vertex_groups[group_index_to_group_name[group.group]][vertex.index] = group.weight
+		if(len(vertex_group_names) > 0):
+			group_indices = group_to_vertex_group_index[assigned_group_indices]
+			valid_assignments = group_indices >= 0
+			# Assignments stay ordered by vertex index within each group
+			groups_vertex_indices, groups_weights = split_by_group(group_indices[valid_assignments], len(vertex_group_names), assigned_vertex_indices[valid_assignments], assigned_weights[valid_assignments])
 
 			buffers_vertex_groups = []
 
-			for vertex_group_name, group in vertex_groups.items():
-				indexed = len(group) < (len(blender_mesh.vertices) / 2)
-				buffer_indices = BytesIO()
-				buffer_weights = BytesIO()
+			for vertex_group_name, group_vertex_indices, group_weights in zip(vertex_group_names, groups_vertex_indices, groups_weights):
+				indexed = len(group_vertex_indices) < (len(blender_mesh.vertices) / 2)
+				# let weights
 				if(indexed):
-					for vertex_index, weight in group.items():
-						buffer_indices.write(serialize_uint(vertex_index, indices_width)) # vertex index
-						buffer_weights.write(serialize_float(weight, float_width)) # vertex weight
+					weights = group_weights
 				else:
-					for vertex in blender_mesh.vertices:
-						if(vertex.index in group):
-							buffer_weights.write(serialize_float(group[vertex.index], float_width)) # vertex weight
-						else:
-							buffer_weights.write(serialize_float(0, float_width)) # vertex weight
+					weights = np.zeros(len(blender_mesh.vertices), dtype=np.float64)
+					weights[group_vertex_indices] = group_weights
 				vertex_group = {
 					"name": vertex_group_name,
-					"weights": context.serialize_buffer(stf_mesh, buffer_weights.getvalue()),
+					"weights": context.serialize_buffer(stf_mesh, weights.astype(determine_pack_format_float(float_width)).tobytes()),
 				}
 				if(indexed):
-					vertex_group["indices"] = context.serialize_buffer(stf_mesh, buffer_indices.getvalue())
+					vertex_group["indices"] = context.serialize_buffer(stf_mesh, group_vertex_indices.astype(determine_pack_format_uint(indices_width)).tobytes())
 				buffers_vertex_groups.append(vertex_group)
 			stf_mesh["vertex_groups"] = buffers_vertex_groups
 
@@ -287,59 +208,58 @@ def export_stf_mesh(context: STF_ExportContext, blender_resource: Any, context_r
 	if(blender_mesh.shape_keys):
 		blendshapes = []
 
-		for shape_key in blender_mesh.shape_keys.key_blocks:
-			if(shape_key == shape_key.relative_key or shape_key.mute or blender_mesh.shape_keys.key_blocks[0].name == shape_key.name):
-				continue
-
-			# TODO deal with vertex group multiplication maybe at some point
-
-			blendshape_offsets_buffer = np.zeros(len(blender_mesh.vertices) * 3, dtype=determine_pack_format_float(float_width))
-			shape_key.data.foreach_get("co", blendshape_offsets_buffer)
-			blendshape_offsets_buffer = np.reshape(blendshape_offsets_buffer, (-1, 3))
-			blendshape_offsets_buffer[:, [1, 2]] = blendshape_offsets_buffer[:, [2, 1]]
-			blendshape_offsets_buffer[:, 2] *= -1
-			blendshape_offsets_buffer -= buffer_vertices
-
-			blendshape_offset_lengths = np.linalg.norm(blendshape_offsets_buffer, 1, 1)
-			blendshape_offset_lengths_valid = np.where(blendshape_offset_lengths > float_threshold_blendshape, True, False)
-			num_valid = np.count_nonzero(blendshape_offset_lengths_valid)
-			indexed = num_valid < len(blender_mesh.vertices) * 0.75
-			# let blendshape_indices_buffer
-			if(indexed):
-				blendshape_indices_buffer = np.extract(blendshape_offset_lengths_valid, np.arange(len(blender_mesh.vertices), dtype=determine_pack_format_uint(indices_width)))
-
-			# let blendshape_normals_split_buffer
-			# let blendshape_split_indices_buffer
-			if(blender_mesh.stf_mesh.export_blendshape_normals):
-				blendshape_normals_split_buffer = np.array(shape_key.normals_split_get(), dtype=determine_pack_format_float(float_width))
-				blendshape_normals_split_buffer = np.reshape(blendshape_normals_split_buffer, (-1, 3))
-				blendshape_normals_split_buffer = blendshape_normals_split_buffer[deduped_split_indices]
-				blendshape_normals_split_buffer[:, [1, 2]] = blendshape_normals_split_buffer[:, [2, 1]]
-				blendshape_normals_split_buffer[:, 2] *= -1
-
-				if(indexed):
-					valid_split_positions = blendshape_offset_lengths_valid[buffer_splits]
-					blendshape_split_indices_buffer = np.extract(valid_split_positions, np.arange(len(blender_mesh.loops), dtype=determine_pack_format_uint(indices_width)))
-
-			blendshape = {
-				"name": shape_key.name,
-				"default_value": shape_key.value,
-				"limit_upper": shape_key.slider_max,
-				"limit_lower": shape_key.slider_min,
-			}
-			if(indexed):
-				blendshape["indices"] = context.serialize_buffer(stf_mesh, blendshape_indices_buffer.tobytes())
-				blendshape["position_offsets"] = context.serialize_buffer(stf_mesh, np.take(blendshape_offsets_buffer, blendshape_indices_buffer, 0).tobytes())
-				if(blender_mesh.stf_mesh.export_blendshape_normals):
-					blendshape["split_indices"] = context.serialize_buffer(stf_mesh, blendshape_split_indices_buffer.tobytes())
-					blendshape["split_normals"] = context.serialize_buffer(stf_mesh, np.take(blendshape_normals_split_buffer, blendshape_split_indices_buffer, 0).tobytes())
-			else:
-				blendshape["position_offsets"] = context.serialize_buffer(stf_mesh, blendshape_offsets_buffer.tobytes())
-				if(blender_mesh.stf_mesh.export_blendshape_normals):
-					blendshape["split_normals"] = context.serialize_buffer(stf_mesh, blendshape_normals_split_buffer.tobytes())
-			blendshapes.append(blendshape)
+		# TODO deal with vertex group multiplication maybe at some point
+		shape_keys = [shape_key for shape_key in blender_mesh.shape_keys.key_blocks if not (shape_key == shape_key.relative_key or shape_key.mute or blender_mesh.shape_keys.key_blocks[0].name == shape_key.name)]
+		export_blendshape_normals = blender_mesh.stf_mesh.export_blendshape_normals
+
+		# Reused for every chunk of blendshapes
+		chunk_offsets_buffer = np.empty((min(blendshape_chunk_size, len(shape_keys)), len(blender_mesh.vertices) * 3), dtype=determine_pack_format_float(float_width))
+		if(export_blendshape_normals):
+			chunk_normals_buffer = np.empty((min(blendshape_chunk_size, len(shape_keys)), len(blender_mesh.loops) * 3), dtype=determine_pack_format_float(float_width))
+
+		for chunk_start in range(0, len(shape_keys), blendshape_chunk_size):
+			chunk_shape_keys = shape_keys[chunk_start:chunk_start + blendshape_chunk_size]
+
+			for shape_key_index, shape_key in enumerate(chunk_shape_keys):
+				shape_key.data.foreach_get("co", chunk_offsets_buffer[shape_key_index])
+			blendshape_offsets = np.reshape(chunk_offsets_buffer[:len(chunk_shape_keys)], (len(chunk_shape_keys), -1, 3))
+			blendshape_offsets[:, :, [1, 2]] = blendshape_offsets[:, :, [2, 1]]
+			blendshape_offsets[:, :, 2] *= -1
+			blendshape_offsets -= buffer_vertices
+
+			blendshape_offsets_valid = np.sum(np.abs(blendshape_offsets), axis=2) > float_threshold_blendshape
+			blendshapes_indexed = np.count_nonzero(blendshape_offsets_valid, axis=1) < len(blender_mesh.vertices) * 0.75
+
+			# let blendshape_normals_split
+			if(export_blendshape_normals):
+				# There is no foreach_get for shape key normals, at least copy them straight into the preallocated buffer
+				for shape_key_index, shape_key in enumerate(chunk_shape_keys):
+					chunk_normals_buffer[shape_key_index] = shape_key.normals_split_get()
+				blendshape_normals_split = np.reshape(chunk_normals_buffer[:len(chunk_shape_keys)], (len(chunk_shape_keys), -1, 3))[:, deduped_split_indices]
+				blendshape_normals_split[:, :, [1, 2]] = blendshape_normals_split[:, :, [2, 1]]
+				blendshape_normals_split[:, :, 2] *= -1
+				blendshape_splits_valid = blendshape_offsets_valid[:, buffer_splits]
+
+			for shape_key_index, shape_key in enumerate(chunk_shape_keys):
+				blendshape = {
+					"name": shape_key.name,
+					"default_value": shape_key.value,
+					"limit_upper": shape_key.slider_max,
+					"limit_lower": shape_key.slider_min,
+				}
+				if(blendshapes_indexed[shape_key_index]):
+					blendshape_indices = np.flatnonzero(blendshape_offsets_valid[shape_key_index])
+					blendshape["indices"] = context.serialize_buffer(stf_mesh, blendshape_indices.astype(determine_pack_format_uint(indices_width)).tobytes())
+					blendshape["position_offsets"] = context.serialize_buffer(stf_mesh, blendshape_offsets[shape_key_index, blendshape_indices].tobytes())
+					if(export_blendshape_normals):
+						blendshape_split_indices = np.flatnonzero(blendshape_splits_valid[shape_key_index])
+						blendshape["split_indices"] = context.serialize_buffer(stf_mesh, blendshape_split_indices.astype(determine_pack_format_uint(indices_width)).tobytes())
+						blendshape["split_normals"] = context.serialize_buffer(stf_mesh, blendshape_normals_split[shape_key_index, blendshape_split_indices].tobytes())
+				else:
+					blendshape["position_offsets"] = context.serialize_buffer(stf_mesh, blendshape_offsets[shape_key_index].tobytes())
+					if(export_blendshape_normals):
+						blendshape["split_normals"] = context.serialize_buffer(stf_mesh, blendshape_normals_split[shape_key_index].tobytes())
+				blendshapes.append(blendshape)
 		stf_mesh["blendshapes"] = blendshapes
 
-	#print("Mesh " + blender_mesh.name + " export time: %.3f sec." % (time.time() - time_start))
-
 	return stf_mesh, blender_mesh.stf_info.stf_id
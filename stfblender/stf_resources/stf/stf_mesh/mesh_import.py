@@ -1,13 +1,14 @@
 # pyright: reportCallIssue=none, reportArgumentType=none, reportIndexIssue=none
 
 import bpy
-from io import BytesIO
 from typing import Any
 import numpy as np
 
 from .....stfblender_common import STF_ImportContext, STFReportSeverity, STFReport, STF_Category
-from .....stfblender_common.utils.buffer_utils import determine_pack_format_float, determine_pack_format_uint, parse_float, parse_uint
+from .....stfblender_common.utils.buffer_utils import determine_pack_format_float, determine_pack_format_uint
 from .mesh_common import stf_mesh_type
+from .mesh_edge_index import get_mesh_edge_index
+from .mesh_weights import add_vertex_group_weights, split_by_group
 
 
 # Mesh import and export are the lowest hanging fruits for performance improvements.
@@ -39,40 +40,48 @@ def import_stf_mesh(context: STF_ImportContext, json_resource: dict, stf_id: str
 		face_corners = np.frombuffer(context.import_buffer(json_resource, json_resource["face_corners"]), dtype=determine_pack_format_uint(indices_width))
 		buffer_full_splits = buffer_splits[face_corners]
 	else:
-		face_corners = np.array(range(len(buffer_splits)))
+		face_corners = np.arange(len(buffer_splits))
 		buffer_full_splits = buffer_splits
 
 
 	# Faces
-	py_faces = []
+	# Each face lists its number of triangles. The face corners of a face are the unique face corners of its triangles, in ascending order.
+	loop_starts = np.zeros(0, dtype=np.int32)
+	loop_vertex_indices = np.zeros(0, dtype=np.int32)
 	if("faces" in json_resource and "tris" in json_resource):
-		buffer_faces = BytesIO(context.import_buffer(json_resource, json_resource["faces"]))
-		buffer_tris = BytesIO(context.import_buffer(json_resource, json_resource["tris"]))
+		buffer_faces = np.frombuffer(context.import_buffer(json_resource, json_resource["faces"]), dtype=determine_pack_format_uint(indices_width))
+		buffer_tris = np.frombuffer(context.import_buffer(json_resource, json_resource["tris"]), dtype=determine_pack_format_uint(indices_width)).astype(np.int64)
 
-		for index in range(int(buffer_faces.getbuffer().nbytes / indices_width)):
-			face_len = parse_uint(buffer_faces, indices_width)
-			face_splits = set()
-			for _ in range(face_len):
-				face_splits.add(parse_uint(buffer_tris, indices_width))
-				face_splits.add(parse_uint(buffer_tris, indices_width))
-				face_splits.add(parse_uint(buffer_tris, indices_width))
+		if(len(buffer_faces) > 0 and len(buffer_tris) > 0):
+			corner_face_indices = np.repeat(np.arange(len(buffer_faces), dtype=np.int64), buffer_faces.astype(np.int64) * 3)
 
-			face_indices = []
-			for split_index in sorted(face_splits):
-				face_indices.append(buffer_full_splits[split_index])
-			py_faces.append(face_indices)
+			# Sort by face first and face corner second, while dropping face corners shared by multiple triangles of the same face
+			key_stride = int(buffer_tris.max()) + 1
+			face_corner_keys = np.unique(corner_face_indices * key_stride + buffer_tris)
+			loop_face_indices = face_corner_keys // key_stride
+			loop_corners = face_corner_keys % key_stride
+
+			loop_totals = np.bincount(loop_face_indices, minlength=len(buffer_faces))
+			loop_starts = (np.cumsum(loop_totals) - loop_totals).astype(np.int32)
+			loop_vertex_indices = buffer_full_splits[loop_corners].astype(np.int32)
 
 
 	# Lines (Edges not part of faces)
-	py_lines = []
+	buffer_lines = np.zeros(0, dtype=np.int32)
 	if("lines" in json_resource):
-		buffer_lines = BytesIO(context.import_buffer(json_resource, json_resource["lines"]))
-		for _line_index in range(int(buffer_lines.getbuffer().nbytes / (indices_width * 2))):
-			py_lines.append([parse_uint(buffer_lines, indices_width), parse_uint(buffer_lines, indices_width)])
+		buffer_lines = np.frombuffer(context.import_buffer(json_resource, json_resource["lines"]), dtype=determine_pack_format_uint(indices_width)).astype(np.int32)
 
 
 	# Construct the topology
-	blender_mesh.from_pydata(buffer_vertices, py_lines, py_faces, False)
+	blender_mesh.vertices.add(len(buffer_vertices))
+	blender_mesh.vertices.foreach_set("co", np.reshape(buffer_vertices, -1))
+	blender_mesh.edges.add(len(buffer_lines) // 2)
+	blender_mesh.edges.foreach_set("vertices", buffer_lines)
+	blender_mesh.loops.add(len(loop_vertex_indices))
+	blender_mesh.loops.foreach_set("vertex_index", loop_vertex_indices)
+	blender_mesh.polygons.add(len(loop_starts))
+	blender_mesh.polygons.foreach_set("loop_start", loop_starts) # face sizes follow from the next face's loop_start
+	blender_mesh.update(calc_edges=True)
 	if(blender_mesh.validate(verbose=True)): # return is True if errors found
 		context.report(STFReport("Invalid mesh", STFReportSeverity.Error, stf_id, stf_mesh_type, blender_mesh))
 
@@ -80,59 +89,46 @@ def import_stf_mesh(context: STF_ImportContext, json_resource: dict, stf_id: str
 	# Face smooth setting
 	# This must be set before applying custom split normals
 	if("sharp_face_indices" in json_resource):
-		buffer_sharp_face_indices = BytesIO(context.import_buffer(json_resource, json_resource["sharp_face_indices"]))
-		for _ in range(int(buffer_sharp_face_indices.getbuffer().nbytes / indices_width)):
-			smooth_index = parse_uint(buffer_sharp_face_indices, indices_width)
-			blender_mesh.polygons[smooth_index].use_smooth = False
+		buffer_sharp_face_indices = np.frombuffer(context.import_buffer(json_resource, json_resource["sharp_face_indices"]), dtype=determine_pack_format_uint(indices_width))
+		faces_smooth = np.zeros(len(blender_mesh.polygons), dtype=bool)
+		blender_mesh.polygons.foreach_get("use_smooth", faces_smooth)
+		faces_smooth[buffer_sharp_face_indices] = False
+		blender_mesh.polygons.foreach_set("use_smooth", faces_smooth)
 
 	# Explicit edge sharpness
 	# This must be set before applying custom split normals
-	sharp_edges = []
+	# let sharp_edges
+	sharp_edges = np.zeros(len(blender_mesh.edges), dtype=bool)
 	if("sharp_edges" in json_resource):
-		buffer_sharp_edges = BytesIO(context.import_buffer(json_resource, json_resource["sharp_edges"]))
-		edge_dict: dict[int, dict[int, bpy.types.MeshEdge]] = {}
-		for edge in blender_mesh.edges:
-			if(edge.vertices[0] not in edge_dict):
-				edge_dict[edge.vertices[0]] = {}
-			if(edge.vertices[1] not in edge_dict):
-				edge_dict[edge.vertices[1]] = {}
-			edge_dict[edge.vertices[0]][edge.vertices[1]] = edge
-			edge_dict[edge.vertices[1]][edge.vertices[0]] = edge
-		for _ in range(int(buffer_sharp_edges.getbuffer().nbytes / (indices_width * 2))):
-			v0_index = parse_uint(buffer_sharp_edges, indices_width)
-			v1_index = parse_uint(buffer_sharp_edges, indices_width)
-			edge_dict[v0_index][v1_index].use_edge_sharp = True
-			sharp_edges.append(edge_dict[v0_index][v1_index])
+		buffer_sharp_edges = np.frombuffer(context.import_buffer(json_resource, json_resource["sharp_edges"]), dtype=determine_pack_format_uint(indices_width))
+		sharp_edge_indices = get_mesh_edge_index(context, blender_mesh).find_edges(buffer_sharp_edges[:len(buffer_sharp_edges) // 2 * 2])
+		if(np.any(sharp_edge_indices < 0)):
+			context.report(STFReport("Invalid sharp edges", STFReportSeverity.Warn, stf_id, stf_mesh_type, blender_mesh))
+		sharp_edges[sharp_edge_indices[sharp_edge_indices >= 0]] = True
+		blender_mesh.edges.foreach_set("use_edge_sharp", sharp_edges)
 
 
 	# Face corners (Splits)
 	if("splits" in json_resource):
 		if("split_normals" in json_resource):
-			buffer_split_normals = np.copy(np.frombuffer(context.import_buffer(json_resource, json_resource["split_normals"]), dtype=determine_pack_format_float(float_width)))
-			buffer_split_normals = np.reshape(buffer_split_normals, (-1, 3))
-			buffer_split_normals[:, 2] *= -1
-			buffer_split_normals[:, [1, 2]] = buffer_split_normals[:, [2, 1]]
+			buffer_split_normals = np.reshape(np.frombuffer(context.import_buffer(json_resource, json_resource["split_normals"]), dtype=determine_pack_format_float(float_width)), (-1, 3))[:, [0, 2, 1]]
+			buffer_split_normals[:, 1] *= -1
 			blender_mesh.normals_split_custom_set(buffer_split_normals[face_corners])
 
 			# Undo what Blender does wrong during `normals_split_custom_set`, if applicable and possible
-			if(len(sharp_edges) > 0):
-				for edge in blender_mesh.edges:
-					if(edge not in sharp_edges):
-						edge.use_edge_sharp = False
+			if(np.any(sharp_edges)):
+				blender_mesh.edges.foreach_set("use_edge_sharp", sharp_edges)
 
 		if("uvs" in json_resource):
 			for uv_layer_index in range(len(json_resource["uvs"])):
 				uv_layer = blender_mesh.uv_layers.new(name=json_resource["uvs"][uv_layer_index].get("name", "UVMap"))
-				buffer_uv = np.copy(np.frombuffer(context.import_buffer(json_resource, json_resource["uvs"][uv_layer_index]["uv"]), dtype=determine_pack_format_float(float_width)))
-				buffer_uv = np.reshape(buffer_uv, (-1, 2))
+				# Gathering the face corners creates the only copy, which then gets converted in place
+				buffer_uv = np.reshape(np.frombuffer(context.import_buffer(json_resource, json_resource["uvs"][uv_layer_index]["uv"]), dtype=determine_pack_format_float(float_width)), (-1, 2))[face_corners]
 				buffer_uv[:, 1] = 1 - buffer_uv[:, 1]
-				buffer_uv = buffer_uv[face_corners]
 				uv_layer.uv.foreach_set("vector", np.reshape(buffer_uv, -1))
 
 		if("split_colors" in json_resource):
-			color_buffer = np.copy(np.frombuffer(context.import_buffer(json_resource, json_resource["split_colors"]), dtype=determine_pack_format_float(float_width)))
-			color_buffer = np.reshape(color_buffer, (-1, 4))
-			color_buffer = color_buffer[face_corners]
+			color_buffer = np.reshape(np.frombuffer(context.import_buffer(json_resource, json_resource["split_colors"]), dtype=determine_pack_format_float(float_width)), (-1, 4))[face_corners]
 			color_attribute = blender_mesh.color_attributes.new("Color", "FLOAT_COLOR", "CORNER")
 			color_attribute.data.foreach_set("color", np.reshape(color_buffer, -1))
 
@@ -148,9 +144,10 @@ def import_stf_mesh(context: STF_ImportContext, json_resource: dict, stf_id: str
 
 	if("material_indices" in json_resource):
 		material_indices_width = json_resource.get("material_indices_width", 4)
-		buffer_material_indices = BytesIO(context.import_buffer(json_resource, json_resource["material_indices"]))
-		for polygon in blender_mesh.polygons:
-			polygon.material_index = parse_uint(buffer_material_indices, material_indices_width)
+		buffer_material_indices = np.frombuffer(context.import_buffer(json_resource, json_resource["material_indices"]), dtype=determine_pack_format_uint(material_indices_width))
+		material_indices = np.zeros(len(blender_mesh.polygons), dtype=np.int32)
+		material_indices[:len(buffer_material_indices)] = buffer_material_indices[:len(material_indices)]
+		blender_mesh.polygons.foreach_set("material_index", material_indices)
 
 
 	# Weight paint
@@ -161,75 +158,61 @@ def import_stf_mesh(context: STF_ImportContext, json_resource: dict, stf_id: str
 		else:
 			bone_indices_width = json_resource.get("bone_indices_width", 1)
 			weight_lens_width = json_resource.get("weight_lens_width", 1)
-			bones = []
-			vertex_groups = []
+			bone_names = {blender_bone.stf_info.stf_id: blender_bone.name for blender_bone in armature.bones}
+			vertex_groups: list[bpy.types.VertexGroup] = []
 			for bone_id in json_resource["bones"]:
-				for blender_bone in armature.bones:
-					if(blender_bone.stf_info.stf_id == bone_id):
-						bones.append(blender_bone.name)
-						vertex_groups.append(tmp_blender_mesh_object.vertex_groups.new(name=blender_bone.name))
-						break
+				if(bone_id in bone_names):
+					vertex_groups.append(tmp_blender_mesh_object.vertex_groups.new(name=bone_names[bone_id]))
 			if(len(vertex_groups) < len(json_resource["bones"])):
 				context.report(STFReport("Invalid Bone Mapping", STFReportSeverity.Error, stf_id, stf_mesh_type, blender_mesh))
 
-			buffer_weight_lens = BytesIO(context.import_buffer(json_resource, json_resource["weight_lens"]))
-			buffer_bone_indices = BytesIO(context.import_buffer(json_resource, json_resource["bone_indices"]))
-			buffer_weights = BytesIO(context.import_buffer(json_resource, json_resource["weights"]))
-			for vertex in blender_mesh.vertices:
-				weights_count = parse_uint(buffer_weight_lens, weight_lens_width)
-				for weight_index in range(weights_count):
-					bone_index = parse_uint(buffer_bone_indices, bone_indices_width)
-					weight = parse_float(buffer_weights, float_width)
-					if(weight > 0):
-						vertex_groups[bone_index].add([vertex.index], weight, "REPLACE")
+			weight_lens = np.frombuffer(context.import_buffer(json_resource, json_resource["weight_lens"]), dtype=determine_pack_format_uint(weight_lens_width))[:len(blender_mesh.vertices)].astype(np.int64)
+			weight_vertex_indices = np.repeat(np.arange(len(weight_lens), dtype=np.int64), weight_lens)
+			weight_bone_indices = np.frombuffer(context.import_buffer(json_resource, json_resource["bone_indices"]), dtype=determine_pack_format_uint(bone_indices_width))[:len(weight_vertex_indices)].astype(np.int64)
+			weights = np.frombuffer(context.import_buffer(json_resource, json_resource["weights"]), dtype=determine_pack_format_float(float_width))[:len(weight_vertex_indices)]
+
+			valid_weights = (weights > 0) & (weight_bone_indices < len(vertex_groups))
+			for vertex_group, (group_vertex_indices, group_weights) in zip(vertex_groups, zip(*split_by_group(weight_bone_indices[valid_weights], len(vertex_groups), weight_vertex_indices[valid_weights], weights[valid_weights]))):
+				add_vertex_group_weights(vertex_group, group_vertex_indices, group_weights)
 
 	# Vertex groups
 	if("vertex_groups" in json_resource):
 		for vertex_group_index, json_vertex_group in enumerate(json_resource["vertex_groups"]):
-			indexed = "indices" in json_vertex_group
+			buffer_vertex_weights = np.frombuffer(context.import_buffer(json_resource, json_vertex_group["weights"]), dtype=determine_pack_format_float(float_width))
 			# let buffer_vertex_indices
-			if(indexed):
-				buffer_vertex_indices = BytesIO(context.import_buffer(json_resource, json_vertex_group["indices"]))
-			buffer_vertex_weights = BytesIO(context.import_buffer(json_resource, json_vertex_group["weights"]))
+			if("indices" in json_vertex_group):
+				buffer_vertex_indices = np.frombuffer(context.import_buffer(json_resource, json_vertex_group["indices"]), dtype=determine_pack_format_uint(indices_width))[:len(buffer_vertex_weights)].astype(np.int64)
+			else:
+				buffer_vertex_indices = np.arange(len(buffer_vertex_weights), dtype=np.int64)
 			vertex_group = tmp_blender_mesh_object.vertex_groups.new(name=json_vertex_group.get("name", "STF Vertex Group " + str(vertex_group_index)))
-			for index in range(int(buffer_vertex_weights.getbuffer().nbytes / float_width)):
-				## let vertex_index
-				if(indexed):
-					vertex_index = parse_uint(buffer_vertex_indices, indices_width) # pyright: ignore[reportPossiblyUnboundVariable]
-				else:
-					vertex_index = index
-				weight = parse_float(buffer_vertex_weights, float_width)
-				vertex_group.add([vertex_index], weight, "REPLACE")
+			add_vertex_group_weights(vertex_group, buffer_vertex_indices, buffer_vertex_weights[:len(buffer_vertex_indices)])
 
 	# Blendshapes / Morphtargets / Shapekeys / Blendtargets / Targetblends / Targetshapes / Morphshapes / Blendkeys / Shapetargets / Shapemorphs / Blendmorphs / Blendtargets / Morphblends / Morphkeys / Shapeblends / Blendblends / ...
 	if("blendshapes" in json_resource):
 		tmp_blender_mesh_object.shape_key_add(name="Basis", from_mix=False)
-		for blendshape_index, json_blendshape in enumerate(json_resource["blendshapes"]):
-			indexed = "indices" in json_blendshape
 
-			buffer_blendshape_pos_offset = np.copy(np.frombuffer(context.import_buffer(json_resource, json_blendshape["position_offsets"]), dtype=determine_pack_format_float(float_width)))
-			buffer_blendshape_pos_offset = np.reshape(buffer_blendshape_pos_offset, (-1, 3))
-			buffer_blendshape_pos_offset[:, 2] *= -1
-			buffer_blendshape_pos_offset[:, [1, 2]] = buffer_blendshape_pos_offset[:, [2, 1]]
+		# The base positions are the same for every blendshape
+		buffer_base_positions = np.zeros(len(blender_mesh.vertices) * 3, dtype=np.float32)
+		blender_mesh.vertices.foreach_get("co", buffer_base_positions)
+		buffer_base_positions = np.reshape(buffer_base_positions, (-1, 3))
+		buffer_blendshape_positions = np.empty_like(buffer_base_positions) # Reused for every blendshape
 
-			if(indexed):
-				buffer_blendshape_indices = np.frombuffer(context.import_buffer(json_resource, json_blendshape["indices"]), dtype=determine_pack_format_uint(indices_width))
-				buffer_blendshape_pos_offset_indexed = buffer_blendshape_pos_offset
-				buffer_blendshape_pos_offset = np.zeros((len(blender_mesh.vertices), 3), dtype=determine_pack_format_float(float_width))
-				for index, vertex_index in enumerate(buffer_blendshape_indices):
-					buffer_blendshape_pos_offset[vertex_index] = buffer_blendshape_pos_offset_indexed[index]
-
-			buffer_vertices = np.zeros(len(blender_mesh.vertices) * 3, dtype=determine_pack_format_float(float_width))
-			blender_mesh.vertices.foreach_get("co", buffer_vertices)
-			buffer_vertices = np.reshape(buffer_vertices, (-1, 3))
+		for blendshape_index, json_blendshape in enumerate(json_resource["blendshapes"]):
+			buffer_blendshape_pos_offset = np.reshape(np.frombuffer(context.import_buffer(json_resource, json_blendshape["position_offsets"]), dtype=determine_pack_format_float(float_width)), (-1, 3))[:, [0, 2, 1]]
+			buffer_blendshape_pos_offset[:, 1] *= -1
 
-			buffer_blendshape_pos_offset += buffer_vertices
+			buffer_blendshape_positions[:] = buffer_base_positions
+			if("indices" in json_blendshape):
+				buffer_blendshape_indices = np.frombuffer(context.import_buffer(json_resource, json_blendshape["indices"]), dtype=determine_pack_format_uint(indices_width))
+				buffer_blendshape_positions[buffer_blendshape_indices] += buffer_blendshape_pos_offset
+			else:
+				buffer_blendshape_positions += buffer_blendshape_pos_offset
 
 			# Normals and Tangents are irrelevant to import into Blender
 
 			shape_key = tmp_blender_mesh_object.shape_key_add(name=json_blendshape.get("name", "STF Blendshape " + str(blendshape_index)), from_mix=False)
 
-			shape_key.data.foreach_set("co", np.reshape(buffer_blendshape_pos_offset, -1))
+			shape_key.data.foreach_set("co", np.reshape(buffer_blendshape_positions, -1))
 
 			shape_key.value = json_blendshape.get("default_value", 0)
 			shape_key.slider_max = json_blendshape.get("limit_upper", 1)
@@ -0,0 +1,43 @@
+import bpy
+import numpy as np
+
+from .....stfblender_common.utils.buffer_utils import determine_pack_format_uint
+
+
+def _foreach_get(collection: bpy.types.bpy_prop_collection, attribute: str, dtype: type, components: int = 1) -> np.ndarray:
+	ret = np.zeros(len(collection) * components, dtype=dtype)
+	collection.foreach_get(attribute, ret)
+	return ret
+
+
+def encode_topology(blender_mesh: bpy.types.Mesh, indices_width: int, material_indices_width: int) -> dict[str, bytes]:
+	"""
+	Encode the triangles, faces, material indices, flat faces, loose edges and sharp edges of a mesh.
+	`calc_loop_triangles()` must have been called on the mesh.
+
+	:return: The serialized buffer for each of the STF mesh properties `tris`, `faces`, `material_indices`, `sharp_face_indices`, `lines` and `sharp_edges`.
+	"""
+	indices_format = determine_pack_format_uint(indices_width)
+
+	# Triangles by face corner, and how many belong to each face
+	tris_loops = _foreach_get(blender_mesh.loop_triangles, "loops", np.int64, 3)
+	tris_polygon_indices = _foreach_get(blender_mesh.loop_triangles, "polygon_index", np.int64)
+	face_lens = np.bincount(tris_polygon_indices, minlength=len(blender_mesh.polygons))[:len(blender_mesh.polygons)]
+
+	# Material indices and face sharpness
+	material_indices = _foreach_get(blender_mesh.polygons, "material_index", np.int64)
+	faces_smooth = _foreach_get(blender_mesh.polygons, "use_smooth", bool)
+
+	# Lines (Edges not part of any face) and explicit edge sharpness
+	edge_vertices = np.reshape(_foreach_get(blender_mesh.edges, "vertices", np.int64, 2), (-1, 2))
+	edges_loose = _foreach_get(blender_mesh.edges, "is_loose", bool)
+	edges_sharp = _foreach_get(blender_mesh.edges, "use_edge_sharp", bool)
+
+	return {
+		"tris": tris_loops.astype(indices_format).tobytes(),
+		"faces": face_lens.astype(indices_format).tobytes(),
+		"material_indices": material_indices.astype(determine_pack_format_uint(material_indices_width)).tobytes(),
+		"sharp_face_indices": np.flatnonzero(~faces_smooth).astype(indices_format).tobytes(),
+		"lines": edge_vertices[edges_loose].astype(indices_format).tobytes(),
+		"sharp_edges": edge_vertices[edges_sharp & ~edges_loose].astype(indices_format).tobytes(),
+	}
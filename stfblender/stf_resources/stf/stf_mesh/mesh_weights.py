@@ -0,0 +1,37 @@
+import bpy
+import numpy as np
+
+
+def read_vertex_group_weights(blender_mesh: bpy.types.Mesh) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+	"""
+	Read the vertex group assignments of all vertices as flat arrays, ordered by vertex.
+	Blender doesn't offer a `foreach_get` across the groups of all vertices, so this is the only pass over the vertices in Python.
+
+	:return: Vertex index, vertex group index and weight of each assignment.
+	"""
+	vertex_group_elements = [vertex.groups for vertex in blender_mesh.vertices]
+	counts = np.fromiter(map(len, vertex_group_elements), dtype=np.int64, count=len(vertex_group_elements))
+	num_elements = int(counts.sum())
+
+	vertex_indices = np.repeat(np.arange(len(vertex_group_elements), dtype=np.int64), counts)
+	group_indices = np.fromiter((element.group for elements in vertex_group_elements for element in elements), dtype=np.int64, count=num_elements)
+	weights = np.fromiter((element.weight for elements in vertex_group_elements for element in elements), dtype=np.float64, count=num_elements)
+	return vertex_indices, group_indices, weights
+
+
+def add_vertex_group_weights(vertex_group: bpy.types.VertexGroup, vertex_indices: np.ndarray, weights: np.ndarray):
+	"""Assign the vertices to the group with one `add` call per distinct weight, instead of one per vertex."""
+	if(len(vertex_indices) == 0):
+		return
+	unique_weights, weight_indices = np.unique(weights, return_inverse=True)
+	order = np.argsort(weight_indices, kind="stable")
+	vertex_indices_by_weight = np.split(vertex_indices[order], np.cumsum(np.bincount(weight_indices, minlength=len(unique_weights)))[:-1])
+	for weight, weight_vertex_indices in zip(unique_weights.tolist(), vertex_indices_by_weight):
+		vertex_group.add(weight_vertex_indices.tolist(), weight, "REPLACE")
+
+
+def split_by_group(group_indices: np.ndarray, num_groups: int, *arrays: np.ndarray) -> list[list[np.ndarray]]:
+	"""Split the arrays into one chunk per group index. The order within each group is preserved."""
+	order = np.argsort(group_indices, kind="stable")
+	boundaries = np.cumsum(np.bincount(group_indices, minlength=num_groups)[:num_groups])[:-1]
+	return [np.split(array[order], boundaries) for array in arrays]
@@ -2,10 +2,12 @@ import bpy
 import math
 import re
 import mathutils
+import numpy as np
 from typing import Any, Callable
 
 from .....stfblender_common import STF_ExportContext, STF_ImportContext, BlenderPropertyPathPart, STFPropertyPathPart
 from .....stfblender_common.utils.animation_conversion_utils import *
+from ..stf_animation.stf_animation_conversion import axis_conversion_matrix
 
 # The values that get animated in Blender, like 'location' or 'rotation_quaternion', are likely to be nonsense when the object has a parent.
 # These properties likely won't be relative to the parent or world.
@@ -17,24 +19,31 @@ from .....stfblender_common.utils.animation_conversion_utils import *
 Export
 """
 
+_location_pattern = re.compile(r"^location")
+_rotation_quaternion_pattern = re.compile(r"^rotation_quaternion")
+_rotation_euler_pattern = re.compile(r"^rotation_euler")
+_scale_pattern = re.compile(r"^scale")
+_hide_render_pattern = re.compile(r"^hide_render")
+
 def _create_translation_to_stf_func(blender_object: bpy.types.Object) -> Callable:
 	if(blender_object.parent_type == "OBJECT" and blender_object.parent):
 		offset = blender_object.matrix_parent_inverse.copy()
 
-		def _ret(value: list[float]) -> list[float]: # pyright: ignore[reportRedeclaration]
-			return convert_translation_to_stf((offset @ mathutils.Matrix.Translation(value)).translation)
-		return _ret
-
 	elif(blender_object.parent_type == "BONE" and blender_object.parent and blender_object.parent_bone):
 		pose_bone = blender_object.parent.pose.bones[blender_object.parent_bone]
 		offset = mathutils.Matrix.Translation([0, 0, (pose_bone.tail - pose_bone.head).length]) @ mathutils.Matrix.Rotation(math.radians(90), 4, "X") @ blender_object.matrix_parent_inverse
 
-		def _ret(value: list[float]) -> list[float]:
-			return convert_translation_to_stf((offset @ mathutils.Matrix.Translation(value)).translation)
-		return _ret
-
 	else:
-		return convert_translation_to_stf
+		offset = mathutils.Matrix.Identity(4)
+
+	def _ret(value: list[float]) -> list[float]:
+		return convert_translation_to_stf((offset @ mathutils.Matrix.Translation(value)).translation)
+
+	axis_matrix = axis_conversion_matrix(convert_translation_to_stf, 3)
+	matrix = axis_matrix @ np.array(offset.to_3x3(), dtype=np.float64)
+	translation = axis_matrix @ np.array(offset.translation, dtype=np.float64)
+	_ret.convert_array = lambda values: values @ matrix.T + translation # pyright: ignore[reportFunctionMemberAccess]
+	return _ret
 
 def _convert_bone_offset_rotation_to_stf(blender_object: bpy.types.Object) -> mathutils.Matrix:
 	return mathutils.Matrix.Rotation(math.radians(90), 4, "X") @ blender_object.matrix_parent_inverse
@@ -88,6 +97,9 @@ def _create_scale_to_stf_func(blender_object: bpy.types.Object) -> Callable:
 	def _ret(value: list[float]) -> list[float]:
 		value = [value[i] * offset[i] for i in range(3)]
 		return convert_scale_to_stf(value)
+
+	matrix = axis_conversion_matrix(convert_scale_to_stf, 3) * np.array(offset, dtype=np.float64)
+	_ret.convert_array = lambda values: values @ matrix.T # pyright: ignore[reportFunctionMemberAccess]
 	return _ret
 
 
@@ -95,19 +107,19 @@ def stf_node_export_blender_animation(context: STF_ExportContext, blender_resour
 
 	has_constraints = len(blender_resource.constraints) > 0
 
-	if(match := re.search(r"^location", blender_property_path)):
+	if(match := _location_pattern.search(blender_property_path)):
 		return STFPropertyPathPart([blender_resource.stf_info.stf_id, "t"], _create_translation_to_stf_func(blender_resource), translation_index_conversion_to_stf, has_constraints)
 
-	if(match := re.search(r"^rotation_quaternion", blender_property_path)):
+	if(match := _rotation_quaternion_pattern.search(blender_property_path)):
 		return STFPropertyPathPart([blender_resource.stf_info.stf_id, "r"], _create_rotation_to_stf_func(blender_resource), rotation_index_conversion_to_stf, has_constraints)
 
-	if(match := re.search(r"^rotation_euler", blender_property_path)):
+	if(match := _rotation_euler_pattern.search(blender_property_path)):
 		return STFPropertyPathPart([blender_resource.stf_info.stf_id, "r_euler"], _create_rotation_euler_to_stf_func(blender_resource), rotation_euler_index_conversion_to_stf, has_constraints)
 
-	if(match := re.search(r"^scale", blender_property_path)):
+	if(match := _scale_pattern.search(blender_property_path)):
 		return STFPropertyPathPart([blender_resource.stf_info.stf_id, "s"], _create_scale_to_stf_func(blender_resource), scale_index_conversion_to_stf, has_constraints)
 
-	if(match := re.search(r"^hide_render", blender_property_path)):
+	if(match := _hide_render_pattern.search(blender_property_path)):
 		return STFPropertyPathPart([blender_resource.stf_info.stf_id, "enabled"], lambda v: [0 if v[0] else 1], None, has_constraints)
 
 	return None
@@ -8,6 +8,7 @@ import numpy as np
 
 from ....stfblender_common import STF_ExportContext, STF_ImportContext, STF_Category, STF_ComponentResourceBase, STF_Handler_Component, STF_ExportComponentHook, STFReport, add_component, export_component_base, import_component_base
 from ....stfblender_common.utils.buffer_utils import determine_indices_width, determine_pack_format_float
+from ..stf.stf_mesh.mesh_edge_index import get_mesh_edge_index
 
 
 class STFEXP_Mesh_Creases(STF_ComponentResourceBase):
@@ -37,23 +38,15 @@ class Handler_STF_Mesh_Creases(STF_Handler_Component):
 			indices_width: int = json_resource.get("indices_width", 4)
 			buffer_edge_creases = np.frombuffer(context.import_buffer(json_resource, json_resource["edge_creases"]), dtype=determine_pack_format_float(4)) # pyright: ignore[reportCallIssue, reportArgumentType]
 			buffer_edges = np.frombuffer(context.import_buffer(json_resource, json_resource["edges"]), dtype=determine_pack_format_float(indices_width)) # pyright: ignore[reportCallIssue, reportArgumentType]
-			buffer_edges = np.reshape(buffer_edges, (-1, 2))
+			buffer_edges = np.reshape(buffer_edges, (-1, 2))[:len(buffer_edge_creases)]
+			crease_edge_indices = get_mesh_edge_index(context, context_resource).find_edges(buffer_edges)
+			valid_creases = crease_edge_indices >= 0
 
-			edge_dict: dict[int, dict[int, int]] = {}
-			for edge in context_resource.edges:
-				if(edge.vertices[0] not in edge_dict):
-					edge_dict[edge.vertices[0]] = {}
-				if(edge.vertices[1] not in edge_dict):
-					edge_dict[edge.vertices[1]] = {}
-				edge_dict[edge.vertices[0]][edge.vertices[1]] = edge.index
-				edge_dict[edge.vertices[1]][edge.vertices[0]] = edge.index
+			edge_creases = np.zeros(len(context_resource.edges), dtype=np.float32)
+			edge_creases[crease_edge_indices[valid_creases]] = buffer_edge_creases[:len(buffer_edges)][valid_creases]
 
 			edge_creases_attribute = context_resource.attributes.new("crease_edge", "FLOAT", "EDGE")
-
-			for edge_index in range(len(buffer_edges)):
-				v0_index = buffer_edges[edge_index][0]
-				v1_index = buffer_edges[edge_index][1]
-				edge_creases_attribute.data[edge_dict[v0_index][v1_index]].value = buffer_edge_creases[edge_index]
+			edge_creases_attribute.data.foreach_set("value", edge_creases)
 
 		component_ref, component = add_component(context_resource, cls.blender_property_name, stf_id, cls.stf_type)
 		import_component_base(context, component, json_resource, cls.blender_property_name, context_resource)
@@ -4,9 +4,11 @@ import bpy
 import uuid
 from io import BytesIO
 from typing import Any
+import numpy as np
 
 from ....stfblender_common import STF_ExportContext, STF_ImportContext, STF_Category, STF_ComponentResourceBase, STF_Handler_Component, STF_ExportComponentHook, STFReport, add_component, export_component_base, import_component_base
-from ....stfblender_common.utils.buffer_utils import determine_indices_width, parse_uint, serialize_uint
+from ....stfblender_common.utils.buffer_utils import determine_indices_width, determine_pack_format_uint, serialize_uint
+from ..stf.stf_mesh.mesh_edge_index import get_mesh_edge_index
 
 
 class STFEXP_Mesh_Seams(STF_ComponentResourceBase):
@@ -24,23 +26,15 @@ class Handler_STF_Mesh_Seams(STF_Handler_Component):
 
 	@classmethod
 	def import_resource(cls, context: STF_ImportContext, json_resource: dict, stf_id: str, context_resource: bpy.types.Mesh | None) -> Any | STFReport:
-		buffer_seams = BytesIO(context.import_buffer(json_resource, json_resource["seams"])) # pyright: ignore[reportArgumentType]
-
 		indices_width: int = json_resource.get("indices_width", 4)
 
-		edge_dict: dict[int, dict[int, bpy.types.MeshEdge]] = {}
-		for edge in context_resource.edges:
-			if(edge.vertices[0] not in edge_dict):
-				edge_dict[edge.vertices[0]] = {}
-			if(edge.vertices[1] not in edge_dict):
-				edge_dict[edge.vertices[1]] = {}
-			edge_dict[edge.vertices[0]][edge.vertices[1]] = edge
-			edge_dict[edge.vertices[1]][edge.vertices[0]] = edge
-
-		for _ in range(int((buffer_seams.getbuffer().nbytes / indices_width) / 2)):
-			v0_index = parse_uint(buffer_seams, indices_width) # pyright: ignore[reportArgumentType]
-			v1_index = parse_uint(buffer_seams, indices_width) # pyright: ignore[reportArgumentType]
-			edge_dict[v0_index][v1_index].use_seam = True
+		buffer_seams = np.frombuffer(context.import_buffer(json_resource, json_resource["seams"]), dtype=determine_pack_format_uint(indices_width)) # pyright: ignore[reportCallIssue, reportArgumentType]
+		seam_edge_indices = get_mesh_edge_index(context, context_resource).find_edges(buffer_seams[:len(buffer_seams) // 2 * 2])
+
+		seams = np.zeros(len(context_resource.edges), dtype=bool)
+		context_resource.edges.foreach_get("use_seam", seams)
+		seams[seam_edge_indices[seam_edge_indices >= 0]] = True
+		context_resource.edges.foreach_set("use_seam", seams)
 
 		component_ref, component = add_component(context_resource, cls.blender_property_name, stf_id, cls.stf_type)
 		import_component_base(context, component, json_resource, cls.blender_property_name, context_resource)
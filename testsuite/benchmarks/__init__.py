@@ -0,0 +1 @@
+from ..run_testsuite import import_stf_module
@@ -0,0 +1,81 @@
+import bpy
+import os
+import tempfile
+import time
+import numpy as np
+
+from . import import_stf_module
+
+
+# Vertex count of the generated head mesh, and the numbers of blendshapes to import it with
+NUM_VERTICES = 50_000
+BLENDSHAPE_COUNTS = [10, 100, 500]
+# Like face tracking shapes, most blendshapes only move a small part of the mesh
+INDEXED_FRACTION = 0.05
+
+
+def _create_mesh_collection(num_blendshapes: int) -> bpy.types.Collection:
+	collection = bpy.data.collections.new("STF Benchmark Blendshapes")
+	bpy.context.scene.collection.children.link(collection)
+	bpy.ops.mesh.primitive_uv_sphere_add(segments=int(np.sqrt(NUM_VERTICES)), ring_count=int(np.sqrt(NUM_VERTICES)))
+	blender_object = bpy.context.object
+	for user_collection in blender_object.users_collection:
+		user_collection.objects.unlink(blender_object)
+	collection.objects.link(blender_object)
+	blender_mesh: bpy.types.Mesh = blender_object.data # pyright: ignore[reportAssignmentType]
+
+	rng = np.random.default_rng(0)
+	base_positions = np.zeros(len(blender_mesh.vertices) * 3, dtype=np.float32)
+	blender_mesh.vertices.foreach_get("co", base_positions)
+	base_positions = np.reshape(base_positions, (-1, 3))
+	blender_object.shape_key_add(name="Basis", from_mix=False)
+	for blendshape_index in range(num_blendshapes):
+		positions = base_positions.copy()
+		# Every tenth blendshape moves the entire mesh, and gets exported dense
+		moved = rng.random(len(positions)) < (1 if blendshape_index % 10 == 0 else INDEXED_FRACTION)
+		positions[moved] += rng.normal(0, 0.01, (np.count_nonzero(moved), 3)).astype(np.float32)
+		shape_key = blender_object.shape_key_add(name="Blendshape " + str(blendshape_index), from_mix=False)
+		shape_key.data.foreach_set("co", np.reshape(positions, -1))
+	blender_mesh.stf_mesh.export_blendshape_normals = False
+	return collection
+
+
+def _remove_collection(collection: bpy.types.Collection):
+	for blender_object in list(collection.all_objects):
+		blender_data = blender_object.data
+		bpy.data.objects.remove(blender_object)
+		if(type(blender_data) is bpy.types.Mesh):
+			bpy.data.meshes.remove(blender_data)
+	bpy.data.collections.remove(collection)
+
+
+def run_benchmark() -> list[dict]:
+	exporter = import_stf_module("stfblender.io.exporter.exporter")
+	importer = import_stf_module("stfblender.io.importer.importer")
+
+	ret = []
+	with tempfile.TemporaryDirectory() as directory:
+		for num_blendshapes in BLENDSHAPE_COUNTS:
+			filepath = os.path.join(directory, "blendshapes_%d.stf" % num_blendshapes)
+			collection = _create_mesh_collection(num_blendshapes)
+			export_result = exporter.export_stf_file(collection, filepath, None)
+			_remove_collection(collection)
+			if(not export_result.success):
+				ret.append({"blendshapes": num_blendshapes, "error": export_result.error_message})
+				continue
+
+			time_start = time.perf_counter()
+			import_result = importer.import_stf_file(filepath, None)
+			import_time = time.perf_counter() - time_start
+			if(not import_result.success):
+				ret.append({"blendshapes": num_blendshapes, "error": import_result.error_message})
+				continue
+
+			ret.append({
+				"blendshapes": num_blendshapes,
+				"vertices": NUM_VERTICES,
+				"time": import_time,
+				"mesh_handler_time": sum(entry.self_time for entry in import_result.profile.get_entries("handler") if entry.key == "stf.mesh"),
+			})
+			_remove_collection(import_result.collection)
+	return ret
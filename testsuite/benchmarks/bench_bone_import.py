@@ -0,0 +1,74 @@
+import bpy
+import os
+import tempfile
+import time
+
+from . import import_stf_module
+
+
+# Bone hierarchies of chains with this many bones, branching off a root bone
+CHAIN_LENGTH = 10
+BONE_COUNTS = [10, 100, 400, 1_000]
+
+
+def _create_armature_collection(num_bones: int) -> bpy.types.Collection:
+	collection = bpy.data.collections.new("STF Benchmark Bones")
+	bpy.context.scene.collection.children.link(collection)
+	blender_armature = bpy.data.armatures.new("STF Benchmark Armature")
+	blender_object = bpy.data.objects.new("STF Benchmark Armature", blender_armature)
+	collection.objects.link(blender_object)
+
+	bpy.context.view_layer.objects.active = blender_object
+	bpy.ops.object.mode_set(mode="EDIT", toggle=False)
+	root = blender_armature.edit_bones.new("root")
+	root.head = (0, 0, 0); root.tail = (0, 0, 0.1)
+	for bone_index in range(num_bones - 1):
+		chain, link = divmod(bone_index, CHAIN_LENGTH)
+		bone = blender_armature.edit_bones.new("chain_%d_%d" % (chain, link))
+		bone.head = (chain * 0.1, 0, 0.1 + link * 0.1); bone.tail = (chain * 0.1, 0, 0.2 + link * 0.1)
+		bone.parent = root if link == 0 else blender_armature.edit_bones["chain_%d_%d" % (chain, link - 1)]
+		bone.use_connect = link > 0
+	bpy.ops.object.mode_set(mode="OBJECT", toggle=False)
+	return collection
+
+
+def _remove_collection(collection: bpy.types.Collection):
+	for blender_object in list(collection.all_objects):
+		blender_data = blender_object.data
+		bpy.data.objects.remove(blender_object)
+		if(type(blender_data) is bpy.types.Armature):
+			bpy.data.armatures.remove(blender_data)
+	bpy.data.collections.remove(collection)
+
+
+def run_benchmark() -> list[dict]:
+	exporter = import_stf_module("stfblender.io.exporter.exporter")
+	importer = import_stf_module("stfblender.io.importer.importer")
+
+	ret = []
+	with tempfile.TemporaryDirectory() as directory:
+		for num_bones in BONE_COUNTS:
+			filepath = os.path.join(directory, "bones_%d.stf" % num_bones)
+			collection = _create_armature_collection(num_bones)
+			export_result = exporter.export_stf_file(collection, filepath, None)
+			_remove_collection(collection)
+			if(not export_result.success):
+				ret.append({"bones": num_bones, "error": export_result.error_message})
+				continue
+
+			time_start = time.perf_counter()
+			import_result = importer.import_stf_file(filepath, None)
+			import_time = time.perf_counter() - time_start
+			if(not import_result.success):
+				ret.append({"bones": num_bones, "error": import_result.error_message})
+				continue
+
+			ret.append({
+				"bones": num_bones,
+				"time": import_time,
+				"mode_set_count": sum(entry.count for entry in import_result.profile.get_entries("mode_set")),
+				"mode_set_time": sum(entry.time for entry in import_result.profile.get_entries("mode_set")),
+				"bone_handler_time": sum(entry.self_time for entry in import_result.profile.get_entries("handler") if entry.key == "stf.bone"),
+			})
+			_remove_collection(import_result.collection)
+	return ret
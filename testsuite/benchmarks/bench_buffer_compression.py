@@ -0,0 +1,52 @@
+import os
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from . import import_stf_module
+
+
+# Number of buffers and size of each, roughly what a large avatar export produces
+NUM_BUFFERS = 64
+BUFFER_SIZE = 1024 * 1024
+
+
+def _create_buffers() -> dict[str, list[bytes]]:
+	# Grid vertex positions, similar to mesh data
+	grid = np.indices((64, 64, BUFFER_SIZE // (64 * 64 * 12))).reshape(3, -1).T.astype(np.float32) * 0.01
+	positions = grid.tobytes()[:BUFFER_SIZE]
+	# Small integer indices, similar to face and weight index buffers
+	indices = (np.arange(BUFFER_SIZE // 4, dtype=np.uint32) // 3).tobytes()
+	# Incompressible, like embedded png or jpeg images
+	random = os.urandom(BUFFER_SIZE)
+	return {
+		"positions": [positions] * NUM_BUFFERS,
+		"indices": [indices] * NUM_BUFFERS,
+		"random": [random] * NUM_BUFFERS,
+	}
+
+
+def run_benchmark() -> list[dict]:
+	stf_buffer_compression = import_stf_module("stfblender.io.stf_buffer_compression")
+
+	ret = []
+	for name, buffers in _create_buffers().items():
+		time_start = time.perf_counter()
+		results = [stf_buffer_compression.compress_buffer(buffer) for buffer in buffers]
+		time_serial = time.perf_counter() - time_start
+
+		time_start = time.perf_counter()
+		with ThreadPoolExecutor() as pool:
+			list(pool.map(stf_buffer_compression.compress_buffer, buffers))
+		time_parallel = time.perf_counter() - time_start
+
+		size = sum(len(buffer) for buffer in buffers)
+		compressed_size = sum(len(data) for data, _ in results)
+		ret.append({
+			"data": name,
+			"buffer_type": results[0][1],
+			"ratio": compressed_size / size,
+			"serial_mb_per_s": size / time_serial / 1_000_000,
+			"parallel_mb_per_s": size / time_parallel / 1_000_000,
+		})
+	return ret
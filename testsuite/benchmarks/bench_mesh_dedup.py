@@ -0,0 +1,92 @@
+import bpy
+import math
+import time
+import numpy as np
+
+from . import import_stf_module
+
+
+# Number of face corners of the generated grids
+MESH_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+# The previous per-loop implementation gets too slow to wait for beyond this
+LEGACY_MAX_SIZE = 10_000
+
+
+def _create_grid_mesh(num_loops: int) -> bpy.types.Mesh:
+	subdivisions = max(2, int(math.sqrt(num_loops / 4)) + 1)
+	bpy.ops.mesh.primitive_grid_add(x_subdivisions=subdivisions, y_subdivisions=subdivisions, calc_uvs=True)
+	blender_object = bpy.context.object
+	blender_mesh: bpy.types.Mesh = blender_object.data # pyright: ignore[reportAssignmentType]
+	# Make roughly a third of the faces flat, so not all face corners of a vertex merge
+	for polygon in blender_mesh.polygons:
+		polygon.use_smooth = polygon.index % 3 != 0
+	bpy.data.objects.remove(blender_object)
+	return blender_mesh
+
+
+def _read_loop_attributes(blender_mesh: bpy.types.Mesh) -> tuple[np.ndarray, list[np.ndarray]]:
+	vertex_indices = np.zeros(len(blender_mesh.loops), dtype=np.int32)
+	blender_mesh.loops.foreach_get("vertex_index", vertex_indices)
+	normals = np.zeros(len(blender_mesh.loops) * 3, dtype=np.float32)
+	blender_mesh.loops.foreach_get("normal", normals)
+	attributes = [np.reshape(normals, (-1, 3))]
+	for uv_layer in blender_mesh.uv_layers:
+		uvs = np.zeros(len(blender_mesh.loops) * 2, dtype=np.float32)
+		uv_layer.uv.foreach_get("vector", uvs)
+		attributes.append(np.reshape(uvs, (-1, 2)))
+	return vertex_indices, attributes
+
+
+def _deduplicate_splits_legacy(blender_mesh: bpy.types.Mesh, uv_layers: list[np.ndarray], threshold: float) -> tuple[np.ndarray, np.ndarray]:
+	"""The per-loop implementation `export_stf_mesh` used before `deduplicate_splits`"""
+	verts_to_split: dict[int, list] = {}
+	deduped_split_indices_list: list[int] = []
+	face_corners_to_split_list: list[int] = []
+	for loop in blender_mesh.loops:
+		if(loop.vertex_index not in verts_to_split):
+			verts_to_split[loop.vertex_index] = [loop.index]
+			deduped_split_indices_list.append(loop.index)
+			face_corners_to_split_list.append(len(deduped_split_indices_list) - 1)
+		else:
+			for split_candidate in verts_to_split[loop.vertex_index]:
+				if(
+					(loop.normal - blender_mesh.loops[split_candidate].normal).length < threshold
+					and all(np.linalg.norm(uv_layer[loop.index] - uv_layer[split_candidate]) <= threshold for uv_layer in uv_layers)
+				):
+					face_corners_to_split_list.append(face_corners_to_split_list[split_candidate])
+					break
+			else:
+				verts_to_split[loop.vertex_index].append(loop.index)
+				deduped_split_indices_list.append(loop.index)
+				face_corners_to_split_list.append(len(deduped_split_indices_list) - 1)
+	return np.array(deduped_split_indices_list), np.array(face_corners_to_split_list)
+
+
+def run_benchmark() -> list[dict]:
+	mesh_dedup = import_stf_module("stfblender.stf_resources.stf.stf_mesh.mesh_dedup")
+	mesh_export = import_stf_module("stfblender.stf_resources.stf.stf_mesh.mesh_export")
+
+	ret = []
+	for num_loops in MESH_SIZES:
+		blender_mesh = _create_grid_mesh(num_loops)
+
+		time_start = time.perf_counter()
+		vertex_indices, attributes = _read_loop_attributes(blender_mesh)
+		deduped_split_indices, face_corners_to_split = mesh_dedup.deduplicate_splits(vertex_indices, attributes, mesh_export.float_threshold)
+		result = {
+			"loops": len(blender_mesh.loops),
+			"splits": len(deduped_split_indices),
+			"time": time.perf_counter() - time_start,
+		}
+
+		if(num_loops <= LEGACY_MAX_SIZE):
+			time_start = time.perf_counter()
+			legacy_split_indices, legacy_face_corners_to_split = _deduplicate_splits_legacy(blender_mesh, attributes[1:], mesh_export.float_threshold)
+			result["legacy_time"] = time.perf_counter() - time_start
+			result["legacy_splits"] = len(legacy_split_indices)
+			# Both merge the same face corners, they only differ for uvs at a distance of exactly the threshold
+			result["legacy_match"] = bool(np.array_equal(deduped_split_indices, legacy_split_indices) and np.array_equal(face_corners_to_split, legacy_face_corners_to_split))
+
+		bpy.data.meshes.remove(blender_mesh)
+		ret.append(result)
+	return ret
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import time
+
+from . import import_stf_module
+from .synthetic_scene import create_scene, remove_scene
+
+
+# Each scene stresses one of the mesh, armature, blendshape and animation handlers, the last one all of them
+SCENES = [
+	{"scene": "mesh", "vertices": 200_000, "bones": 0, "blendshapes": 0, "frames": 0},
+	{"scene": "armature", "vertices": 10_000, "bones": 500, "blendshapes": 0, "frames": 0},
+	{"scene": "blendshapes", "vertices": 20_000, "bones": 0, "blendshapes": 100, "frames": 0},
+	{"scene": "animation", "vertices": 1_000, "bones": 100, "blendshapes": 0, "frames": 1_000},
+	{"scene": "character", "vertices": 50_000, "bones": 200, "blendshapes": 50, "frames": 250},
+]
+
+
+def _handler_times(profile) -> dict[str, float]:
+	return {"handler_time_" + entry.key: entry.self_time for entry in profile.get_entries("handler")} if profile else {}
+
+
+def run_benchmark() -> list[dict]:
+	exporter = import_stf_module("stfblender.io.exporter.exporter")
+	importer = import_stf_module("stfblender.io.importer.importer")
+
+	ret = []
+	with tempfile.TemporaryDirectory() as directory:
+		for scene in SCENES:
+			filepath = os.path.join(directory, scene["scene"] + ".stf")
+			collection = create_scene(scene["vertices"], scene["bones"], scene["blendshapes"], scene["frames"])
+
+			time_start = time.perf_counter()
+			export_result = exporter.export_stf_file(collection, filepath, None)
+			export_time = time.perf_counter() - time_start
+			remove_scene(collection)
+			if(not export_result.success):
+				ret.append({**scene, "error": export_result.error_message})
+				continue
+
+			time_start = time.perf_counter()
+			import_result = importer.import_stf_file(filepath, None)
+			import_time = time.perf_counter() - time_start
+			if(not import_result.success):
+				ret.append({**scene, "error": import_result.error_message})
+				continue
+
+			ret.append({
+				**scene,
+				"file_size": os.path.getsize(filepath),
+				"export_time": export_time,
+				"import_time": import_time,
+				**{"export_" + key: value for key, value in _handler_times(export_result.profile).items()},
+				**{"import_" + key: value for key, value in _handler_times(import_result.profile).items()},
+			})
+			remove_scene(import_result.collection)
+	return ret
@@ -0,0 +1,131 @@
+import bpy
+import math
+import numpy as np
+
+
+# Bone hierarchies of chains with this many bones, branching off a root bone
+CHAIN_LENGTH = 10
+# Number of bones which get keyframes, since rigs rarely animate every bone
+MAX_ANIMATED_BONES = 50
+
+
+def _create_armature(collection: bpy.types.Collection, num_bones: int) -> bpy.types.Object:
+	blender_armature = bpy.data.armatures.new("STF Benchmark Armature")
+	blender_object = bpy.data.objects.new("STF Benchmark Armature", blender_armature)
+	collection.objects.link(blender_object)
+
+	bpy.context.view_layer.objects.active = blender_object
+	bpy.ops.object.mode_set(mode="EDIT", toggle=False)
+	root = blender_armature.edit_bones.new("root")
+	root.head = (0, 0, 0); root.tail = (0, 0, 0.1)
+	for bone_index in range(num_bones - 1):
+		chain, link = divmod(bone_index, CHAIN_LENGTH)
+		bone = blender_armature.edit_bones.new("chain_%d_%d" % (chain, link))
+		bone.head = (chain * 0.1, 0, 0.1 + link * 0.1); bone.tail = (chain * 0.1, 0, 0.2 + link * 0.1)
+		bone.parent = root if link == 0 else blender_armature.edit_bones["chain_%d_%d" % (chain, link - 1)]
+		bone.use_connect = link > 0
+	bpy.ops.object.mode_set(mode="OBJECT", toggle=False)
+	return blender_object
+
+
+def _create_mesh(collection: bpy.types.Collection, num_vertices: int) -> bpy.types.Object:
+	segments = max(3, int(math.sqrt(num_vertices)))
+	bpy.ops.mesh.primitive_uv_sphere_add(segments=segments, ring_count=max(3, num_vertices // segments))
+	blender_object = bpy.context.object
+	for user_collection in blender_object.users_collection:
+		user_collection.objects.unlink(blender_object)
+	collection.objects.link(blender_object)
+	return blender_object
+
+
+def _add_weights(mesh_object: bpy.types.Object, armature_object: bpy.types.Object):
+	"""Weight every vertex to two neighbouring bones"""
+	bone_names = [bone.name for bone in armature_object.data.bones] # pyright: ignore[reportAttributeAccessIssue]
+	vertex_indices = np.arange(len(mesh_object.data.vertices)) # pyright: ignore[reportAttributeAccessIssue]
+	for bone_index, bone_name in enumerate(bone_names):
+		vertex_group = mesh_object.vertex_groups.new(name=bone_name)
+		vertex_group.add(vertex_indices[vertex_indices % len(bone_names) == bone_index].tolist(), 1, "REPLACE")
+		vertex_group.add(vertex_indices[(vertex_indices + 1) % len(bone_names) == bone_index].tolist(), 0.5, "REPLACE")
+
+	modifier: bpy.types.ArmatureModifier = mesh_object.modifiers.new("Armature", "ARMATURE") # pyright: ignore[reportAssignmentType]
+	modifier.object = armature_object
+	mesh_object.parent = armature_object
+
+
+def _add_blendshapes(mesh_object: bpy.types.Object, num_blendshapes: int, rng: np.random.Generator):
+	"""Like face tracking shapes, most blendshapes only move a small part of the mesh"""
+	blender_mesh: bpy.types.Mesh = mesh_object.data # pyright: ignore[reportAssignmentType]
+	base_positions = np.zeros(len(blender_mesh.vertices) * 3, dtype=np.float32)
+	blender_mesh.vertices.foreach_get("co", base_positions)
+	base_positions = np.reshape(base_positions, (-1, 3))
+	mesh_object.shape_key_add(name="Basis", from_mix=False)
+	for blendshape_index in range(num_blendshapes):
+		positions = base_positions.copy()
+		moved = rng.random(len(positions)) < 0.05
+		positions[moved] += rng.normal(0, 0.01, (np.count_nonzero(moved), 3)).astype(np.float32)
+		shape_key = mesh_object.shape_key_add(name="Blendshape " + str(blendshape_index), from_mix=False)
+		shape_key.data.foreach_set("co", np.reshape(positions, -1))
+	blender_mesh.stf_mesh.export_blendshape_normals = False
+
+
+def _get_fcurves(blender_object: bpy.types.Object) -> list[bpy.types.FCurve]:
+	action = blender_object.animation_data.action
+	try:
+		from bpy_extras import anim_utils
+		channelbag = anim_utils.action_get_channelbag_for_slot(action, blender_object.animation_data.action_slot)
+		return list(channelbag.fcurves) if channelbag else []
+	except (ImportError, AttributeError):
+		return list(action.fcurves)
+
+
+def _add_animation(armature_object: bpy.types.Object, num_frames: int, rng: np.random.Generator):
+	"""Keyframe the rotation of the first bones on every frame"""
+	armature_object.animation_data_create()
+	armature_object.animation_data.action = bpy.data.actions.new("STF Benchmark Animation")
+
+	# Create the FCurves with one keyframe each, then fill them in bulk
+	pose_bones = list(armature_object.pose.bones)[:MAX_ANIMATED_BONES]
+	for pose_bone in pose_bones:
+		pose_bone.keyframe_insert("rotation_quaternion", frame=0)
+	frames = np.arange(num_frames, dtype=np.float32)
+	for fcurve in _get_fcurves(armature_object):
+		values = np.sin(frames / rng.uniform(5, 50) + rng.uniform(0, math.tau)).astype(np.float32) * 0.2
+		if(fcurve.array_index == 0): values += 1
+		fcurve.keyframe_points.clear()
+		fcurve.keyframe_points.add(num_frames)
+		fcurve.keyframe_points.foreach_set("co", np.reshape(np.stack([frames, values], axis=1), -1))
+		fcurve.update()
+
+
+def create_scene(num_vertices: int, num_bones: int = 0, num_blendshapes: int = 0, num_frames: int = 0, seed: int = 0) -> bpy.types.Collection:
+	"""
+	Create a collection with a mesh, and optionally an armature the mesh is weighted to, blendshapes and an animation of the armature.
+	Animations are only exported if the Slot-Link extension is installed.
+	"""
+	rng = np.random.default_rng(seed)
+	collection = bpy.data.collections.new("STF Benchmark Scene")
+	bpy.context.scene.collection.children.link(collection)
+
+	mesh_object = _create_mesh(collection, num_vertices)
+	if(num_bones > 0):
+		armature_object = _create_armature(collection, num_bones)
+		_add_weights(mesh_object, armature_object)
+		if(num_frames > 0):
+			_add_animation(armature_object, num_frames, rng)
+	if(num_blendshapes > 0):
+		_add_blendshapes(mesh_object, num_blendshapes, rng)
+	return collection
+
+
+def remove_scene(collection: bpy.types.Collection):
+	for blender_object in list(collection.all_objects):
+		blender_data = blender_object.data
+		blender_action = blender_object.animation_data.action if blender_object.animation_data else None
+		bpy.data.objects.remove(blender_object)
+		if(type(blender_data) is bpy.types.Mesh):
+			bpy.data.meshes.remove(blender_data)
+		elif(type(blender_data) is bpy.types.Armature):
+			bpy.data.armatures.remove(blender_data)
+		if(blender_action is not None and blender_action.users == 0):
+			bpy.data.actions.remove(blender_action)
+	bpy.data.collections.remove(collection)
@@ -0,0 +1,162 @@
+"""
+$BLENDER_EXECUTABLE -b --factory-startup -P testsuite/run_batch.py -- export scene.blend --output exported/ --report export.json
+$BLENDER_EXECUTABLE -b --factory-startup -P testsuite/run_batch.py -- import exported/ --report import.json
+
+See readme.md for more info.
+"""
+
+
+def _get_peak_memory() -> int | None:
+	"""Peak resident memory of the Blender process in bytes, if the platform reports it."""
+	try:
+		import resource
+		import sys
+	except ImportError:
+		return None
+	peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	return peak if sys.platform == "darwin" else peak * 1024 # Linux reports KiB
+
+
+class _Measurement:
+	"""Wall time, peak process memory and optionally the peak Python allocations around the export or import of one file."""
+	def __init__(self, trace_python_memory: bool):
+		self.trace_python_memory: bool = trace_python_memory
+
+	def __enter__(self):
+		import time
+		import tracemalloc
+		if(self.trace_python_memory):
+			tracemalloc.start()
+		self.peak_memory_before: int | None = _get_peak_memory()
+		self.time_start: float = time.perf_counter()
+		return self
+
+	def __exit__(self, *args):
+		import time
+		import tracemalloc
+		self.time: float = time.perf_counter() - self.time_start
+		self.peak_memory: int | None = _get_peak_memory()
+		self.python_peak_memory: int | None = None
+		if(self.trace_python_memory):
+			_, self.python_peak_memory = tracemalloc.get_traced_memory()
+			tracemalloc.stop()
+
+	def to_dict(self) -> dict:
+		return {
+			"time": self.time,
+			"peak_memory": self.peak_memory,
+			"peak_memory_growth": self.peak_memory - self.peak_memory_before if self.peak_memory is not None and self.peak_memory_before is not None else None,
+			"python_peak_memory": self.python_peak_memory,
+		}
+
+
+def _profile_summary(profile, num: int) -> list[dict]:
+	return [entry.to_dict() for entry in profile.get_top(num)] if profile else []
+
+
+def export_collections(blend_filepath: str, output_directory: str, trace_python_memory: bool = False, num_profile_entries: int = 10) -> list[dict]:
+	"""Export every collection directly in the scene of a `.blend` file into its own `.stf` file."""
+	import os
+	import bpy
+	from testsuite.run_testsuite import import_stf_module
+	exporter = import_stf_module("stfblender.io.exporter.exporter")
+
+	bpy.ops.wm.open_mainfile(filepath=blend_filepath)
+	os.makedirs(output_directory, exist_ok=True)
+
+	ret = []
+	for collection in bpy.context.scene.collection.children:
+		filepath = os.path.join(output_directory, bpy.path.clean_name(collection.name) + ".stf")
+		with _Measurement(trace_python_memory) as measurement:
+			result = exporter.export_stf_file(collection, filepath, None)
+		ret.append({
+			"collection": collection.name,
+			"file": filepath,
+			"success": result.success,
+			"error": result.error_message,
+			"warnings": len(result.warnings),
+			"file_size": os.path.getsize(filepath) if result.success and os.path.exists(filepath) else None,
+			**measurement.to_dict(),
+			"profile": _profile_summary(result.profile, num_profile_entries),
+		})
+	return ret
+
+
+def import_files(directory: str, trace_python_memory: bool = False, num_profile_entries: int = 10) -> list[dict]:
+	"""Import every `.stf` file in a directory, in one batch."""
+	import os
+	from testsuite.run_testsuite import import_stf_module
+	importer = import_stf_module("stfblender.io.importer.importer")
+
+	filepaths = sorted(os.path.join(directory, filename) for filename in os.listdir(directory) if filename.endswith(".stf"))
+
+	ret = []
+	results = importer.import_stf_files(filepaths, None)
+	while(True):
+		# Files are parsed ahead on worker threads, so the measurement of a file only covers its import on the main thread, and the wait for its parse
+		with _Measurement(trace_python_memory) as measurement:
+			next_result = next(results, None)
+		if(next_result is None): break
+		filepath, result = next_result
+		ret.append({
+			"file": filepath,
+			"success": result.success,
+			"error": result.error_message,
+			"warnings": len(result.warnings),
+			"file_size": os.path.getsize(filepath),
+			"parse_time": result.parse_time,
+			**measurement.to_dict(),
+			"profile": _profile_summary(result.profile, num_profile_entries),
+		})
+	return ret
+
+
+def _parse_arguments(argv: list[str]):
+	import argparse
+	parser = argparse.ArgumentParser(prog="run_batch.py", description="Export or import STF files in Blender's background mode, and report the time and memory each file took.")
+	parser.add_argument("--report", help="Write the per-file results to this JSON file")
+	parser.add_argument("--trace-python-memory", action="store_true", help="Also report the peak memory allocated by Python. Slows everything down considerably")
+	parser.add_argument("--profile-entries", type=int, default=10, help="Number of the slowest profiled handlers and resources to include per file")
+	commands = parser.add_subparsers(dest="command", required=True)
+
+	command_export = commands.add_parser("export", help="Export every collection in the scene of a .blend file")
+	command_export.add_argument("blend_file")
+	command_export.add_argument("--output", required=True, help="Directory into which the .stf files are written")
+
+	command_import = commands.add_parser("import", help="Import every .stf file in a directory")
+	command_import.add_argument("directory")
+
+	# Blender's own arguments end at "--"
+	return parser.parse_args(argv[argv.index("--") + 1:] if "--" in argv else [])
+
+
+if __name__ == "__main__":
+	import sys
+	import json
+	from pathlib import Path
+
+	sys.path.insert(0, str(Path(__file__).parent.parent))
+	from testsuite.run_testsuite import _setup_stf_extension, _cleanup_stf_extension
+
+	arguments = _parse_arguments(sys.argv)
+
+	_setup_stf_extension()
+
+	# let results
+	if(arguments.command == "export"):
+		results = export_collections(arguments.blend_file, arguments.output, arguments.trace_python_memory, arguments.profile_entries)
+	else:
+		results = import_files(arguments.directory, arguments.trace_python_memory, arguments.profile_entries)
+
+	for result in results:
+		print("%s: %s (%.3f sec.)" % (result["file"], "success" if result["success"] else "failed: " + str(result["error"]), result["time"]), flush=True)
+	print("%d of %d files succeeded, %.3f sec. total" % (sum(1 for result in results if result["success"]), len(results), sum(result["time"] for result in results)), flush=True)
+
+	if(arguments.report):
+		with open(arguments.report, "w") as file:
+			json.dump({"command": arguments.command, "files": results}, file, indent="\t")
+
+	_cleanup_stf_extension()
+
+	import bpy
+	bpy.ops.wm.quit_blender()
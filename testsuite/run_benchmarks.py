@@ -0,0 +1,109 @@
+"""
+$BLENDER_EXECUTABLE -b --factory-startup -P testsuite/run_benchmarks.py
+$BLENDER_EXECUTABLE -b --factory-startup -P testsuite/run_benchmarks.py -- --update-baseline
+
+See readme.md for more info.
+"""
+
+
+# Timings shorter than this are too noisy to count as a regression
+MIN_COMPARED_TIME = 0.01
+
+
+def compare_to_baseline(results: dict[str, list[dict]], baseline: dict[str, list[dict]], tolerance: float) -> list[str]:
+	"""
+	Compare every timing of the results to the row at the same position in the baseline.
+	Rows are only compared if their parameters, all values which aren't timings, are the same.
+
+	:param float tolerance: How much slower than the baseline a timing may be, i.e. 0.2 for 20%.
+	:return: A description of each regression.
+	"""
+	ret: list[str] = []
+	for benchmark_name, rows in results.items():
+		baseline_rows = baseline.get(benchmark_name, [])
+		for row_index, row in enumerate(rows):
+			if(row_index >= len(baseline_rows)):
+				print("\tNo baseline for " + benchmark_name + " row " + str(row_index), flush=True)
+				continue
+			baseline_row = baseline_rows[row_index]
+			parameters = {key: value for key, value in row.items() if type(value) is not float}
+			baseline_parameters = {key: value for key, value in baseline_row.items() if type(value) is not float}
+			if(parameters != baseline_parameters):
+				print("\tBaseline of " + benchmark_name + " row " + str(row_index) + " has different parameters, skipping: " + str(baseline_parameters), flush=True)
+				continue
+			for key, value in row.items():
+				if(type(value) is not float or "time" not in key or type(baseline_row.get(key)) is not float):
+					continue
+				if(value > MIN_COMPARED_TIME and value > baseline_row[key] * (1 + tolerance)):
+					ret.append("%s %s %s: %.4f sec. (baseline %.4f sec., %+.0f%%)" % (benchmark_name, str(parameters), key, value, baseline_row[key], (value / baseline_row[key] - 1) * 100 if baseline_row[key] > 0 else float("inf")))
+	return ret
+
+
+def _parse_arguments(argv: list[str]):
+	import argparse
+	from pathlib import Path
+	parser = argparse.ArgumentParser(prog="run_benchmarks.py", description="Run the STF benchmarks, and compare them against a stored baseline.")
+	parser.add_argument("--baseline", default=str(Path(__file__).parent.joinpath("benchmarks/baseline.json")), help="Results of an earlier run to compare against")
+	parser.add_argument("--update-baseline", action="store_true", help="Store the results of this run as the new baseline")
+	parser.add_argument("--tolerance", type=float, default=0.2, help="How much slower than the baseline a timing may be, before it counts as a regression")
+	parser.add_argument("--only", nargs="*", help="Names of the benchmark modules to run, i.e. bench_bone_import")
+	# Blender's own arguments end at "--"
+	return parser.parse_args(argv[argv.index("--") + 1:] if "--" in argv else [])
+
+
+if __name__ == "__main__":
+	import sys
+	import os
+	import json
+	import importlib
+	import pkgutil
+	from pathlib import Path
+
+	sys.path.insert(0, str(Path(__file__).parent.parent))
+	from testsuite.run_testsuite import _setup_stf_extension, _cleanup_stf_extension
+
+	arguments = _parse_arguments(sys.argv)
+
+	_setup_stf_extension()
+
+	results: dict[str, list[dict]] = {}
+	for module_info in pkgutil.iter_modules([str(Path(__file__).parent.joinpath("benchmarks"))]):
+		if(not module_info.name.startswith("bench_")): continue
+		if(arguments.only and module_info.name not in arguments.only): continue
+		benchmark = importlib.import_module("testsuite.benchmarks." + module_info.name)
+		print("Running " + module_info.name, flush=True)
+		results[module_info.name] = benchmark.run_benchmark()
+		for row in results[module_info.name]:
+			print("\t" + ", ".join(key + ": " + (("%.4f" % value) if type(value) is float else str(value)) for key, value in row.items()), flush=True)
+
+	with open(Path(__file__).parent.joinpath("output/benchmarks.json"), "w") as file:
+		json.dump(results, file, indent="\t")
+
+	_cleanup_stf_extension()
+
+	regressions: list[str] = []
+	if(arguments.update_baseline):
+		# Keep the baseline of benchmarks which didn't run this time
+		baseline: dict[str, list[dict]] = {}
+		if(os.path.exists(arguments.baseline)):
+			with open(arguments.baseline, "r") as file:
+				baseline = json.load(file)
+		with open(arguments.baseline, "w") as file:
+			json.dump(baseline | results, file, indent="\t")
+		print("Baseline written to " + arguments.baseline, flush=True)
+	elif(os.path.exists(arguments.baseline)):
+		with open(arguments.baseline, "r") as file:
+			print("Comparing against " + arguments.baseline, flush=True)
+			regressions = compare_to_baseline(results, json.load(file), arguments.tolerance)
+		for regression in regressions:
+			print("Regression: " + regression, flush=True)
+		print(str(len(regressions)) + " regressions", flush=True)
+	else:
+		print("No baseline found at " + arguments.baseline + ", run with --update-baseline to create one", flush=True)
+		sys.exit(1)
+
+	if(len(regressions) > 0):
+		sys.exit(1)
+
+	import bpy
+	bpy.ops.wm.quit_blender()
@@ -27,6 +27,11 @@ def _cleanup_stf_extension():
 	import bpy
 	bpy.ops.preferences.addon_disable(module = STF_BLENDER_EXTENSION)
 
+def import_stf_module(module_name: str):
+	"""Import a module of the enabled STF extension, i.e. `stfblender.io.stf_file`"""
+	import importlib
+	return importlib.import_module(STF_BLENDER_EXTENSION + "." + module_name)
+
 
 if __name__ == "__main__":
 	import unittest
@@ -0,0 +1,37 @@
+import unittest
+import numpy as np
+
+from ..run_testsuite import import_stf_module
+
+
+def _clean_keyframes_reference(values: list[float], threshold: float) -> list[float]:
+	"""Removes keyframes one at a time, like the `do_clean` option of Blender's own bake"""
+	ret = list(values)
+	index = 1
+	while(index < len(ret) - 1):
+		if(abs(ret[index] - ret[index - 1]) + abs(ret[index] - ret[index + 1]) < threshold):
+			del ret[index]
+		else:
+			index += 1
+	return ret
+
+
+class TestAnimationBake(unittest.TestCase):
+
+	def test_clean_keeps_slow_ramp(self):
+		"""Each step of a slow ramp is below the clean threshold, but the ramp as a whole must not be removed"""
+		stf_animation_bake = import_stf_module("stfblender.stf_resources.stf.stf_animation.stf_animation_bake")
+
+		ramp = np.arange(200, dtype=np.float64) * 0.00004
+		keep = stf_animation_bake._clean_keyframes(ramp)
+		self.assertEqual(ramp[keep].tolist(), _clean_keyframes_reference(ramp.tolist(), stf_animation_bake._clean_threshold))
+		self.assertEqual(int(np.count_nonzero(keep)), 101)
+
+	def test_clean_matches_reference(self):
+		stf_animation_bake = import_stf_module("stfblender.stf_resources.stf.stf_animation.stf_animation_bake")
+
+		rng = np.random.default_rng(0)
+		for step in [0.00001, 0.0001, 0.001]:
+			values = np.cumsum(rng.normal(0, step, 100))
+			keep = stf_animation_bake._clean_keyframes(values)
+			self.assertEqual(values[keep].tolist(), _clean_keyframes_reference(values.tolist(), stf_animation_bake._clean_threshold))
@@ -0,0 +1,54 @@
+import mathutils
+import unittest
+import numpy as np
+
+from ..run_testsuite import import_stf_module
+
+
+def _axis_swap(value: list[float]) -> list[float]:
+	return [value[0], value[2], -value[1]]
+
+def _rotate_quaternion(value: list[float]) -> list[float]:
+	return (mathutils.Quaternion((0.7071068, 0.7071068, 0, 0)) @ mathutils.Quaternion(value)).normalized()[:]
+
+def _rotate_euler(value: list[float]) -> list[float]:
+	return (mathutils.Matrix.Rotation(0.5, 4, "X") @ mathutils.Euler(value).to_matrix().to_4x4()).to_euler()[:]
+
+
+class TestAnimationConversion(unittest.TestCase):
+
+	def test_axis_swap_is_affine(self):
+		_probe_affine = import_stf_module("stfblender.stf_resources.stf.stf_animation.stf_animation_conversion")._probe_affine
+
+		affine = _probe_affine(_axis_swap, 3)
+		self.assertIsNotNone(affine)
+		matrix, offset = affine # pyright: ignore[reportGeneralTypeIssues]
+		self.assertTrue(np.array_equal(matrix, [[1, 0, 0], [0, 0, 1], [0, -1, 0]]))
+		self.assertTrue(np.array_equal(offset, [0, 0, 0]))
+
+	def test_rotation_conversions_are_not_affine(self):
+		_probe_affine = import_stf_module("stfblender.stf_resources.stf.stf_animation.stf_animation_conversion")._probe_affine
+
+		self.assertIsNone(_probe_affine(_rotate_quaternion, 4))
+		self.assertIsNone(_probe_affine(_rotate_euler, 3))
+
+	def test_node_convert_array_matches_rows(self):
+		"""The array variants of the node translation and scale conversions must match converting one value at a time"""
+		import bpy
+		node_property_conversion = import_stf_module("stfblender.stf_resources.stf.stf_node.node_property_conversion")
+
+		parent = bpy.data.objects.new("STF Test Parent", None)
+		child = bpy.data.objects.new("STF Test Child", None)
+		try:
+			parent.matrix_world = mathutils.Matrix.LocRotScale(mathutils.Vector([1, 2, 3]), mathutils.Euler([0.3, 0.2, 0.1]), mathutils.Vector([2, 2, 2])) # pyright: ignore[reportAttributeAccessIssue]
+			child.parent = parent
+			child.matrix_parent_inverse = parent.matrix_world.inverted()
+			child.scale = mathutils.Vector([0.5, 1, 2])
+
+			values = np.random.default_rng(0).normal(0, 10, (16, 3))
+			for conversion_func in [node_property_conversion._create_translation_to_stf_func(child), node_property_conversion._create_scale_to_stf_func(child)]:
+				expected = np.array([list(conversion_func(row)) for row in values.tolist()])
+				self.assertTrue(np.allclose(conversion_func.convert_array(values), expected, atol=1e-4))
+		finally:
+			bpy.data.objects.remove(child)
+			bpy.data.objects.remove(parent)
@@ -0,0 +1,33 @@
+import unittest
+
+from ..run_testsuite import import_stf_module
+
+
+# Every variant of JSON keyframe the exporter writes
+_stf_keyframes = [
+	[True, 1.5, "bezier", "auto", [0.5, 0.25]],
+	[True, 2.0, "bezier", "split", [0.5, -0.25], [-0.5, 0.125]],
+	[False, 3.0, "baked"],
+	[True, 4.0, "linear", [-0.5, 1.0]],
+	[True, 5.0, "constant"],
+	[True, 6.0, "quadratic"],
+	[True, 7.0, "cubic"],
+	[True, 8.0],
+	[True, 9.0, [-1.0, 2.0]],
+]
+
+
+class TestAnimationKeyframes(unittest.TestCase):
+
+	def test_json_roundtrip(self):
+		STF_Keyframes = import_stf_module("stfblender.stf_resources.stf.stf_animation.stf_animation_keyframes").STF_Keyframes
+		self.assertEqual(STF_Keyframes.from_json(_stf_keyframes).to_json(), _stf_keyframes)
+
+	def test_binary_roundtrip(self):
+		keyframes_module = import_stf_module("stfblender.stf_resources.stf.stf_animation.stf_animation_keyframes")
+		keyframe_codes, keyframe_values = keyframes_module.STF_Keyframes.from_json(_stf_keyframes).to_buffers()
+		self.assertEqual(len(keyframe_codes), len(_stf_keyframes))
+		self.assertEqual(keyframes_module.STF_Keyframes.from_buffers(keyframe_codes, keyframe_values).to_json(), _stf_keyframes)
+
+		timepoints = [0.0, 1.0, 2.5, 1000.0]
+		self.assertEqual(keyframes_module.decode_timepoints(keyframes_module.encode_timepoints(timepoints)).tolist(), timepoints)
@@ -0,0 +1,44 @@
+import unittest
+import numpy as np
+
+from ..run_testsuite import import_stf_module
+
+
+THRESHOLD = 0.0001
+
+
+class TestMeshDedup(unittest.TestCase):
+
+	def test_values_across_cell_boundary_merge(self):
+		"""Values closer than the threshold merge, even if a grid of threshold sized cells would separate them"""
+		deduplicate_splits = import_stf_module("stfblender.stf_resources.stf.stf_mesh.mesh_dedup").deduplicate_splits
+
+		vertex_indices = np.array([0, 0], dtype=np.int32)
+		normals = np.array([[0.0000499, 0, 1], [0.0000501, 0, 1]], dtype=np.float64)
+		deduped_split_indices, face_corners_to_split = deduplicate_splits(vertex_indices, [normals], THRESHOLD)
+
+		self.assertEqual(deduped_split_indices.tolist(), [0])
+		self.assertEqual(face_corners_to_split.tolist(), [0, 0])
+
+	def test_values_in_neighbouring_cells_stay_split(self):
+		"""Values further apart than the threshold stay separate, even if they round to the same grid cell on every axis"""
+		deduplicate_splits = import_stf_module("stfblender.stf_resources.stf.stf_mesh.mesh_dedup").deduplicate_splits
+
+		vertex_indices = np.array([0, 0], dtype=np.int32)
+		offset = 0.49 * THRESHOLD
+		normals = np.array([[offset, offset, offset], [-offset, -offset, -offset]], dtype=np.float64)
+		deduped_split_indices, face_corners_to_split = deduplicate_splits(vertex_indices, [normals], THRESHOLD)
+
+		self.assertEqual(deduped_split_indices.tolist(), [0, 1])
+		self.assertEqual(face_corners_to_split.tolist(), [0, 1])
+
+	def test_first_matching_split_wins(self):
+		"""Face corners join the first split of their vertex in loop order, and are compared against the face corner that started it"""
+		deduplicate_splits = import_stf_module("stfblender.stf_resources.stf.stf_mesh.mesh_dedup").deduplicate_splits
+
+		vertex_indices = np.array([1, 0, 1, 1, 0], dtype=np.int32)
+		uvs = np.array([[0, 0], [0.5, 0.5], [0.00015, 0], [0.00008, 0], [0.5, 0.5]], dtype=np.float64)
+		deduped_split_indices, face_corners_to_split = deduplicate_splits(vertex_indices, [uvs], THRESHOLD)
+
+		self.assertEqual(deduped_split_indices.tolist(), [0, 1, 2])
+		self.assertEqual(face_corners_to_split.tolist(), [0, 1, 2, 0, 1])
@@ -0,0 +1,99 @@
+import bpy
+import bmesh
+import unittest
+from io import BytesIO
+
+from ..run_testsuite import import_stf_module
+
+
+def _encode_topology_reference(blender_mesh: bpy.types.Mesh, indices_width: int, material_indices_width: int) -> dict[str, bytes]:
+	"""The per-element encoder `export_stf_mesh` used before `encode_topology`. Its output is the golden reference."""
+	serialize_uint = import_stf_module("stfblender_common.utils.buffer_utils").serialize_uint
+
+	buffer_tris = BytesIO()
+	face_lens: list[int] = [0]
+	last_face_index = 0
+	for tris in blender_mesh.loop_triangles:
+		if(last_face_index == tris.polygon_index):
+			face_lens[len(face_lens) - 1] += 1
+		else:
+			face_lens.append(1)
+		for split_index in tris.loops:
+			buffer_tris.write(serialize_uint(split_index, indices_width))
+		last_face_index = tris.polygon_index
+
+	buffer_faces = BytesIO()
+	buffer_face_material_indices = BytesIO()
+	buffer_flat_face_indices = BytesIO()
+	for polygon in blender_mesh.polygons:
+		buffer_faces.write(serialize_uint(face_lens[polygon.index], indices_width))
+		buffer_face_material_indices.write(serialize_uint(polygon.material_index, material_indices_width))
+		if(not polygon.use_smooth):
+			buffer_flat_face_indices.write(serialize_uint(polygon.index, indices_width))
+
+	buffer_lines = BytesIO()
+	for edge in blender_mesh.edges:
+		if(edge.is_loose):
+			for edge_vertex_index in edge.vertices:
+				buffer_lines.write(serialize_uint(edge_vertex_index, indices_width))
+
+	buffer_sharp_edges = BytesIO()
+	for edge in blender_mesh.edges:
+		if(edge.use_edge_sharp and not edge.is_loose):
+			for edge_vertex_index in edge.vertices:
+				buffer_sharp_edges.write(serialize_uint(edge_vertex_index, indices_width))
+
+	return {
+		"tris": buffer_tris.getvalue(),
+		"faces": buffer_faces.getvalue(),
+		"material_indices": buffer_face_material_indices.getvalue(),
+		"sharp_face_indices": buffer_flat_face_indices.getvalue(),
+		"lines": buffer_lines.getvalue(),
+		"sharp_edges": buffer_sharp_edges.getvalue(),
+	}
+
+
+def _create_test_mesh() -> bpy.types.Mesh:
+	"""Mixed triangles, quads and ngons, with loose edges, sharp edges, flat faces and several materials"""
+	blender_mesh = bpy.data.meshes.new("STF Topology Test")
+	bm = bmesh.new()
+	bmesh.ops.create_grid(bm, x_segments=24, y_segments=24, size=1)
+	bmesh.ops.triangulate(bm, faces=bm.faces[:len(bm.faces) // 4])
+	bmesh.ops.dissolve_edges(bm, edges=[edge for edge in bm.edges if not edge.is_boundary][:40:3])
+	loose_start = bm.verts.new((2, 0, 0))
+	for index in range(5):
+		loose_end = bm.verts.new((2, index + 1, 0))
+		bm.edges.new((loose_start, loose_end))
+		loose_start = loose_end
+	bm.to_mesh(blender_mesh)
+	bm.free()
+
+	for _ in range(3):
+		blender_mesh.materials.append(None)
+	for polygon in blender_mesh.polygons:
+		polygon.material_index = polygon.index % 3
+		polygon.use_smooth = polygon.index % 5 != 0
+	for edge in blender_mesh.edges:
+		edge.use_edge_sharp = edge.index % 7 == 0
+	blender_mesh.calc_loop_triangles()
+	return blender_mesh
+
+
+class TestMeshTopology(unittest.TestCase):
+
+	def test_encode_topology_matches_reference(self):
+		encode_topology = import_stf_module("stfblender.stf_resources.stf.stf_mesh.mesh_topology").encode_topology
+		determine_indices_width = import_stf_module("stfblender_common.utils.buffer_utils").determine_indices_width
+
+		blender_mesh = _create_test_mesh()
+		try:
+			indices_width = determine_indices_width(len(blender_mesh.loops))
+			material_indices_width = determine_indices_width(len(blender_mesh.materials))
+			expected = _encode_topology_reference(blender_mesh, indices_width, material_indices_width)
+			actual = encode_topology(blender_mesh, indices_width, material_indices_width)
+			self.assertEqual(set(expected.keys()), set(actual.keys()))
+			for key, buffer in expected.items():
+				self.assertTrue(len(buffer) > 0, key)
+				self.assertEqual(buffer, actual[key], key)
+		finally:
+			bpy.data.meshes.remove(blender_mesh)
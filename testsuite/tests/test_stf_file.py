@@ -0,0 +1,80 @@
+import bpy
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+from ..run_testsuite import import_stf_module
+
+
+class TestSTFFile(unittest.TestCase):
+
+	def test_export_buffers_bounded_memory(self):
+		"""Buffers are spooled to disk while exporting, so writing the file must not allocate memory for all of them at once"""
+		STF_ExportState = import_stf_module("stfblender.io.exporter.stf_export_state").STF_ExportState
+		STF_File = import_stf_module("stfblender.io.stf_file").STF_File
+
+		buffer_len = 1 << 20
+		num_buffers = 64
+
+		stf_state = STF_ExportState(bpy.context.scene.collection.stf_meta.to_stf_meta_assetInfo(), ({}, {}))
+		stf_file = None
+		filepath = os.path.join(tempfile.gettempdir(), "stf_testsuite_many_buffers.stf")
+		tracemalloc.start()
+		try:
+			for _ in range(num_buffers):
+				stf_state.serialize_buffer(os.urandom(buffer_len)) # Only one of these should be alive at a time
+			stf_state.set_root_id("root")
+
+			stf_file = stf_state.create_stf_binary_file()
+			with open(filepath, "wb") as file:
+				stf_file.serialize(file)
+			_, peak = tracemalloc.get_traced_memory()
+		finally:
+			tracemalloc.stop()
+			if(stf_file): stf_file.close()
+			stf_state.close()
+
+		self.assertLess(peak, buffer_len * 3)
+
+		with open(filepath, "rb") as file:
+			stf_file = STF_File.parse(file, memory_map=True)
+			try:
+				self.assertEqual(len(stf_file.buffers_included), num_buffers)
+				for buffer in stf_file.buffers_included:
+					self.assertEqual(len(buffer), buffer_len)
+			finally:
+				stf_file.close()
+		os.remove(filepath)
+
+	def test_compact_definition(self):
+		"""The compact JSON definition must parse to the same data as the regular one"""
+		import json
+		STF_ExportState = import_stf_module("stfblender.io.exporter.stf_export_state").STF_ExportState
+
+		stf_state = STF_ExportState(bpy.context.scene.collection.stf_meta.to_stf_meta_assetInfo(), ({}, {}))
+		stf_file = None
+		try:
+			stf_state.register_serialized_resource(bpy.context.scene.collection, {"type": "stf.prefab", "name": "Ünicode Prefab", "root_nodes": list(range(100))}, "root")
+			stf_state.set_root_id("root")
+			stf_file = stf_state.create_stf_binary_file()
+
+			regular = stf_file.encode_definition(compact=False)
+			compact = stf_file.encode_definition(compact=True)
+			self.assertEqual(json.loads(regular), json.loads(compact))
+			self.assertLess(len(compact), len(regular))
+		finally:
+			if(stf_file): stf_file.close()
+			stf_state.close()
+
+	def test_non_finite_values(self):
+		"""NaN and Infinity must be written as null, with or without orjson and in every mode"""
+		import json
+		encode_json = import_stf_module("stfblender.io.stf_json").encode_json
+
+		import numpy as np
+		data = {"values": [1.5, float("nan"), float("inf"), -float("inf")], "nested": {"value": float("nan")}, "numpy": [np.float64(1.5), np.float64("nan")]}
+		expected = {"values": [1.5, None, None, None], "nested": {"value": None}, "numpy": [1.5, None]}
+		self.assertEqual(json.loads(encode_json(data, compact=True)), expected)
+		self.assertEqual(json.loads(encode_json(data, compact=False)), expected)
+		self.assertEqual(json.loads(encode_json(data, compact=False, indent="\t")), expected)